@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:46
+
+from itertools import groupby
+from django.db import migrations, models
+
+TOP_SKILLS = 3
+
+
+def backfill_card_summary(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    UserSkills = apps.get_model('category_skills', 'UserSkills')
+
+    rows = UserSkills.objects.select_related('skill__category').order_by('user_id', 'id').iterator(chunk_size=2000)
+    users = []
+    for user_id, user_skills in groupby(rows, key=lambda row: row.user_id):
+        user_skills = list(user_skills)
+        users.append(User(pk=user_id, skills_count=len(user_skills), top_skills=[
+            {
+                'id': row.skill.id,
+                'name': row.skill.name,
+                'level': row.skill.level,
+                'level_display': row.skill.get_level_display(),
+                'category': row.skill.category.name,
+            }
+            for row in user_skills[:TOP_SKILLS]
+        ]))
+    User.objects.bulk_update(users, ['skills_count', 'top_skills'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_skills'),
+        ('category_skills', '0009_skills_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='skills_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='top_skills',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(backfill_card_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_card_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['skills_count'], name='userprofile_skills_count_idx'),
+        ),
+    ]
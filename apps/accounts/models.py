@@ -11,6 +11,10 @@ class User(models.Model):
     class Meta:
         ordering = ['-created_at']
         db_table = 'userprofile'
+        indexes = [
+            # The instructors list keeps users who teach at least one skill
+            models.Index(fields=['skills_count'], name='userprofile_skills_count_idx'),
+        ]
 
     YEAR_CHOICES = (
         ('1','First Year'),
@@ -37,6 +41,9 @@ class User(models.Model):
     bio = models.TextField(max_length=250,blank=True,help_text="Tell Others About Yourself")
     current_password = models.CharField(max_length = 128)
     previous_password = models.CharField(max_length = 128,blank=True,null=True)
+    # Instructor card summary, maintained by apps.category_skills.summaries
+    skills_count = models.PositiveIntegerField(default=0, editable=False)
+    top_skills = models.JSONField(default=list, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
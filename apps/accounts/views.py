@@ -1,13 +1,15 @@
+from collections import Counter
 from django.shortcuts import render , redirect, get_object_or_404
 from django.http import JsonResponse
 from django.contrib import messages
 from .models import User
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.contrib.auth.hashers import check_password, make_password
 from .models import User, University, Department, Branch
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
-from apps.category_skills.models import SkillsCategory, Skills, UserSkills
+from apps.category_skills.models import SkillsCategory, Skills, UserSkills, Session, SkillRecommendation
+from apps.core import catalog
 
 def register(request):
     if request.method == "POST":
@@ -121,14 +123,12 @@ def register(request):
 
 # View for getting the form filled with the data from backend 
 def get_choices(request):
-    universities = list(University.objects.values("id", "name"))
-    departments = list(Department.objects.values("id", "name"))
-    branches = list(Branch.objects.values("id", "name"))
+    choices = catalog.registration_choices()
 
     return JsonResponse({
-        "universities": universities,
-        "departments": departments,
-        "branches": branches,
+        "universities": choices["universities"],
+        "departments": choices["departments"],
+        "branches": choices["branches"],
         "years": User.YEAR_CHOICES,
         "genders": User.GENDER_CHOICES,
     })
@@ -175,24 +175,55 @@ def login_required_custom(view_func):
         return view_func(request, *args, **kwargs)
     return wrapper
 
+RECOMMENDATIONS_SHOWN = 3
+
+
 @login_required_custom
 def dashboard(request):
     """Dashboard view showing user's overview and stats"""
     user_id = request.session.get('user_id')
     user = get_object_or_404(User, id=user_id)
     
-    # Get skill categories for display
-    skill_categories = SkillsCategory.objects.all()[:6]  # Limit to 6 for display
-    
-    # Get some recommended skills (you can implement more sophisticated logic later)
-    recommended_skills = Skills.objects.all()[:3]
-    
+    # Get skill categories for display, with skill counts from the cached catalog
+    skill_categories = catalog.skill_categories()[:6]  # Limit to 6 for display
+    skills_per_category = Counter(skill.category_id for skill in catalog.skills())
+    for category in skill_categories:
+        category.skills_total = skills_per_category[category.id]
+
+    # Skills the user already has: top_skills lists them all unless there
+    # are more than it keeps
+    if user.skills_count <= len(user.top_skills):
+        own_skill_ids = {skill["id"] for skill in user.top_skills}
+    else:
+        own_skill_ids = set(UserSkills.objects.filter(user=user).values_list('skill_id', flat=True))
+
+    # Stored offline, so leave out skills the user has added since
+    recommended_skills = [
+        recommendation.skill
+        for recommendation in SkillRecommendation.objects.filter(user=user).select_related('skill__category')
+        if recommendation.skill_id not in own_skill_ids
+    ][:RECOMMENDATIONS_SHOWN]
+    if not recommended_skills:
+        # No history yet: the skills most people teach
+        popular = (
+            Skills.objects.filter(teachable__isnull=False)
+            .select_related('category')
+            .order_by('-teachable__teacher_count')[:RECOMMENDATIONS_SHOWN + len(own_skill_ids)]
+        )
+        recommended_skills = [skill for skill in popular if skill.id not in own_skill_ids][:RECOMMENDATIONS_SHOWN]
+
+    # Skills the user is learning in sessions that still count, and the completed ones
+    learning = Session.objects.filter(learner=user).aggregate(
+        enrolled=Count('skill', distinct=True, filter=~Q(status__in=['CA', 'E'])),
+        completed=Count('id', filter=Q(status='C')),
+    )
+
     context = {
         'custom_user': user,
         'skill_categories': skill_categories,
         'recommended_skills': recommended_skills,
-        'enrolled_skills_count': 0,  # Placeholder - implement when enrollment system is ready
-        'completed_courses_count': 0,  # Placeholder - implement when completion tracking is ready
+        'enrolled_skills_count': learning['enrolled'],
+        'completed_courses_count': learning['completed'],
     }
     
     return render(request, 'accounts/dashboard.html', context)
@@ -204,16 +235,16 @@ def profile(request):
     user = get_object_or_404(User, id=user_id)
     
     # Get choices for dropdowns
-    universities = University.objects.all()
-    departments = Department.objects.all()
-    branches = Branch.objects.all()
+    universities = catalog.universities()
+    departments = catalog.departments()
+    branches = catalog.branches()
     
     # Get user's skills
     user_skills = UserSkills.objects.filter(user=user).select_related('skill__category')
-    user_skill_ids = [us.skill.id for us in user_skills]
+    user_skill_ids = {us.skill.id for us in user_skills}
     
     # Get available skills (skills not added by user)
-    available_skills = Skills.objects.exclude(id__in=user_skill_ids).select_related('category')
+    available_skills = [skill for skill in catalog.skills() if skill.id not in user_skill_ids]
     
     context = {
         'custom_user': user,
@@ -1,3 +1,256 @@
+import base64
+import json
+from datetime import timedelta
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from apps.accounts.models import User
+from apps.blog.models import Blog
+from apps.category_skills.models import SkillsCategory, Skills, UserSkills
+from apps.core import typeahead
+from apps.core.pagination import encode_cursor
+from apps.core.variants import build_skills_variant
+from .views import InfiniteScrollPagination
 
-# Create your tests here.
+# Queries for one skills variant: seq range, sampled skills, teacher pairing
+COURSES_QUERY_BUDGET = 3
+
+
+class HomeAPICoursesViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = SkillsCategory.objects.create(name="Technology", description="Technology related courses")
+        cls.skills = [
+            Skills.objects.create(name=f"Skill {i}", category=category, description=f"Skill {i} description")
+            for i in range(20)
+        ]
+        cls.users = [
+            User.objects.create(
+                username=f"user{i}", first_name="Demo", last_name=f"User{i}",
+                gender="M", personal_email=f"user{i}@example.com", year="1",
+            )
+            for i in range(10)
+        ]
+        # Every skill gets at least two teachers
+        for i, skill in enumerate(cls.skills):
+            UserSkills.objects.create(user=cls.users[i % 10], skill=skill)
+            UserSkills.objects.create(user=cls.users[(i + 1) % 10], skill=skill)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_returns_six_skills_with_teacher(self):
+        response = self.client.get(reverse("api:home-courses-api"))
+
+        skills = response.json()["skills"]
+        self.assertEqual(len(skills), 6)
+        self.assertEqual(len({skill["id"] for skill in skills}), 6)
+        for skill in skills:
+            self.assertIsNotNone(skill["student"])
+
+    def test_query_budget(self):
+        with self.assertNumQueries(COURSES_QUERY_BUDGET):
+            build_skills_variant()
+
+    def test_query_budget_does_not_grow_with_catalog(self):
+        category = SkillsCategory.objects.get(name="Technology")
+        for i in range(20, 60):
+            skill = Skills.objects.create(name=f"Skill {i}", category=category, description="More skills")
+            UserSkills.objects.create(user=self.users[i % 10], skill=skill)
+            UserSkills.objects.create(user=self.users[(i + 3) % 10], skill=skill)
+
+        with self.assertNumQueries(COURSES_QUERY_BUDGET):
+            build_skills_variant()
+
+    def test_warm_pool_needs_no_queries(self):
+        self.client.get(reverse("api:home-courses-api"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("api:home-courses-api"))
+        self.assertEqual(len(response.json()["skills"]), 6)
+
+    def test_excludes_logged_in_user(self):
+        self.client.get(reverse("api:home-courses-api"))
+        session = self.client.session
+        session["user_id"] = self.users[0].id
+        session.save()
+
+        # Only the session is loaded
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("api:home-courses-api"))
+
+        for skill in response.json()["skills"]:
+            self.assertNotEqual(skill["student"]["last_name"], "User0")
+
+
+class HomeAPIInstructorViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = SkillsCategory.objects.create(name="Technology", description="Technology related courses")
+        skill = Skills.objects.create(name="Python", category=category, description="Scripting")
+        cls.users = [
+            User.objects.create(
+                username=f"user{i}", first_name="Demo", last_name=f"User{i}",
+                gender="M", personal_email=f"user{i}@example.com", year="1",
+            )
+            for i in range(12)
+        ]
+        for user in cls.users:
+            UserSkills.objects.create(user=user, skill=skill)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cold_pool_queries_do_not_grow_with_instructors(self):
+        # The instructor id array, then one page of users with their stats
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("api:home-instructors-api"))
+        self.assertEqual(len(response.json()["instructors_data"]), 8)
+
+        category = SkillsCategory.objects.get()
+        for i in range(12, 40):
+            user = User.objects.create(
+                username=f"user{i}", first_name="Demo", last_name=f"User{i}",
+                gender="M", personal_email=f"user{i}@example.com", year="1",
+            )
+            UserSkills.objects.create(user=user, skill=Skills.objects.create(name=f"Skill {i}", category=category))
+        cache.clear()
+        with self.assertNumQueries(2):
+            self.client.get(reverse("api:home-instructors-api"))
+
+    def test_warm_pool_excludes_logged_in_user(self):
+        self.client.get(reverse("api:home-instructors-api"))
+        session = self.client.session
+        session["user_id"] = self.users[0].id
+        session.save()
+
+        for _ in range(5):
+            # Only the session is loaded
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse("api:home-instructors-api"))
+            instructors = response.json()["instructors_data"]
+            self.assertEqual(len(instructors), 8)
+            self.assertNotIn(self.users[0].id, [instructor["user"]["id"] for instructor in instructors])
+
+
+class TypeaheadAPIViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = SkillsCategory.objects.create(name="Technology", description="Technology related courses")
+        cls.python = Skills.objects.create(name="Python", category=category, description="Scripting")
+        cls.teacher = User.objects.create(
+            username="pat", first_name="Pat", last_name="Python",
+            gender="M", personal_email="pat@example.com", year="1",
+        )
+        UserSkills.objects.create(user=cls.teacher, skill=cls.python)
+
+    def setUp(self):
+        cache.clear()
+        for index in typeahead.INDEXES.values():
+            index.reset()
+
+    def test_suggests_every_kind(self):
+        response = self.client.get(reverse("api:typeahead-api"), {"q": "pyt"})
+
+        self.assertEqual(response.json(), {
+            "skills": [{"id": self.python.id, "label": "Python", "url": f"/courses/course_details/{self.python.id}/"}],
+            "instructors": [{"id": self.teacher.id, "label": "Pat Python", "url": f"/courses/instructor/{self.teacher.id}/"}],
+            "universities": [],
+        })
+
+    def test_warm_index_needs_no_queries(self):
+        url = reverse("api:typeahead-api")
+        self.client.get(url, {"q": "p", "kind": "skills"})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"q": "p", "kind": "skills"})
+        self.assertEqual(list(response.json()), ["skills"])
+
+    def test_rejects_unknown_kind(self):
+        response = self.client.get(reverse("api:typeahead-api"), {"q": "p", "kind": "blogs"})
+        self.assertEqual(response.status_code, 400)
+
+
+class BlogAPIPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = SkillsCategory.objects.create(name="Technology", description="Technology related courses")
+        cls.author = User.objects.create(
+            username="author", first_name="Demo", last_name="Author",
+            gender="M", personal_email="author@example.com", year="1",
+        )
+        cls.blogs = [Blog.objects.create(author=cls.author, title=f"Blog {i}", category=category) for i in range(9)]
+        Blog.objects.create(author=cls.author, title="Draft", category=category, is_published=False)
+        # Pairs of blogs share a created_at, so the id has to break the ties
+        now = timezone.now()
+        for i, blog in enumerate(cls.blogs):
+            blog.created_at = now - timedelta(minutes=i // 2)
+            Blog.objects.filter(pk=blog.pk).update(created_at=blog.created_at)
+        cls.newest_first = sorted(cls.blogs, key=lambda blog: (blog.created_at, blog.pk), reverse=True)
+
+    def get(self, url=None, **params):
+        response = self.client.get(url or reverse("api:blog-api"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def ids(self, page):
+        return [blog["id"] for blog in page["results"]]
+
+    def test_walks_forward_newest_first(self):
+        seen, page = [], self.get(page_size=4)
+        self.assertIsNone(page["previous"])
+        while True:
+            seen += self.ids(page)
+            if not page["next"]:
+                break
+            page = self.get(page["next"])
+            self.assertIsNotNone(page["previous"])
+
+        self.assertEqual(seen, [blog.pk for blog in self.newest_first])
+
+    def test_walks_back_to_the_same_pages(self):
+        first = self.get(page_size=4)
+        second = self.get(first["next"])
+        third = self.get(second["next"])
+        self.assertIsNone(third["next"])
+
+        back = self.get(third["previous"])
+        self.assertEqual(self.ids(back), self.ids(second))
+        self.assertEqual(self.ids(self.get(back["previous"])), self.ids(first))
+
+    def test_cursor_between_created_at_ties(self):
+        # blogs 0 and 1 share a created_at; a cursor on the first must still return the second
+        tied = [blog for blog in self.newest_first if blog.created_at == self.blogs[0].created_at]
+        self.assertEqual(len(tied), 2)
+
+        page = self.get(cursor=encode_cursor(tied[0]), page_size=1)
+        self.assertEqual(self.ids(page), [tied[1].pk])
+        page = self.get(cursor=encode_cursor(tied[1], reverse=True), page_size=1)
+        self.assertEqual(self.ids(page), [tied[0].pk])
+
+    def test_bad_cursor_is_404(self):
+        tampered = base64.urlsafe_b64encode(json.dumps(["yesterday", 1, 0]).encode()).decode()
+        for cursor in ["not-a-cursor", "!!!", tampered]:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse("api:blog-api"), {"cursor": cursor})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {"detail": "Invalid cursor"})
+
+    def test_page_size_is_clamped(self):
+        paginator = InfiniteScrollPagination()
+        factory = APIRequestFactory()
+        for value, expected in [("10", 10), ("50", 50), ("500", 50), ("0", 6), ("-3", 6), ("ten", 6), (None, 6)]:
+            with self.subTest(page_size=value):
+                params = {} if value is None else {"page_size": value}
+                request = Request(factory.get(reverse("api:blog-api"), params))
+                self.assertEqual(paginator.get_page_size(request), expected)
+
+        self.assertEqual(len(self.get()["results"]), 6)
+        self.assertEqual(len(self.get(page_size=500)["results"]), 9)
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import HomeAPICoursesView , HomeAPIInstructorView , BlogAPIView
+from .views import HomeAPICoursesView , HomeAPIInstructorView , BlogAPIView , TypeaheadAPIView
 
 app_name = 'api'
 
@@ -7,4 +7,5 @@ urlpatterns = [
    path("api/courses/", HomeAPICoursesView.as_view(), name="home-courses-api"),
    path("api/instructors/" , HomeAPIInstructorView.as_view(), name="home-instructors-api" ),
    path("api/blogs/" , BlogAPIView.as_view() , name="blog-api"),
+   path("api/typeahead/" , TypeaheadAPIView.as_view() , name="typeahead-api"),
 ]
\ No newline at end of file
@@ -1,13 +1,14 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from apps.accounts.models import User
-from apps.category_skills.models import Skills, UserSkills
-from apps.category_skills.serializers import SkillSerializer , InstructorSerializer
+from apps.core.variants import home_skills , home_instructors
+from apps.core import typeahead
 from apps.blog.serializers import BlogSerializer
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import BasePagination
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.utils.urls import replace_query_param
+from apps.core.pagination import keyset_page , InvalidCursor
 from apps.blog.models import Blog
-import random
 
 # API to fetch the courses in HomePage
 class HomeAPICoursesView(APIView):
@@ -16,31 +17,8 @@ class HomeAPICoursesView(APIView):
     def get(self, request):
         user_id = request.session.get("user_id")
 
-        # Get all user_skills, optionally excluding current user
-        user_skills_qs = UserSkills.objects.all()
-        if user_id:
-            user_skills_qs = user_skills_qs.exclude(user_id=user_id)
-
-        # Get unique skill IDs
-        skill_ids = list(user_skills_qs.values_list('skill_id', flat=True).distinct())
-        random.shuffle(skill_ids)
-        skill_ids = skill_ids[:6]
-
-        # For each skill, pick a random user who has it
-        skill_to_user = {}
-        for skill_id in skill_ids:
-            users_for_skill = list(user_skills_qs.filter(skill_id=skill_id).values_list('user_id', flat=True))
-            skill_to_user[skill_id] = random.choice(users_for_skill)
-
-        # Fetch actual Skills objects
-        skills = Skills.objects.filter(id__in=skill_ids)
-
-        # Serialize with random user context
-        flattened_skills = []
-        for skill in skills:
-            user_for_context = User.objects.get(id=skill_to_user[skill.id])
-            skill_data = SkillSerializer(skill, context={"user": user_for_context}).data
-            flattened_skills.append(skill_data)
+        # Served from the pre-built home page variants
+        flattened_skills = home_skills(user_id)
 
         return Response({"skills": flattened_skills})
 
@@ -51,36 +29,62 @@ class HomeAPIInstructorView(APIView):
     def get(self, request):
         user_id = request.session.get("user_id")
 
-        # Get all users who have added skills
-        users_with_skills = User.objects.filter(user_skills__isnull=False).distinct().prefetch_related('user_skills__skill__category')
+        # Served from the pre-built home page variants
+        instructors_data = home_instructors(user_id)
 
-        if user_id:
-            users_with_skills = users_with_skills.exclude(id=user_id)
+        return Response({"instructors_data": instructors_data})
 
-        # Shuffle and pick 8 random instructors
-        users_list = list(users_with_skills)
-        random.shuffle(users_list)
-        selected_users = users_list[:8]
 
-        # Prepare instructor data
-        instructors_data = []
-        for user in selected_users:
-            user_skills = [us.skill for us in user.user_skills.all()]
-            instructors_data.append({
-                'user': user,
-                'skills': user_skills[:3],
-                'skills_count': len(user_skills)
-            })
+# API for the search box suggestions, answered from in-process prefix indexes
+class TypeaheadAPIView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        kinds = request.query_params.getlist("kind")
+        unknown = [kind for kind in kinds if kind not in typeahead.INDEXES]
+        if unknown:
+            raise ValidationError({"kind": f"Unknown kind: {', '.join(unknown)}"})
+        try:
+            limit = int(request.query_params.get("limit", typeahead.TYPEAHEAD_LIMIT))
+        except ValueError:
+            raise ValidationError({"limit": "Must be a number."})
 
-        serializer = InstructorSerializer(instructors_data, many=True)
-        return Response({"instructors_data": serializer.data})
+        return Response(typeahead.search(request.query_params.get("q", ""), kinds, limit))
 
 
-# Custom pagination for infinite scroll
-class InfiniteScrollPagination(PageNumberPagination):
+# Custom cursor pagination for infinite scroll, keyed on (created_at, id)
+class InfiniteScrollPagination(BasePagination):
     page_size = 6  # how many blogs to load per request
     page_size_query_param = "page_size"  # allow client to override ?page_size=10
     max_page_size = 50
+    cursor_query_param = "cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            self.page = keyset_page(queryset, request.query_params.get(self.cursor_query_param), self.get_page_size(request))
+        except InvalidCursor:
+            raise NotFound("Invalid cursor")
+        return list(self.page)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(page_size, self.max_page_size) if page_size > 0 else self.page_size
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_link(self.page.next_cursor),
+            "previous": self.get_link(self.page.previous_cursor),
+            "results": data,
+        })
 
 # API View to fetch the blogs
 class BlogAPIView(APIView):
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_alter_blogimages_small'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['is_published', '-created_at', '-id'], name='blogs_feed_idx'),
+        ),
+    ]
@@ -13,6 +13,10 @@ class Blog(models.Model):
     class Meta:
         db_table = "blogs"
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the blog feed (newest first)
+            models.Index(fields=['is_published', '-created_at', '-id'], name='blogs_feed_idx'),
+        ]
 
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="blogs")
     title = models.CharField(max_length=255)
@@ -28,7 +28,8 @@ class BlogSerializer(serializers.ModelSerializer):
         fields = ["id" , "author" , "title" , "category" , "thumbnail_image" , "created_at"]
 
     def get_thumbnail_image(self, obj):
-        thumbnail_image = obj.images.filter(thumbnail=True).first()
+        # Read from the images the view prefetched, a filter() would query per blog
+        thumbnail_image = next((image for image in obj.images.all() if image.thumbnail), None)
         if thumbnail_image:
             request = self.context.get("request")
             return request.build_absolute_uri(thumbnail_image.image.url) if request else thumbnail_image.image.url
@@ -3,6 +3,7 @@ from .models import Blog , BlogSection , BlogImages
 from apps.accounts.views import login_required_custom
 from apps.accounts.models import User
 from apps.category_skills.models import SkillsCategory
+from apps.core import catalog
 from django.contrib import messages
 from django.core.files.storage import default_storage
 
@@ -15,7 +16,7 @@ def BlogView(request):
     if custom_user:
         blogs = blogs.exclude(author=custom_user)
 
-    categories = SkillsCategory.objects.all().order_by("name")
+    categories = catalog.skill_categories()
 
     return render(request, "blog/blog.html", {"blogs": blogs, "categories": categories})
 
@@ -59,7 +60,7 @@ def BlogProfileView(request):
 def AddBlogView(request):
     user_id = request.session.get("user_id")    
     user = get_object_or_404(User, id=user_id)
-    categories = SkillsCategory.objects.all()
+    categories = catalog.skill_categories()
 
     if request.method == "POST":
         title = request.POST.get("title")
@@ -118,7 +119,7 @@ def BlogEditView(request, pk):
         pk=pk,
         author=user,
     )
-    categories = SkillsCategory.objects.all()
+    categories = catalog.skill_categories()
 
     if request.method == "POST":
         blog.title = request.POST.get("title")
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import SkillsCategory , Skills, UserSkills, Request, Session
+from .models import SkillsCategory , Skills, UserSkills, TeachableSkill, Request, Session, TeacherRating, TeacherSkillRating, SkillRecommendation, TeacherSkillScore
 
 @admin.register(SkillsCategory)
 class SkillsCategoryAdmin(admin.ModelAdmin):
@@ -19,6 +19,66 @@ class UserSkillsAdmin(admin.ModelAdmin):
     date_hierarchy = 'added_at'
 
 
+@admin.register(TeachableSkill)
+class TeachableSkillAdmin(admin.ModelAdmin):
+    list_display = ['skill', 'teacher_count', 'seq', 'updated_at']
+    search_fields = ['skill__name']
+    readonly_fields = ['skill', 'teacher_count', 'seq', 'updated_at']
+
+    # Rows are maintained by UserSkills signals
+    def has_add_permission(self, request):
+        return False
+
+
+RATING_FIELDS = ['count', 'total', 'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5', 'updated_at']
+
+
+@admin.register(TeacherRating)
+class TeacherRatingAdmin(admin.ModelAdmin):
+    list_display = ['teacher', 'mean', 'count', 'updated_at']
+    search_fields = ['teacher__username', 'teacher__first_name', 'teacher__last_name']
+    readonly_fields = ['teacher', *RATING_FIELDS]
+
+    # Rows are maintained by leave_feedback
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(TeacherSkillRating)
+class TeacherSkillRatingAdmin(admin.ModelAdmin):
+    list_display = ['teacher', 'skill', 'mean', 'count', 'updated_at']
+    search_fields = ['teacher__username', 'skill__name']
+    readonly_fields = ['teacher', 'skill', *RATING_FIELDS]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(SkillRecommendation)
+class SkillRecommendationAdmin(admin.ModelAdmin):
+    list_display = ['user', 'rank', 'skill', 'score']
+    search_fields = ['user__username', 'skill__name']
+    list_select_related = ['user', 'skill']
+    readonly_fields = ['user', 'rank', 'skill', 'score']
+
+    # Rows are rebuilt by the recommend_skills command
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(TeacherSkillScore)
+class TeacherSkillScoreAdmin(admin.ModelAdmin):
+    list_display = ['teacher', 'skill', 'score', 'rating', 'acceptance_rate', 'median_response', 'pending_count']
+    search_fields = ['teacher__username', 'skill__name']
+    list_select_related = ['teacher', 'skill']
+    readonly_fields = [
+        'teacher', 'skill', 'score', 'rating', 'acceptance_rate', 'median_response', 'pending_count', 'computed_at',
+    ]
+
+    # Rows are rebuilt by the rank_teachers command
+    def has_add_permission(self, request):
+        return False
+
 @admin.register(Request)
 class RequestAdmin(admin.ModelAdmin):
     list_display = ['requester', 'receiver', 'skill', 'status', 'created_at', 'responded_at']
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CategorySkillsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.category_skills'
+
+    def ready(self):
+        from . import signals  # noqa: F401
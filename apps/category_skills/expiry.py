@@ -0,0 +1,76 @@
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from apps.notifications.models import Notification
+from .models import Skills, Request, Session
+from . import transitions
+
+# Pending requests nobody answered and sessions whose date went by without
+# being started are moved to Expired by the expire_stale command. Rows are
+# found through the (status, created_at) and (status, scheduled_date)
+# indexes and expired a chunk at a time, each chunk one UPDATE and one
+# notification insert in its own short transaction.
+REQUEST_TTL = timedelta(days=14)
+# Sessions expire this long after their scheduled start
+SESSION_GRACE = timedelta(days=1)
+CHUNK_SIZE = 500
+
+
+def _sweep(model, date_field, cutoff, notifications, chunk_size):
+    """Expire ``model`` rows whose ``date_field`` is before ``cutoff``; returns how many"""
+    expired = 0
+    # One status at a time: with a single status the (status, date) index
+    # returns rows already in date order, an IN over several would be re-sorted
+    # on every chunk
+    for status in transitions.TRANSITIONS[model]["expire"].sources:
+        stale = (
+            model.objects.filter(status=status, **{f"{date_field}__lt": cutoff})
+            .order_by(date_field, "pk")
+            .values_list("pk", flat=True)
+        )
+        while True:
+            pks = list(stale[:chunk_size])
+            if not pks:
+                break
+            with transaction.atomic():
+                # Rows answered since the SELECT are left alone by the status guard
+                rows = transitions.apply_many(model, "expire", pks)
+                Notification.objects.bulk_create(notifications(rows))
+            expired += len(rows)
+    return expired
+
+
+def _request_notifications(rows):
+    skill_names = dict(Skills.objects.filter(id__in={row.skill_id for row in rows}).values_list("id", "name"))
+    return [
+        Notification(
+            recipient_id=row.requester_id,
+            notification_type="request_expired",
+            title="Request Expired",
+            message=f"Your request to learn {skill_names[row.skill_id]} expired without an answer.",
+            content_object=row,
+        )
+        for row in rows
+    ]
+
+
+def _session_notifications(rows):
+    return [
+        Notification(
+            recipient_id=recipient_id,
+            notification_type="session_expired",
+            title="Session Expired",
+            message=f'Session "{row.title}" was never started and has expired.',
+            content_object=row,
+        )
+        for row in rows
+        for recipient_id in [row.teacher_id, row.learner_id]
+    ]
+
+
+def expire_requests(ttl=REQUEST_TTL, chunk_size=CHUNK_SIZE):
+    return _sweep(Request, "created_at", timezone.now() - ttl, _request_notifications, chunk_size)
+
+
+def expire_sessions(grace=SESSION_GRACE, chunk_size=CHUNK_SIZE):
+    return _sweep(Session, "scheduled_date", timezone.now() - grace, _session_notifications, chunk_size)
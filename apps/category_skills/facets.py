@@ -0,0 +1,52 @@
+import hashlib
+from collections import Counter
+from django.db.models import Count
+from apps.core.cache import get_or_set
+from apps.core.catalog import model_tag
+from .models import SkillsCategory, Skills, UserSkills
+from .search import tokens
+
+FACETS_TTL = 5 * 60
+FACET_TAGS = [model_tag(Skills), model_tag(SkillsCategory), model_tag(UserSkills)]
+
+
+def facet_signature(user_id=None, search_query=None):
+    """Cache key for the facet grid of one search state.
+
+    Category and level selections are not part of it: every combination
+    is derived from the same grid.
+    """
+    state = f"{user_id or 0}:{' '.join(tokens(search_query))}"
+    return hashlib.md5(state.encode()).hexdigest()
+
+
+def facet_grid(queryset, signature):
+    """(category_id, level, count) rows of ``queryset`` from one GROUP BY"""
+    return get_or_set(
+        "facets", signature,
+        lambda: list(queryset.order_by().values_list("category_id", "level").annotate(total=Count("pk"))),
+        ttl=FACETS_TTL, tags=FACET_TAGS,
+    )
+
+
+def skill_facets(queryset, signature, category_ids=(), levels=()):
+    """Match counts per category and per level for the current filters.
+
+    Each facet counts with every filter but its own, so an option's count
+    is the number of results selecting it would show.
+    """
+    category_ids = {int(category_id) for category_id in category_ids if str(category_id).isdigit()}
+    levels = set(levels)
+
+    categories, level_counts = Counter(), Counter()
+    for category_id, level, total in facet_grid(queryset, signature):
+        if not levels or level in levels:
+            categories[category_id] += total
+        if not category_ids or category_id in category_ids:
+            level_counts[level] += total
+    return {
+        "categories": dict(categories),
+        "levels": dict(level_counts),
+        "all_categories": sum(categories.values()),
+        "all_levels": sum(level_counts.values()),
+    }
@@ -0,0 +1,87 @@
+import threading
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from apps.accounts.models import User
+from apps.category_skills import transitions
+from apps.category_skills.models import Skills, Request
+
+
+def guarded_accept(pk):
+    return transitions.apply(Request, 'accept', pk) is not None
+
+
+def load_check_save_accept(pk):
+    """How the views used to do it, for comparison"""
+    skill_request = Request.objects.get(pk=pk)
+    if skill_request.status != 'P':
+        return False
+    skill_request.status = 'A'
+    skill_request.responded_at = timezone.now()
+    skill_request.save()
+    return True
+
+
+class Command(BaseCommand):
+    help = 'Hammer one request with concurrent accepts and report throughput and double transitions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent accepts per round')
+        parser.add_argument('--rounds', type=int, default=50, help='Times the request is reset to pending')
+
+    def race(self, accept, pk, threads, rounds):
+        """(seconds, attempts, rounds won more than once, errors)"""
+        doubled, errors, elapsed = 0, [], 0.0
+        for _ in range(rounds):
+            Request.objects.filter(pk=pk).update(status='P', responded_at=None)
+            barrier = threading.Barrier(threads)
+            wins = []
+
+            def attempt():
+                try:
+                    barrier.wait()
+                    if accept(pk):
+                        wins.append(1)
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    connection.close()
+
+            workers = [threading.Thread(target=attempt) for _ in range(threads)]
+            started = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed += time.perf_counter() - started
+            doubled += len(wins) > 1
+        return elapsed, threads * rounds, doubled, errors
+
+    def handle(self, *args, **options):
+        users = list(User.objects.order_by('id')[:2])
+        skill = Skills.objects.order_by('id').first()
+        if len(users) < 2 or skill is None:
+            raise CommandError('Needs two users and a skill, seed some data first')
+
+        skill_request, created = Request.objects.get_or_create(
+            requester=users[0], receiver=users[1], skill=skill,
+            defaults={'description': 'Transition benchmark'},
+        )
+        try:
+            for label, accept in [('guarded update', guarded_accept), ('load, check, save', load_check_save_accept)]:
+                elapsed, attempts, doubled, errors = self.race(
+                    accept, skill_request.pk, options['threads'], options['rounds'],
+                )
+                self.stdout.write(
+                    f"{label}: {attempts / elapsed:.0f} attempts/s, "
+                    f"{doubled}/{options['rounds']} rounds accepted more than once, {len(errors)} errors"
+                )
+                for error in errors[:3]:
+                    self.stdout.write(f"  {type(error).__name__}: {error}")
+        finally:
+            if created:
+                skill_request.delete()
+            else:
+                # An existing request was borrowed, put it back as it was
+                skill_request.save(update_fields=['status', 'responded_at'])
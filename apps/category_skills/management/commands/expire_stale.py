@@ -0,0 +1,23 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from apps.category_skills import expiry
+
+
+class Command(BaseCommand):
+    help = 'Expire unanswered requests and sessions that were never started, run periodically'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--request-days', type=int, default=expiry.REQUEST_TTL.days,
+                            help='Age after which a pending request expires')
+        parser.add_argument('--session-hours', type=int, default=int(expiry.SESSION_GRACE.total_seconds() // 3600),
+                            help='Hours after its scheduled date that an unstarted session expires')
+        parser.add_argument('--chunk-size', type=int, default=expiry.CHUNK_SIZE, help='Rows expired per transaction')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        requests = expiry.expire_requests(timedelta(days=options['request_days']), options['chunk_size'])
+        sessions = expiry.expire_sessions(timedelta(hours=options['session_hours']), options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Expired {requests} requests and {sessions} sessions in {time.perf_counter() - started:.1f}s!'
+        ))
@@ -0,0 +1,28 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.category_skills.ranking import rank_stale_teachers, rebuild_teacher_scores
+from apps.core.bulk import BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Rescore every teacher of every skill for the course page ranking, run periodically'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--stale', action='store_true',
+            help='Only rescore teachers whose skills, requests or ratings changed since their last scoring',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['stale']:
+            rescored = rank_stale_teachers(options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Rescored {rescored} stale teachers in {time.perf_counter() - started:.1f}s!'
+            ))
+            return
+        scored = rebuild_teacher_scores(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Scored {scored} teacher skills in {time.perf_counter() - started:.1f}s!'
+        ))
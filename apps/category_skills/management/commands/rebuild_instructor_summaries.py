@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.category_skills.summaries import rebuild_user_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute the skills_count and top_skills summary shown on instructor cards'
+
+    def handle(self, *args, **options):
+        updated = rebuild_user_summaries()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt instructor summaries for {updated} users!'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.category_skills.ratings import rebuild_rating_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the teacher rating statistics from the learner ratings of every session'
+
+    def handle(self, *args, **options):
+        rated = rebuild_rating_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rating statistics for {rated} teachers!'))
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.category_skills import recommendations
+from apps.core.bulk import BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Recompute the skill recommendations shown on every dashboard'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=recommendations.TOP_N, help='Recommendations kept per user')
+        parser.add_argument('--neighbours', type=int, default=recommendations.NEIGHBOURS,
+                            help='Similar skills kept per skill')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        sizes = recommendations.rebuild_recommendations(options['top'], options['neighbours'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {sizes['recommendations']} recommendations for {sizes['users']} users "
+            f"from {sizes['interactions']} interactions over {sizes['skills']} skills "
+            f"in {time.perf_counter() - started:.1f}s!"
+        ))
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_teachable_skills(apps, schema_editor):
+    UserSkills = apps.get_model('category_skills', 'UserSkills')
+    TeachableSkill = apps.get_model('category_skills', 'TeachableSkill')
+
+    counts = UserSkills.objects.values('skill_id').annotate(teachers=models.Count('id')).order_by('skill_id')
+    TeachableSkill.objects.bulk_create([
+        TeachableSkill(skill_id=row['skill_id'], teacher_count=row['teachers'], seq=position)
+        for position, row in enumerate(counts, start=1)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category_skills', '0007_alter_session_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeachableSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('teacher_count', models.PositiveIntegerField(default=0)),
+                ('seq', models.PositiveIntegerField(help_text='Dense position used for random sampling', unique=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('skill', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='teachable', to='category_skills.skills')),
+            ],
+            options={
+                'verbose_name_plural': 'Teachable Skills',
+                'db_table': 'teachable_skills',
+                'ordering': ['seq'],
+            },
+        ),
+        migrations.RunPython(backfill_teachable_skills, migrations.RunPython.noop),
+    ]
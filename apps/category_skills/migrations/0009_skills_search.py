@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:05
+
+from django.db import migrations
+
+# Frozen copies of apps.category_skills.search as of this migration, so
+# later changes to that module cannot change what this migration does.
+SEARCH_TABLE = 'skills_search'
+
+FILL_SQL = {
+    'sqlite': (
+        f"INSERT INTO {SEARCH_TABLE} (rowid, name, description, category) "
+        "SELECT s.id, s.name, s.description, c.name "
+        "FROM category_skills s JOIN category c ON c.id = s.category_id"
+    ),
+    'postgresql': (
+        f"INSERT INTO {SEARCH_TABLE} (skill_id, document) "
+        "SELECT s.id, setweight(to_tsvector('simple', s.name), 'A') "
+        "|| setweight(to_tsvector('simple', s.description), 'C') "
+        "|| setweight(to_tsvector('simple', c.name), 'B') "
+        "FROM category_skills s JOIN category c ON c.id = s.category_id"
+    ),
+}
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+            "name, description, category, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f"CREATE TABLE {SEARCH_TABLE} ("
+            "skill_id bigint PRIMARY KEY REFERENCES category_skills (id) ON DELETE CASCADE, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(f"CREATE INDEX {SEARCH_TABLE}_document_idx ON {SEARCH_TABLE} USING GIN (document)")
+    else:
+        return
+    schema_editor.execute(FILL_SQL[connection.vendor])
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category_skills', '0008_teachableskill'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
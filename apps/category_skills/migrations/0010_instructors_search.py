@@ -0,0 +1,65 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:40
+
+from django.db import migrations
+
+# Frozen copies of apps.category_skills.search as of this migration, so
+# later changes to that module cannot change what this migration does.
+INSTRUCTORS_TABLE = 'instructors_search'
+
+SOURCE = (
+    "FROM userprofile u LEFT JOIN user_skills us ON us.user_id = u.id "
+    "LEFT JOIN category_skills s ON s.id = us.skill_id GROUP BY u.id"
+)
+
+FILL_SQL = {
+    'sqlite': (
+        f"INSERT INTO {INSTRUCTORS_TABLE} (rowid, name, bio, skills) "
+        "SELECT u.id, u.first_name || ' ' || u.last_name, u.bio, COALESCE(group_concat(s.name, ' '), '') "
+        f"{SOURCE}"
+    ),
+    'postgresql': (
+        f"INSERT INTO {INSTRUCTORS_TABLE} (user_id, document) "
+        "SELECT u.id, setweight(to_tsvector('simple', u.first_name || ' ' || u.last_name), 'A') "
+        "|| setweight(to_tsvector('simple', u.bio), 'C') "
+        "|| setweight(to_tsvector('simple', COALESCE(string_agg(s.name, ' '), '')), 'B') "
+        f"{SOURCE}"
+    ),
+}
+
+
+def create_instructor_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {INSTRUCTORS_TABLE} USING fts5("
+            "name, bio, skills, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f"CREATE TABLE {INSTRUCTORS_TABLE} ("
+            "user_id bigint PRIMARY KEY REFERENCES userprofile (id) ON DELETE CASCADE, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX {INSTRUCTORS_TABLE}_document_idx ON {INSTRUCTORS_TABLE} USING GIN (document)"
+        )
+    else:
+        return
+    schema_editor.execute(FILL_SQL[connection.vendor])
+
+
+def drop_instructor_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {INSTRUCTORS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_card_summary'),
+        ('category_skills', '0009_skills_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_instructor_index, drop_instructor_index),
+    ]
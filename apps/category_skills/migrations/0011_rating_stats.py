@@ -0,0 +1,78 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:52
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+import django.db.models.deletion
+
+
+def backfill_rating_stats(apps, schema_editor):
+    Session = apps.get_model('category_skills', 'Session')
+    TeacherRating = apps.get_model('category_skills', 'TeacherRating')
+    TeacherSkillRating = apps.get_model('category_skills', 'TeacherSkillRating')
+
+    rated = Session.objects.filter(learner_rating__isnull=False).order_by()
+    aggregates = {
+        'count': Count('id'),
+        'total': Sum('learner_rating'),
+        **{f'rating_{rating}': Count('id', filter=Q(learner_rating=rating)) for rating in range(1, 6)},
+    }
+    TeacherSkillRating.objects.bulk_create(
+        [TeacherSkillRating(**row) for row in rated.values('teacher_id', 'skill_id').annotate(**aggregates)],
+        batch_size=1000,
+    )
+    TeacherRating.objects.bulk_create(
+        [TeacherRating(**row) for row in rated.values('teacher_id').annotate(**aggregates)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_card_summary'),
+        ('category_skills', '0010_instructors_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeacherRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0, help_text='Sum of all ratings')),
+                ('rating_1', models.PositiveIntegerField(default=0)),
+                ('rating_2', models.PositiveIntegerField(default=0)),
+                ('rating_3', models.PositiveIntegerField(default=0)),
+                ('rating_4', models.PositiveIntegerField(default=0)),
+                ('rating_5', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('teacher', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rating_stats', to='accounts.user')),
+            ],
+            options={
+                'verbose_name_plural': 'Teacher Ratings',
+                'db_table': 'teacher_ratings',
+            },
+        ),
+        migrations.CreateModel(
+            name='TeacherSkillRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0, help_text='Sum of all ratings')),
+                ('rating_1', models.PositiveIntegerField(default=0)),
+                ('rating_2', models.PositiveIntegerField(default=0)),
+                ('rating_3', models.PositiveIntegerField(default=0)),
+                ('rating_4', models.PositiveIntegerField(default=0)),
+                ('rating_5', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_stats', to='category_skills.skills')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_rating_stats', to='accounts.user')),
+            ],
+            options={
+                'verbose_name_plural': 'Teacher Skill Ratings',
+                'db_table': 'teacher_skill_ratings',
+                'unique_together': {('teacher', 'skill')},
+            },
+        ),
+        migrations.RunPython(backfill_rating_stats, migrations.RunPython.noop),
+    ]
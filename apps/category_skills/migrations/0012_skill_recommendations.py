@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_card_summary'),
+        ('category_skills', '0011_rating_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(help_text='1 is the best recommendation')),
+                ('score', models.FloatField()),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='category_skills.skills')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_recommendations', to='accounts.user')),
+            ],
+            options={
+                'verbose_name_plural': 'Skill Recommendations',
+                'db_table': 'skill_recommendations',
+                'ordering': ['user', 'rank'],
+                'unique_together': {('user', 'rank')},
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_card_summary'),
+        ('category_skills', '0012_skill_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeacherSkillScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='0 to 1, higher is listed first')),
+                ('rating', models.FloatField(blank=True, help_text='Mean learner rating for this skill', null=True)),
+                ('acceptance_rate', models.FloatField(blank=True, help_text='Share of answered requests accepted', null=True)),
+                ('median_response', models.DurationField(blank=True, help_text='Typical time to answer a request', null=True)),
+                ('pending_count', models.PositiveIntegerField(default=0, help_text='Requests waiting for an answer')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='teacher_scores', to='category_skills.skills')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_scores', to='accounts.user')),
+            ],
+            options={
+                'verbose_name_plural': 'Teacher Skill Scores',
+                'db_table': 'teacher_skill_scores',
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['skill', '-score'], name='teacher_scores_rank_idx')],
+                'unique_together': {('teacher', 'skill')},
+            },
+        ),
+    ]
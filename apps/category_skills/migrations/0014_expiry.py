@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category_skills', '0013_teacher_skill_scores'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='request',
+            name='status',
+            field=models.CharField(choices=[('P', 'Pending'), ('A', 'Accepted'), ('R', 'Rejected'), ('C', 'Cancelled'), ('E', 'Expired')], default='P', max_length=1),
+        ),
+        migrations.AlterField(
+            model_name='session',
+            name='status',
+            field=models.CharField(choices=[('S', 'Scheduled'), ('A', 'Active'), ('C', 'Completed'), ('CA', 'Cancelled'), ('P', 'Pending'), ('E', 'Expired')], default='P', max_length=2),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['status', 'created_at'], name='requests_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['status', 'scheduled_date'], name='sessions_status_date_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category_skills', '0014_expiry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['receiver', '-created_at'], name='requests_receiver_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['requester', '-created_at'], name='requests_requester_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['teacher', '-created_at'], name='sessions_teacher_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['learner', '-created_at'], name='sessions_learner_created_idx'),
+        ),
+    ]
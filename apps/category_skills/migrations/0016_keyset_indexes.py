@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category_skills', '0015_advised_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='request',
+            name='requests_receiver_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='request',
+            name='requests_requester_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='session',
+            name='sessions_teacher_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='session',
+            name='sessions_learner_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['receiver', '-created_at', '-id'], name='requests_receiver_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['requester', '-created_at', '-id'], name='requests_requester_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['teacher', '-created_at', '-id'], name='sessions_teacher_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['learner', '-created_at', '-id'], name='sessions_learner_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category_skills', '0016_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaleTeacherScore',
+            fields=[
+                ('teacher_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('marked_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'Stale Teacher Scores',
+                'db_table': 'stale_teacher_scores',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category_skills', '0017_stale_teacher_scores'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['receiver', 'status', 'created_at'], name='requests_receiver_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['teacher', 'status'], name='sessions_teacher_status_idx'),
+        ),
+    ]
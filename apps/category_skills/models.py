@@ -64,6 +64,27 @@ class UserSkills(models.Model):
         return f"{self.user.username} - {self.skill.name}"
 
 
+class TeachableSkill(models.Model):
+    """Skills that at least one user can teach, kept in sync by UserSkills signals.
+
+    ``seq`` is a dense 1..N position so a random row can be picked without
+    ORDER BY RANDOM() or a DISTINCT join over user_skills.
+    """
+
+    class Meta:
+        ordering = ['seq']
+        db_table = 'teachable_skills'
+        verbose_name_plural = 'Teachable Skills'
+
+    skill = models.OneToOneField(Skills, on_delete=models.CASCADE, related_name='teachable')
+    teacher_count = models.PositiveIntegerField(default=0)
+    seq = models.PositiveIntegerField(unique=True, help_text="Dense position used for random sampling")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.skill.name} ({self.teacher_count} teachers)"
+
+
 class Request(models.Model):
 
     REQUEST_STATUS_CHOICES = (
@@ -71,11 +92,21 @@ class Request(models.Model):
         ('A', 'Accepted'),
         ('R', 'Rejected'),
         ('C', 'Cancelled'),
+        ('E', 'Expired'),
     )
 
     class Meta:
         db_table = 'skill_requests'
         unique_together = ['requester', 'receiver', 'skill']
+        indexes = [
+            # The expiry sweeper walks pending requests oldest first
+            models.Index(fields=['status', 'created_at'], name='requests_status_created_idx'),
+            # Sent and received lists, walked newest first by their (created_at, id) keyset
+            models.Index(fields=['receiver', '-created_at', '-id'], name='requests_receiver_keyset_idx'),
+            models.Index(fields=['requester', '-created_at', '-id'], name='requests_requester_keyset_idx'),
+            # Per-status counts of received requests, for the stats headers and teacher ranking
+            models.Index(fields=['receiver', 'status', 'created_at'], name='requests_receiver_status_idx'),
+        ]
         verbose_name_plural = 'Skill Requests'
         ordering = ['-created_at']
 
@@ -104,6 +135,7 @@ class Session(models.Model):
         ('C', 'Completed'),
         ('CA', 'Cancelled'),
         ('P', 'Pending'),
+        ('E', 'Expired'),
     )
 
     SESSION_TYPE_CHOICES = (
@@ -116,6 +148,15 @@ class Session(models.Model):
         db_table = 'skill_sessions'
         verbose_name_plural = 'Skill Sessions'
         ordering = ['-created_at']
+        indexes = [
+            # The expiry sweeper walks unstarted sessions by date
+            models.Index(fields=['status', 'scheduled_date'], name='sessions_status_date_idx'),
+            # Teaching and learning lists, walked newest first by their (created_at, id) keyset
+            models.Index(fields=['teacher', '-created_at', '-id'], name='sessions_teacher_keyset_idx'),
+            models.Index(fields=['learner', '-created_at', '-id'], name='sessions_learner_keyset_idx'),
+            # Per-status counts of a teacher's sessions, for the stats headers
+            models.Index(fields=['teacher', 'status'], name='sessions_teacher_status_idx'),
+        ]
 
     request = models.ForeignKey(Request, on_delete=models.CASCADE, related_name='sessions', help_text="Associated request")
     teacher = models.ForeignKey(User, on_delete=models.CASCADE, related_name='teaching_sessions')
@@ -153,3 +194,152 @@ class Session(models.Model):
     @property
     def session_type_display(self):
         return dict(self.SESSION_TYPE_CHOICES)[self.session_type]
+
+    @property
+    def teacher_feedback_given(self):
+        return self.teacher_rating is not None
+
+    @property
+    def learner_feedback_given(self):
+        return self.learner_rating is not None
+
+
+class RatingStats(models.Model):
+    """Count, sum and histogram of the learner ratings of a teacher.
+
+    Kept by apps.category_skills.ratings as feedback is left, so pages
+    never aggregate skill_sessions.
+    """
+
+    RATINGS = range(1, 6)
+
+    class Meta:
+        abstract = True
+
+    count = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0, help_text="Sum of all ratings")
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def mean(self):
+        return round(self.total / self.count, 1) if self.count else None
+
+    @property
+    def histogram(self):
+        """(rating, count, percent) from 5 stars down to 1"""
+        return [
+            (rating, getattr(self, f"rating_{rating}"),
+             round(100 * getattr(self, f"rating_{rating}") / self.count) if self.count else 0)
+            for rating in reversed(self.RATINGS)
+        ]
+
+    @property
+    def star_icons(self):
+        """Bootstrap icon per star for the mean, rounded to half stars"""
+        halves = round((self.mean or 0) * 2)
+        return [
+            "bi-star-fill" if 2 * star <= halves else "bi-star-half" if 2 * star - 1 == halves else "bi-star"
+            for star in self.RATINGS
+        ]
+
+
+class TeacherRating(RatingStats):
+
+    class Meta:
+        db_table = 'teacher_ratings'
+        verbose_name_plural = 'Teacher Ratings'
+
+    teacher = models.OneToOneField(User, on_delete=models.CASCADE, related_name='rating_stats')
+
+    def __str__(self):
+        return f"{self.teacher.username}: {self.mean} ({self.count})"
+
+
+class TeacherSkillRating(RatingStats):
+
+    class Meta:
+        db_table = 'teacher_skill_ratings'
+        unique_together = ['teacher', 'skill']
+        verbose_name_plural = 'Teacher Skill Ratings'
+
+    teacher = models.ForeignKey(User, on_delete=models.CASCADE, related_name='skill_rating_stats')
+    skill = models.ForeignKey(Skills, on_delete=models.CASCADE, related_name='rating_stats')
+
+    def __str__(self):
+        return f"{self.teacher.username} - {self.skill.name}: {self.mean} ({self.count})"
+
+
+class SkillRecommendation(models.Model):
+    """Top skills to learn next for a user, written by the recommend_skills command"""
+
+    class Meta:
+        ordering = ['user', 'rank']
+        db_table = 'skill_recommendations'
+        unique_together = ['user', 'rank']
+        verbose_name_plural = 'Skill Recommendations'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='skill_recommendations')
+    skill = models.ForeignKey(Skills, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField(help_text="1 is the best recommendation")
+    score = models.FloatField()
+
+    def __str__(self):
+        return f"{self.user.username} #{self.rank}: {self.skill.name}"
+
+
+class TeacherSkillScore(models.Model):
+    """How good a pick each teacher of a skill is, written by the rank_teachers command"""
+
+    class Meta:
+        ordering = ['-score']
+        db_table = 'teacher_skill_scores'
+        unique_together = ['teacher', 'skill']
+        indexes = [
+            # The course page lists a skill's best teachers straight off this index
+            models.Index(fields=['skill', '-score'], name='teacher_scores_rank_idx'),
+        ]
+        verbose_name_plural = 'Teacher Skill Scores'
+
+    teacher = models.ForeignKey(User, on_delete=models.CASCADE, related_name='skill_scores')
+    skill = models.ForeignKey(Skills, on_delete=models.CASCADE, related_name='teacher_scores')
+    score = models.FloatField(help_text="0 to 1, higher is listed first")
+    rating = models.FloatField(null=True, blank=True, help_text="Mean learner rating for this skill")
+    acceptance_rate = models.FloatField(null=True, blank=True, help_text="Share of answered requests accepted")
+    median_response = models.DurationField(null=True, blank=True, help_text="Typical time to answer a request")
+    pending_count = models.PositiveIntegerField(default=0, help_text="Requests waiting for an answer")
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.teacher.username} - {self.skill.name}: {self.score}"
+
+    @property
+    def response_display(self):
+        """Median answer time in the largest whole unit, e.g. "3 hours" """
+        if self.median_response is None:
+            return None
+        seconds = int(self.median_response.total_seconds())
+        for unit, size in [("day", 86400), ("hour", 3600), ("minute", 60)]:
+            if seconds >= size:
+                count = seconds // size
+                return f"{count} {unit}{'s' if count > 1 else ''}"
+        return "a minute"
+
+
+class StaleTeacherScore(models.Model):
+    """Teachers whose scores have changed inputs, rescored by ``rank_teachers --stale``"""
+
+    class Meta:
+        db_table = 'stale_teacher_scores'
+        verbose_name_plural = 'Stale Teacher Scores'
+
+    # Not a foreign key: teachers are also marked while their rows are being deleted
+    teacher_id = models.BigIntegerField(primary_key=True)
+    marked_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.teacher_id} since {self.marked_at}"
@@ -0,0 +1,103 @@
+from django.core.paginator import Page, Paginator
+from django.shortcuts import get_object_or_404
+from apps.accounts.models import User
+from apps.core.cache import get_or_set, invalidate_namespace, invalidate_tags
+from apps.core.catalog import model_tag
+from apps.university.models import Department
+from .models import SkillsCategory, Skills, Session
+
+# Everything the instructor profile renders is assembled in five queries
+# and cached per instructor (and session history page). The signals in
+# apps.category_skills.signals drop an instructor's snapshots when their
+# profile, skills or sessions change, or when a learner shown on them
+# changes their profile.
+PROFILE_TTL = 60 * 10
+SKILLS_PER_PAGE = 4
+SESSIONS_PER_PAGE = 5
+REVIEWS_SHOWN = 10
+
+# The columns the profile templates read; the rating stats come whole
+INSTRUCTOR_FIELDS = (
+    "first_name", "last_name", "bio", "personal_email", "profile_pic", "department__name", "university_name__name",
+)
+LEARNER_FIELDS = ("learner__first_name", "learner__last_name", "learner__profile_pic")
+SESSION_FIELDS = ("skill__name", "scheduled_date", "duration_minutes", "session_type", "status")
+REVIEW_FIELDS = ("learner_rating", "learner_feedback")
+
+
+def profile_tag(user_id):
+    return f"instructor_profile:{user_id}"
+
+
+def invalidate_profiles(*user_ids):
+    invalidate_tags(*(profile_tag(user_id) for user_id in user_ids))
+
+
+def invalidate_user_profiles(user_id):
+    """A user's own profile and every profile listing them as a learner,
+    in its session history or reviews, e.g. after a name or picture change"""
+    teacher_ids = Session.objects.filter(learner_id=user_id).values_list("teacher_id", flat=True).distinct()
+    invalidate_profiles(user_id, *teacher_ids)
+
+
+def invalidate_all_profiles():
+    """After bulk changes that sent no signals"""
+    invalidate_namespace("instructor_profile")
+
+
+def _page(queryset, number, per_page):
+    """One page of ``queryset`` that can be cached: the paginator only counts a range"""
+    paginator = Paginator(range(queryset.count()), per_page)
+    page = paginator.get_page(number)
+    bottom = (page.number - 1) * per_page
+    return Page(list(queryset[bottom:bottom + per_page]), page.number, paginator)
+
+
+def _page_number(value):
+    try:
+        return max(int(value), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def _build(user_id, sessions_page):
+    # Only what the templates render: the snapshot goes to a shared cache
+    # and must not carry password hashes or other private columns
+    instructor = get_object_or_404(
+        User.objects.select_related("department", "university_name", "rating_stats").only(*INSTRUCTOR_FIELDS),
+        id=user_id,
+    )
+    sessions = Session.objects.filter(teacher_id=user_id)
+    return {
+        "instructor": instructor,
+        "rating": getattr(instructor, "rating_stats", None),
+        "skills": list(
+            Skills.objects.filter(user_skills__user_id=user_id).select_related("category")
+        ),
+        "sessions_page": _page(
+            sessions.select_related("skill", "learner").only(*SESSION_FIELDS, *LEARNER_FIELDS),
+            sessions_page, SESSIONS_PER_PAGE,
+        ),
+        # Latest learner reviews, the totals come from the rating stats
+        "reviews": list(
+            sessions.filter(learner_rating__isnull=False)
+            .select_related("learner__department")
+            .only(*REVIEW_FIELDS, *LEARNER_FIELDS, "learner__department__name")
+            .order_by("-updated_at")[:REVIEWS_SHOWN]
+        ),
+    }
+
+
+def instructor_profile(user_id, sessions_page=None):
+    """Cached snapshot of an instructor profile; raises Http404 for unknown users"""
+    sessions_page = _page_number(sessions_page)
+    return get_or_set(
+        "instructor_profile", f"{user_id}:{sessions_page}",
+        lambda: _build(user_id, sessions_page),
+        ttl=PROFILE_TTL,
+        tags=[profile_tag(user_id), model_tag(Skills), model_tag(SkillsCategory), model_tag(Department)],
+    )
+
+
+def skills_page(profile, number):
+    return Paginator(profile["skills"], SKILLS_PER_PAGE).get_page(number)
@@ -0,0 +1,177 @@
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+from statistics import median
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from apps.core.bulk import BATCH_SIZE, bulk_insert
+from .models import UserSkills, Request, TeacherRating, TeacherSkillRating, TeacherSkillScore, StaleTeacherScore
+
+# Every teacher of a skill gets a 0..1 score from their learner rating,
+# how often they accept requests, how fast they answer and how many
+# requests are already waiting on them. The rank_teachers command
+# rebuilds all scores periodically. The signals in
+# apps.category_skills.signals only mark a teacher stale when their
+# skills, requests or ratings change; rank_teachers --stale rescores those.
+TEACHERS_SHOWN = 5
+WEIGHTS = {
+    "rating": 0.4,
+    "acceptance": 0.25,
+    "response": 0.2,
+    "load": 0.15,
+}
+# Ratings and acceptance rates lean towards the prior until a teacher has this many
+PRIOR_WEIGHT = 5
+# Prior rating when nobody has been rated yet
+DEFAULT_RATING = 3.5
+PRIOR_ACCEPTANCE = 0.5
+# A median answer this slow halves the response score
+RESPONSE_HALF = timedelta(days=1)
+# This many pending requests halves the load score
+PENDING_HALF = 5
+# The prior is a sum over every rating, cached between full rebuilds
+PRIOR_KEY = "category_skills:ranking:prior_rating"
+PRIOR_TTL = 60 * 60
+
+
+def _compute_prior_rating():
+    """Mean of every learner rating, what an unrated teacher is assumed to get"""
+    totals = TeacherRating.objects.aggregate(total=Sum("total"), count=Sum("count"))
+    return totals["total"] / totals["count"] if totals["count"] else DEFAULT_RATING
+
+
+def _prior_rating():
+    return cache.get_or_set(PRIOR_KEY, _compute_prior_rating, PRIOR_TTL)
+
+
+def _request_stats(requests):
+    """teacher id -> (accepted, answered, pending) over ``requests``"""
+    rows = requests.order_by().values("receiver_id").annotate(
+        accepted=Count("id", filter=Q(status="A")),
+        answered=Count("id", filter=Q(status__in=["A", "R"])),
+        pending=Count("id", filter=Q(status="P")),
+    )
+    return {row["receiver_id"]: (row["accepted"], row["answered"], row["pending"]) for row in rows.iterator()}
+
+
+def _median_responses(requests):
+    """teacher id -> median time from a request to its answer"""
+    rows = (
+        requests.filter(responded_at__isnull=False)
+        .order_by("receiver_id")
+        .values_list("receiver_id", "created_at", "responded_at")
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    return {
+        teacher_id: median(responded - created for _, created, responded in group)
+        for teacher_id, group in groupby(rows, key=itemgetter(0))
+    }
+
+
+def score(rating_total, rating_count, accepted, answered, pending, response, prior_rating=DEFAULT_RATING):
+    """Field values of a TeacherSkillScore row"""
+    rating = (rating_total + prior_rating * PRIOR_WEIGHT) / (rating_count + PRIOR_WEIGHT)
+    acceptance = (accepted + PRIOR_ACCEPTANCE * PRIOR_WEIGHT) / (answered + PRIOR_WEIGHT)
+    responsiveness = 0.5 if response is None else RESPONSE_HALF / (RESPONSE_HALF + max(response, timedelta(0)))
+    load = PENDING_HALF / (PENDING_HALF + pending)
+    return {
+        "score": round(
+            WEIGHTS["rating"] * (rating - 1) / 4
+            + WEIGHTS["acceptance"] * acceptance
+            + WEIGHTS["response"] * responsiveness
+            + WEIGHTS["load"] * load,
+            4,
+        ),
+        "rating": round(rating_total / rating_count, 2) if rating_count else None,
+        "acceptance_rate": round(accepted / answered, 3) if answered else None,
+        "median_response": response,
+        "pending_count": pending,
+    }
+
+
+def _scores(teacher_ids=None):
+    """Unsaved TeacherSkillScore rows for every (teacher, skill) pair, or those of ``teacher_ids``"""
+    requests = Request.objects.all()
+    rated = TeacherSkillRating.objects.all()
+    pairs = UserSkills.objects.all()
+    if teacher_ids is not None:
+        requests = requests.filter(receiver_id__in=teacher_ids)
+        rated = rated.filter(teacher_id__in=teacher_ids)
+        pairs = pairs.filter(user_id__in=teacher_ids)
+
+    prior_rating = _prior_rating()
+    stats = _request_stats(requests)
+    responses = _median_responses(requests)
+    ratings = {
+        (teacher_id, skill_id): (total, count)
+        for teacher_id, skill_id, total, count in rated.values_list("teacher_id", "skill_id", "total", "count").iterator()
+    }
+    for teacher_id, skill_id in pairs.order_by().values_list("user_id", "skill_id").iterator(chunk_size=BATCH_SIZE):
+        yield TeacherSkillScore(
+            teacher_id=teacher_id,
+            skill_id=skill_id,
+            **score(
+                *ratings.get((teacher_id, skill_id), (0, 0)),
+                *stats.get(teacher_id, (0, 0, 0)),
+                responses.get(teacher_id),
+                prior_rating,
+            ),
+        )
+
+
+def rebuild_teacher_scores(batch_size=BATCH_SIZE):
+    """Rescore every teacher of every skill; returns how many rows were written"""
+    started = timezone.now()
+    cache.set(PRIOR_KEY, _compute_prior_rating(), PRIOR_TTL)
+    with transaction.atomic():
+        TeacherSkillScore.objects.all().delete()
+        bulk_insert(TeacherSkillScore, _scores(), batch_size)
+        StaleTeacherScore.objects.filter(marked_at__lte=started).delete()
+    return TeacherSkillScore.objects.count()
+
+
+def rank_teachers(teacher_ids):
+    """Rescore these teachers' skills after their skills or requests changed"""
+    teacher_ids = list(teacher_ids)
+    rows = list(_scores(teacher_ids))
+    with transaction.atomic():
+        TeacherSkillScore.objects.filter(teacher_id__in=teacher_ids).delete()
+        TeacherSkillScore.objects.bulk_create(rows)
+
+
+def mark_stale(teacher_ids):
+    """Queue teachers for the next ``rank_teachers --stale`` run, in one upsert"""
+    now = timezone.now()
+    StaleTeacherScore.objects.bulk_create(
+        [StaleTeacherScore(teacher_id=teacher_id, marked_at=now) for teacher_id in set(teacher_ids)],
+        update_conflicts=True, unique_fields=["teacher_id"], update_fields=["marked_at"],
+    )
+
+
+def rank_stale_teachers(batch_size=BATCH_SIZE):
+    """Rescore the teachers marked stale; returns how many were rescored"""
+    started = timezone.now()
+    teacher_ids = list(StaleTeacherScore.objects.values_list("teacher_id", flat=True))
+    for start in range(0, len(teacher_ids), batch_size):
+        batch = teacher_ids[start:start + batch_size]
+        rank_teachers(batch)
+        # Marks made while this batch was scored stay for the next run
+        StaleTeacherScore.objects.filter(teacher_id__in=batch, marked_at__lte=started).delete()
+    return len(teacher_ids)
+
+
+def top_teachers(skill_id, limit=TEACHERS_SHOWN):
+    """The ``limit`` best teachers of a skill, best first, from the rank index"""
+    related = ["teacher__department", "teacher__university_name", "teacher__rating_stats"]
+    scores = list(TeacherSkillScore.objects.filter(skill_id=skill_id).select_related(*related)[:limit])
+    if scores:
+        return scores
+    # Never ranked (rank_teachers not run since the skill got teachers): unscored, in any order
+    return [
+        TeacherSkillScore(teacher=user_skill.user, skill_id=skill_id)
+        for user_skill in UserSkills.objects.filter(skill_id=skill_id).select_related(
+            *(field.replace("teacher", "user", 1) for field in related)
+        )[:limit]
+    ]
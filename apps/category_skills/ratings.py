@@ -0,0 +1,80 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+from apps.core.bulk import bulk_insert
+from .models import Session, RatingStats, TeacherRating, TeacherSkillRating
+from .profiles import invalidate_all_profiles
+
+# Learner ratings of teachers (Session.learner_rating) are folded into
+# TeacherRating (per teacher) and TeacherSkillRating (per teacher and
+# skill) one delta at a time, so reading a rating is a single row.
+
+
+def _deltas(old, new):
+    deltas = {}
+
+    def add(field, value):
+        deltas[field] = deltas.get(field, 0) + value
+
+    if old is not None:
+        add("count", -1)
+        add("total", -old)
+        add(f"rating_{old}", -1)
+    if new is not None:
+        add("count", 1)
+        add("total", new)
+        add(f"rating_{new}", 1)
+    return {field: value for field, value in deltas.items() if value}
+
+
+def _apply(model, lookup, deltas):
+    if not deltas:
+        return
+    changes = {field: F(field) + value for field, value in deltas.items()}
+    # update() skips auto_now
+    changes["updated_at"] = timezone.now()
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    # First rating: only the new side can be counted on a fresh row
+    initial = {field: value for field, value in deltas.items() if value > 0}
+    if not initial:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **initial)
+    except IntegrityError:
+        # Created by a concurrent rating in the meantime
+        model.objects.filter(**lookup).update(**changes)
+
+
+def record_rating(teacher_id, skill_id, old, new):
+    """Replace rating ``old`` (None if first) by ``new`` in the teacher's stats"""
+    deltas = _deltas(old, new)
+    _apply(TeacherRating, {"teacher_id": teacher_id}, deltas)
+    _apply(TeacherSkillRating, {"teacher_id": teacher_id, "skill_id": skill_id}, deltas)
+
+
+def _aggregates():
+    return {
+        "count": Count("id"),
+        "total": Sum("learner_rating"),
+        **{f"rating_{rating}": Count("id", filter=Q(learner_rating=rating)) for rating in RatingStats.RATINGS},
+    }
+
+
+def rebuild_rating_stats():
+    """Recompute every stats row from skill_sessions; returns how many teachers are rated"""
+    rated = Session.objects.filter(learner_rating__isnull=False).order_by()
+    with transaction.atomic():
+        TeacherSkillRating.objects.all().delete()
+        TeacherRating.objects.all().delete()
+        bulk_insert(TeacherSkillRating, (
+            TeacherSkillRating(**row)
+            for row in rated.values("teacher_id", "skill_id").annotate(**_aggregates()).iterator()
+        ))
+        bulk_insert(TeacherRating, (
+            TeacherRating(**row)
+            for row in rated.values("teacher_id").annotate(**_aggregates()).iterator()
+        ))
+    invalidate_all_profiles()
+    return TeacherRating.objects.count()
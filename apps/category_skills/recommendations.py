@@ -0,0 +1,113 @@
+import numpy as np
+from scipy import sparse
+from django.db import transaction
+from apps.core.bulk import BATCH_SIZE, bulk_insert
+from .models import UserSkills, Request, Session, SkillRecommendation
+
+# Item-to-item collaborative filtering, run offline by the recommend_skills
+# command: skills that appear together in people's histories are suggested
+# to users who only have some of them. The dashboard reads the stored
+# top-N rows with one indexed lookup.
+TOP_N = 10
+# Similar skills kept per skill, bounds the cost of scoring users
+NEIGHBOURS = 50
+# How strongly each kind of history ties a user to a skill
+WEIGHTS = {
+    "teaches": 1.0,    # UserSkills
+    "requested": 2.0,  # Request.requester
+    "learned": 3.0,    # Session.learner
+}
+# Users scored at once
+CHUNK = 10000
+
+
+def _history(queryset, user_field, weight):
+    rows = queryset.order_by().values_list(user_field, "skill_id").iterator(chunk_size=BATCH_SIZE)
+    pairs = np.fromiter((value for row in rows for value in row), dtype=np.int64).reshape(-1, 2)
+    return pairs, np.full(len(pairs), weight, dtype=np.float32)
+
+
+def interactions():
+    """(user ids, skill ids, weights) of every history row, as arrays"""
+    parts = [
+        _history(UserSkills.objects.all(), "user_id", WEIGHTS["teaches"]),
+        _history(Request.objects.all(), "requester_id", WEIGHTS["requested"]),
+        _history(Session.objects.all(), "learner_id", WEIGHTS["learned"]),
+    ]
+    pairs = np.concatenate([pairs for pairs, _ in parts])
+    weights = np.concatenate([weights for _, weights in parts])
+    return pairs[:, 0], pairs[:, 1], weights
+
+
+def user_skill_matrix(user_ids, skill_ids, weights):
+    """Sparse users x skills matrix of summed weights, with the ids of its rows and columns"""
+    users, rows = np.unique(user_ids, return_inverse=True)
+    skills, columns = np.unique(skill_ids, return_inverse=True)
+    # Duplicate (user, skill) entries are summed
+    matrix = sparse.csr_matrix((weights, (rows, columns)), shape=(len(users), len(skills)), dtype=np.float32)
+    return users, skills, matrix
+
+
+def _keep_largest(matrix, k):
+    """Zero all but the ``k`` largest entries of every row of a CSR matrix"""
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        extra = end - start - k
+        if extra > 0:
+            data = matrix.data[start:end]
+            data[np.argpartition(data, extra)[:extra]] = 0
+    matrix.eliminate_zeros()
+    return matrix
+
+
+def similarities(matrix, neighbours=NEIGHBOURS):
+    """Cosine similarity of skills over the users who have them, ``neighbours`` per skill"""
+    seen = (matrix > 0).astype(np.float32)
+    together = (seen.T @ seen).tocsr()
+    together.setdiag(0)
+    together.eliminate_zeros()
+    scale = sparse.diags(1 / np.sqrt(np.asarray(seen.sum(axis=0)).ravel()))
+    return _keep_largest((scale @ together @ scale).tocsr(), neighbours)
+
+
+def top_skills(matrix, similarity, top_n=TOP_N):
+    """Yield (row, skill columns, scores) best first, without the skills a user already has"""
+    for start in range(0, matrix.shape[0], CHUNK):
+        chunk = matrix[start:start + CHUNK]
+        scores = (chunk @ similarity).tocsr()
+        scores = (scores - scores.multiply(chunk > 0)).tocsr()
+        scores.eliminate_zeros()
+        for offset in range(scores.shape[0]):
+            begin, end = scores.indptr[offset], scores.indptr[offset + 1]
+            if begin == end:
+                continue
+            data = scores.data[begin:end]
+            columns = scores.indices[begin:end]
+            best = np.argpartition(-data, top_n)[:top_n] if end - begin > top_n else np.arange(end - begin)
+            best = best[np.argsort(-data[best], kind="stable")]
+            yield start + offset, columns[best], data[best]
+
+
+def rebuild_recommendations(top_n=TOP_N, neighbours=NEIGHBOURS, batch_size=BATCH_SIZE):
+    """Recompute the recommendations of every user; returns sizes for reporting"""
+    user_ids, skill_ids, weights = interactions()
+    if not len(weights):
+        SkillRecommendation.objects.all().delete()
+        return {"interactions": 0, "users": 0, "skills": 0, "recommendations": 0}
+
+    users, skills, matrix = user_skill_matrix(user_ids, skill_ids, weights)
+    rows = (
+        SkillRecommendation(user_id=int(users[row]), skill_id=int(skills[column]), rank=rank, score=float(score))
+        for row, columns, scores in top_skills(matrix, similarities(matrix, neighbours), top_n)
+        for rank, (column, score) in enumerate(zip(columns, scores), start=1)
+    )
+    # Readers keep the old rows until the new ones are all in
+    with transaction.atomic():
+        SkillRecommendation.objects.all().delete()
+        bulk_insert(SkillRecommendation, rows, batch_size)
+    return {
+        "interactions": len(weights),
+        "users": len(users),
+        "skills": len(skills),
+        "recommendations": SkillRecommendation.objects.count(),
+    }
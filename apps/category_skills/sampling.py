@@ -0,0 +1,167 @@
+import random
+import uuid
+from array import array
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Window
+from django.db.models.functions import Random, RowNumber
+from apps.accounts.models import User
+from .models import UserSkills, TeachableSkill
+
+# Extra rows fetched per sample so skills taught only by the excluded user
+# can be dropped without a second round trip.
+OVERSAMPLE = 4
+
+# Inserts racing for the next seq before add_teacher gives up
+ADD_TEACHER_ATTEMPTS = 3
+
+# Shared version of the instructor id array; deleting it makes every
+# process reload its local copy on the next sample.
+INSTRUCTOR_IDS_VERSION_KEY = "category_skills:instructor_ids_version"
+INSTRUCTOR_IDS_TTL = 300
+
+_instructor_ids = {"version": None, "ids": array("q")}
+
+
+# ============= TEACHABLE SKILLS INDEX =============
+
+def add_teacher(skill_id):
+    """Count one more teacher for a skill, adding it to the index if needed.
+
+    Raises IntegrityError when concurrent writers win every attempt, rather
+    than leaving the teacher uncounted.
+    """
+    for attempt in range(ADD_TEACHER_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                if TeachableSkill.objects.filter(skill_id=skill_id).update(teacher_count=F("teacher_count") + 1):
+                    return
+                last_seq = TeachableSkill.objects.aggregate(last=Max("seq"))["last"] or 0
+                TeachableSkill.objects.create(skill_id=skill_id, teacher_count=1, seq=last_seq + 1)
+                return
+        except IntegrityError:
+            # Another writer took the same seq (or skill) first, try again
+            if attempt == ADD_TEACHER_ATTEMPTS - 1:
+                raise
+
+
+def remove_teacher(skill_id):
+    """Count one less teacher for a skill, dropping it from the index at zero"""
+    with transaction.atomic():
+        TeachableSkill.objects.filter(skill_id=skill_id, teacher_count__gt=0).update(
+            teacher_count=F("teacher_count") - 1
+        )
+        # Deleting fires post_delete, which closes the hole left in ``seq``
+        TeachableSkill.objects.filter(skill_id=skill_id, teacher_count=0).delete()
+
+
+def fill_gap(seq):
+    """Move the last row into a freed ``seq`` so positions stay dense"""
+    with transaction.atomic():
+        # A cascade can report the same row twice, so make sure the slot is really free
+        if TeachableSkill.objects.filter(seq=seq).exists():
+            return
+        last = TeachableSkill.objects.select_for_update().order_by("-seq").first()
+        if last and last.seq > seq:
+            TeachableSkill.objects.filter(pk=last.pk).update(seq=seq)
+
+
+def rebuild_teachable_index():
+    """Recreate the whole index from user_skills (after bulk imports etc.)"""
+    counts = UserSkills.objects.values("skill_id").annotate(teachers=Count("id")).order_by("skill_id")
+    rows = [
+        TeachableSkill(skill_id=row["skill_id"], teacher_count=row["teachers"], seq=position)
+        for position, row in enumerate(counts, start=1)
+    ]
+    with transaction.atomic():
+        TeachableSkill.objects.all().delete()
+        TeachableSkill.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+# ============= RANDOM SAMPLING =============
+
+def random_teachable_skills(k, exclude_user_id=None):
+    """Return up to ``k`` random skills that someone (other than the excluded user) teaches.
+
+    Picks random positions in the dense ``seq`` range and fetches them by the
+    unique index, so the cost does not depend on the size of user_skills.
+    """
+    size = TeachableSkill.objects.aggregate(size=Max("seq"))["size"] or 0
+    if not size:
+        return []
+
+    positions = random.sample(range(1, size + 1), min(size, k + OVERSAMPLE))
+    rows = list(TeachableSkill.objects.filter(seq__in=positions).select_related("skill__category"))
+
+    if exclude_user_id:
+        # Only skills with a single teacher can be "taught" solely by this user
+        single_teacher = [row.skill_id for row in rows if row.teacher_count == 1]
+        if single_teacher:
+            own = set(
+                UserSkills.objects.filter(user_id=exclude_user_id, skill_id__in=single_teacher)
+                .values_list("skill_id", flat=True)
+            )
+            rows = [row for row in rows if row.skill_id not in own]
+
+    random.shuffle(rows)
+    return [row.skill for row in rows[:k]]
+
+
+def pair_random_teachers(skills, exclude_user_id=None):
+    """Map each skill id to one random teacher (User) in a single query.
+
+    Teachers are shuffled per skill with a window function, so the cost
+    depends on the teachers of these skills only, not the whole catalog.
+    """
+    user_skills = UserSkills.objects.filter(skill_id__in=[skill.id for skill in skills])
+    if exclude_user_id:
+        user_skills = user_skills.exclude(user_id=exclude_user_id)
+
+    picks = user_skills.annotate(
+        pick=Window(RowNumber(), partition_by=F("skill_id"), order_by=Random().asc())
+    ).filter(pick=1).select_related("user__rating_stats")
+
+    return {user_skill.skill_id: user_skill.user for user_skill in picks}
+
+
+# ============= RANDOM INSTRUCTORS =============
+
+def invalidate_instructor_ids():
+    cache.delete(INSTRUCTOR_IDS_VERSION_KEY)
+
+
+def instructor_ids():
+    """Sorted ids of every user with at least one skill, as a compact int array.
+
+    The array is kept per process and only reloaded when the shared version
+    key changes (UserSkills writes) or expires.
+    """
+    version = cache.get(INSTRUCTOR_IDS_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(INSTRUCTOR_IDS_VERSION_KEY, version, INSTRUCTOR_IDS_TTL):
+            version = cache.get(INSTRUCTOR_IDS_VERSION_KEY, version)
+
+    if _instructor_ids["version"] != version:
+        ids = UserSkills.objects.values_list("user_id", flat=True).distinct().order_by("user_id")
+        _instructor_ids["ids"] = array("q", ids.iterator(chunk_size=5000))
+        _instructor_ids["version"] = version
+    return _instructor_ids["ids"]
+
+
+def random_instructors(k, exclude_user_id=None):
+    """Return ``k`` random instructors (Users) in random order.
+
+    Ids are drawn at random offsets of the cached id array; the cards read
+    the skills_count/top_skills summary, so no skills are loaded.
+    """
+    ids = instructor_ids()
+    offsets = random.sample(range(len(ids)), min(len(ids), k + 1))
+    chosen = [ids[offset] for offset in offsets if ids[offset] != exclude_user_id][:k]
+    if not chosen:
+        return []
+
+    users_by_id = User.objects.select_related("department", "rating_stats").in_bulk(chosen)
+    # Skip ids that lost their user since the array was loaded
+    return [users_by_id[user_id] for user_id in chosen if user_id in users_by_id]
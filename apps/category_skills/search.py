@@ -0,0 +1,250 @@
+import re
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q
+from .models import UserSkills
+
+# Inverted indexes kept in raw tables created by migrations: FTS5 virtual
+# tables on SQLite and a tsvector column with a GIN index on PostgreSQL.
+# Other databases fall back to icontains.
+
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def supported(conn=None):
+    return (conn or connection).vendor in ("sqlite", "postgresql")
+
+
+def tokens(query):
+    return TOKEN.findall((query or "").lower())
+
+
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+
+class SearchIndex:
+    """One full-text table, filled from ``source`` by INSERT ... SELECT.
+
+    ``columns`` maps each FTS5 column to its SQL expression (or one per
+    vendor), bm25 weight and the setweight letter it gets in the single
+    tsvector used on PostgreSQL.
+    """
+
+    def __init__(self, table, key, columns, source, group_by=""):
+        self.table = table
+        self.key = key
+        self.columns = columns
+        self.source = source
+        self.group_by = group_by
+
+    def _key_column(self, vendor):
+        return "rowid" if vendor == "sqlite" else self.key
+
+    def _exprs(self, vendor):
+        for expr, _, letter in self.columns.values():
+            yield (expr[vendor] if isinstance(expr, dict) else expr), letter
+
+    def _insert_sql(self, vendor, where=""):
+        key_expr, _ = self.source
+        if vendor == "sqlite":
+            names = ", ".join(self.columns)
+            exprs = ", ".join(expr for expr, _ in self._exprs(vendor))
+            select = f"SELECT {key_expr}, {exprs}"
+            target = f"{self.table} (rowid, {names})"
+        else:
+            document = " || ".join(
+                f"setweight(to_tsvector('simple', {expr}), '{letter}')"
+                for expr, letter in self._exprs(vendor)
+            )
+            select = f"SELECT {key_expr}, {document}"
+            target = f"{self.table} ({self.key}, document)"
+        return f"INSERT INTO {target} {select} {self.source[1]} {where} {self.group_by}"
+
+    def index(self, ids, conn=None):
+        """(Re)index the given keys; keys that no longer exist are dropped"""
+        ids = list(ids)
+        if ids:
+            self.index_where(f"IN ({_placeholders(ids)})", ids, conn)
+
+    def index_where(self, condition, params, conn=None):
+        """(Re)index the rows whose key matches ``condition``, e.g. ``IN (SELECT ...)``"""
+        conn = conn or connection
+        if not supported(conn):
+            return
+        key_expr, _ = self.source
+        with conn.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE {self._key_column(conn.vendor)} {condition}", params)
+            cursor.execute(self._insert_sql(conn.vendor, f"WHERE {key_expr} {condition}"), params)
+
+    def remove(self, ids, conn=None):
+        conn = conn or connection
+        ids = list(ids)
+        if not supported(conn) or not ids:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE {self._key_column(conn.vendor)} IN ({_placeholders(ids)})", ids)
+
+    def rebuild(self, conn=None):
+        """Reindex every row, e.g. after bulk inserts that sent no signals"""
+        conn = conn or connection
+        if not supported(conn):
+            return
+        with conn.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(self._insert_sql(conn.vendor))
+
+    def _match(self, query, vendor):
+        """``query`` as a prefix match on every word, None when it has no words"""
+        words = tokens(query)
+        if not words:
+            return None
+        if vendor == "sqlite":
+            return " ".join(f'"{word}"*' for word in words)
+        return " & ".join(f"{word}:*" for word in words)
+
+    def _rank(self, vendor):
+        """Relevance of the current row for the %s query, lower is better"""
+        if vendor == "sqlite":
+            weights = ", ".join(str(weight) for _, weight, _ in self.columns.values())
+            return f"bm25({self.table}, {weights})"
+        return "-ts_rank(document, to_tsquery('simple', %s))"
+
+    def _where(self, vendor):
+        if vendor == "sqlite":
+            return f"{self.table} MATCH %s"
+        return "document @@ to_tsquery('simple', %s)"
+
+    def ranked_ids(self, query):
+        """Keys of the rows matching every word of ``query`` (as a prefix), best first"""
+        vendor = connection.vendor
+        match = self._match(query, vendor)
+        if match is None:
+            return []
+        key = self._key_column(vendor)
+        rank = self._rank(vendor)
+        sql = f"SELECT {key} FROM {self.table} WHERE {self._where(vendor)} ORDER BY {rank}, {key}"
+        with connection.cursor() as cursor:
+            # Every placeholder stands for the match
+            cursor.execute(sql, [match] * sql.count("%s"))
+            return [row[0] for row in cursor.fetchall()]
+
+    def search(self, queryset, query):
+        """Restrict ``queryset`` to ``query`` matches, best first.
+
+        The index is joined into the query, so counts, facets and pages
+        see every match and each one is ranked once.
+        """
+        vendor = connection.vendor
+        match = self._match(query, vendor)
+        if match is None:
+            return queryset.none()
+        opts = queryset.model._meta
+        outer = f"{connection.ops.quote_name(opts.db_table)}.{connection.ops.quote_name(opts.pk.column)}"
+        rank = self._rank(vendor)
+        return queryset.extra(
+            tables=[self.table],
+            where=[f"{self.table}.{self._key_column(vendor)} = {outer}", self._where(vendor)],
+            params=[match],
+            select={"search_rank": rank},
+            select_params=[match] * rank.count("%s"),
+            order_by=["search_rank", "pk"],
+        )
+
+
+# ============= SKILLS =============
+
+SEARCH_TABLE = "skills_search"
+
+# Skill name, description and category name (migration 0009)
+skills_index = SearchIndex(
+    SEARCH_TABLE, "skill_id",
+    {
+        "name": ("s.name", 10.0, "A"),
+        "description": ("s.description", 1.0, "C"),
+        "category": ("c.name", 4.0, "B"),
+    },
+    ("s.id", "FROM category_skills s JOIN category c ON c.id = s.category_id"),
+)
+
+
+def index_skills(skill_ids, conn=None):
+    skills_index.index(skill_ids, conn)
+
+
+def remove_skills(skill_ids, conn=None):
+    skills_index.remove(skill_ids, conn)
+
+
+def rebuild_search_index(conn=None):
+    skills_index.rebuild(conn)
+
+
+def ranked_skill_ids(query):
+    return skills_index.ranked_ids(query)
+
+
+def search_skills(queryset, query):
+    """Restrict a Skills queryset to ``query`` matches, ordered by relevance"""
+    if not supported():
+        condition = Q()
+        for word in tokens(query):
+            condition &= (
+                Q(name__icontains=word) | Q(description__icontains=word) | Q(category__name__icontains=word)
+            )
+        return queryset.filter(condition)
+    return skills_index.search(queryset, query)
+
+
+# ============= INSTRUCTORS =============
+
+INSTRUCTORS_TABLE = "instructors_search"
+
+# One row per user: full name, bio and the names of every skill they
+# teach (migration 0010), so a search never joins user_skills.
+instructors_index = SearchIndex(
+    INSTRUCTORS_TABLE, "user_id",
+    {
+        "name": ("u.first_name || ' ' || u.last_name", 10.0, "A"),
+        "bio": ("u.bio", 1.0, "C"),
+        "skills": ({
+            "sqlite": "COALESCE(group_concat(s.name, ' '), '')",
+            "postgresql": "COALESCE(string_agg(s.name, ' '), '')",
+        }, 4.0, "B"),
+    },
+    ("u.id", "FROM userprofile u LEFT JOIN user_skills us ON us.user_id = u.id "
+             "LEFT JOIN category_skills s ON s.id = us.skill_id"),
+    group_by="GROUP BY u.id",
+)
+
+
+def index_instructors(user_ids, conn=None):
+    instructors_index.index(user_ids, conn)
+
+
+def index_skill_holders(skill_ids, conn=None):
+    """Reindex every user teaching one of ``skill_ids`` (skill renamed)"""
+    skill_ids = list(skill_ids)
+    if skill_ids:
+        instructors_index.index_where(
+            f"IN (SELECT user_id FROM user_skills WHERE skill_id IN ({_placeholders(skill_ids)}))", skill_ids, conn,
+        )
+
+
+def remove_instructors(user_ids, conn=None):
+    instructors_index.remove(user_ids, conn)
+
+
+def rebuild_instructor_index(conn=None):
+    instructors_index.rebuild(conn)
+
+
+def search_instructors(queryset, query):
+    """Restrict a User queryset to ``query`` matches on name, bio and skills, best first"""
+    if not supported():
+        return queryset.filter(
+            Q(first_name__icontains=query) |
+            Q(last_name__icontains=query) |
+            Q(bio__icontains=query) |
+            Q(Exists(UserSkills.objects.filter(user=OuterRef("pk"), skill__name__icontains=query)))
+        )
+    return instructors_index.search(queryset, query)
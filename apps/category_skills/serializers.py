@@ -21,28 +21,42 @@ class UserSkillSerializer(serializers.ModelSerializer):
         model = UserSkills
         fields = ["user"]
 
+class RatingStatsSerializer(serializers.Serializer):
+    # TeacherRating / TeacherSkillRating rows
+    count = serializers.IntegerField()
+    mean = serializers.FloatField()
+    histogram = serializers.SerializerMethodField()
+
+    def get_histogram(self, obj):
+        return {str(rating): count for rating, count, _ in obj.histogram}
+
 class SkillSerializer(serializers.ModelSerializer):
     category = SkillsCategorySerializer()
     level_display = serializers.CharField(source="get_level_display")
     student = serializers.SerializerMethodField()
+    student_rating = serializers.SerializerMethodField()
 
     class Meta:
         model = Skills
-        fields = ["id", "name", "description",  "category" , "created_at" , "image" , "level_display" , "student"]
+        fields = ["id", "name", "description",  "category" , "created_at" , "image" , "level_display" , "student" , "student_rating"]
     
     def get_student(self, obj):
         user = self.context.get("user")
         return UserBasicSerializer(user).data if user else None
 
+    def get_student_rating(self, obj):
+        # Loaded with the user (select_related), None until someone rates them
+        stats = getattr(self.context.get("user"), "rating_stats", None)
+        return RatingStatsSerializer(stats).data if stats else None
 
-# Serializers for Displaying Instructors
 
-class InstructorBasicSkillSerializer(serializers.ModelSerializer):
-    level_display = serializers.CharField(source="get_level_display")
+# Serializers for Displaying Instructors
 
-    class Meta:
-        model = Skills
-        fields = ["name", "level_display"]
+class InstructorSkillSummarySerializer(serializers.Serializer):
+    # Entries of User.top_skills
+    name = serializers.CharField()
+    level_display = serializers.CharField()
+    category = serializers.CharField()
 
 class InstructorBasicSerializer(serializers.ModelSerializer):
 
@@ -53,6 +67,7 @@ class InstructorBasicSerializer(serializers.ModelSerializer):
         fields = ["id" , "first_name" , "last_name" , "profile_pic" , "bio" , "year" , "department"]
 
 class InstructorSerializer(serializers.Serializer):
-    user = InstructorBasicSerializer()
-    skills = InstructorBasicSkillSerializer(many=True)
+    user = InstructorBasicSerializer(source="*")
+    skills = InstructorSkillSummarySerializer(source="top_skills", many=True)
     skills_count = serializers.IntegerField()
+    rating = RatingStatsSerializer(source="rating_stats", read_only=True)
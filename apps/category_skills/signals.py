@@ -0,0 +1,150 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.accounts.models import User
+from .models import SkillsCategory, Skills, UserSkills, TeachableSkill, Request, Session, TeacherSkillScore
+from . import profiles, ranking, ratings, sampling, search, summaries, transitions
+
+
+# Keep the home page samplers in step with user_skills
+@receiver(post_save, sender=UserSkills)
+def user_skill_added(sender, instance, created, **kwargs):
+    if created:
+        sampling.add_teacher(instance.skill_id)
+        sampling.invalidate_instructor_ids()
+
+
+@receiver(post_delete, sender=UserSkills)
+def user_skill_removed(sender, instance, **kwargs):
+    sampling.remove_teacher(instance.skill_id)
+    sampling.invalidate_instructor_ids()
+
+
+@receiver(post_delete, sender=TeachableSkill)
+def teachable_skill_removed(sender, instance, **kwargs):
+    sampling.fill_gap(instance.seq)
+
+
+# Keep the full-text skill index in step with the catalog
+@receiver(post_save, sender=Skills)
+def skill_saved(sender, instance, **kwargs):
+    search.index_skills([instance.pk])
+
+
+@receiver(post_delete, sender=Skills)
+def skill_deleted(sender, instance, **kwargs):
+    search.remove_skills([instance.pk])
+
+
+@receiver(post_save, sender=SkillsCategory)
+def category_saved(sender, instance, created, **kwargs):
+    if not created:
+        search.index_skills(instance.skills.values_list("id", flat=True))
+
+
+# Keep the instructor card summary on User in step
+@receiver(post_save, sender=UserSkills)
+def user_skill_summary_added(sender, instance, created, **kwargs):
+    if created:
+        summaries.refresh_user_summaries([instance.user_id])
+
+
+@receiver(post_delete, sender=UserSkills)
+def user_skill_summary_removed(sender, instance, **kwargs):
+    summaries.refresh_user_summaries([instance.user_id])
+
+
+@receiver(post_save, sender=Skills)
+def skill_summary_changed(sender, instance, created, **kwargs):
+    if not created:
+        summaries.refresh_skill_holders(UserSkills.objects.filter(skill=instance))
+
+
+@receiver(post_save, sender=SkillsCategory)
+def category_summary_changed(sender, instance, created, **kwargs):
+    if not created:
+        summaries.refresh_skill_holders(UserSkills.objects.filter(skill__category=instance))
+
+
+# Keep the instructor search index (name, bio, skill names) in step
+@receiver(post_save, sender=User)
+def instructor_saved(sender, instance, **kwargs):
+    search.index_instructors([instance.pk])
+
+
+@receiver(post_delete, sender=User)
+def instructor_deleted(sender, instance, **kwargs):
+    search.remove_instructors([instance.pk])
+
+
+@receiver(post_save, sender=UserSkills)
+def instructor_skill_added(sender, instance, created, **kwargs):
+    if created:
+        search.index_instructors([instance.user_id])
+
+
+@receiver(post_delete, sender=UserSkills)
+def instructor_skill_removed(sender, instance, **kwargs):
+    search.index_instructors([instance.user_id])
+
+
+@receiver(post_save, sender=Skills)
+def instructor_skill_renamed(sender, instance, created, **kwargs):
+    if not created:
+        search.index_skill_holders([instance.pk])
+
+
+# Take the learner rating of a deleted session out of the teacher's stats
+@receiver(post_delete, sender=Session)
+def rated_session_deleted(sender, instance, **kwargs):
+    if instance.learner_rating is not None:
+        ratings.record_rating(instance.teacher_id, instance.skill_id, instance.learner_rating, None)
+
+
+# Drop the cached instructor profile snapshots
+@receiver([post_save, post_delete], sender=User)
+def profile_user_changed(sender, instance, **kwargs):
+    profiles.invalidate_user_profiles(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=UserSkills)
+def profile_skills_changed(sender, instance, **kwargs):
+    profiles.invalidate_profiles(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Session)
+def profile_sessions_changed(sender, instance, **kwargs):
+    profiles.invalidate_profiles(instance.teacher_id)
+
+
+@receiver(transitions.transitioned, sender=Session)
+def profile_sessions_transitioned(sender, rows, **kwargs):
+    profiles.invalidate_profiles(*{row.teacher_id for row in rows})
+
+
+# Mark a teacher for rescoring when they add a skill, get or answer requests,
+# or are rated; rank_teachers --stale does the scoring off the request path
+@receiver(post_save, sender=UserSkills)
+def ranked_skill_added(sender, instance, created, **kwargs):
+    if created:
+        ranking.mark_stale([instance.user_id])
+
+
+@receiver(post_delete, sender=UserSkills)
+def ranked_skill_removed(sender, instance, **kwargs):
+    TeacherSkillScore.objects.filter(teacher_id=instance.user_id, skill_id=instance.skill_id).delete()
+
+
+@receiver([post_save, post_delete], sender=Request)
+def ranked_requests_changed(sender, instance, **kwargs):
+    ranking.mark_stale([instance.receiver_id])
+
+
+@receiver(transitions.transitioned, sender=Request)
+def ranked_requests_transitioned(sender, rows, **kwargs):
+    ranking.mark_stale(row.receiver_id for row in rows)
+
+
+@receiver(post_save, sender=Session)
+def ranked_session_rated(sender, instance, update_fields=None, **kwargs):
+    if update_fields and "learner_rating" in update_fields:
+        ranking.mark_stale([instance.teacher_id])
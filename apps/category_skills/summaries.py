@@ -0,0 +1,76 @@
+from collections import defaultdict
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from apps.accounts.models import User
+from .models import UserSkills
+
+# Instructor cards only show a skill count and the first few skills, so
+# both are stored on User (skills_count, top_skills) and kept in step by
+# the UserSkills signals. Card lists then read one table.
+TOP_SKILLS = 3
+REBUILD_CHUNK = 1000
+
+
+def skill_summary(skill):
+    return {
+        "id": skill.id,
+        "name": skill.name,
+        "level": skill.level,
+        "level_display": skill.get_level_display(),
+        "category": skill.category.name,
+    }
+
+
+def refresh_user_summaries(user_ids):
+    """Recompute skills_count and top_skills for ``user_ids`` in three queries"""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+
+    counts = dict(
+        UserSkills.objects.filter(user_id__in=user_ids)
+        .values("user_id").annotate(total=Count("id")).values_list("user_id", "total")
+    )
+    # First skills each user added, like the cards always showed
+    first = (
+        UserSkills.objects.filter(user_id__in=user_ids)
+        .annotate(position=Window(RowNumber(), partition_by=F("user_id"), order_by=F("id").asc()))
+        .filter(position__lte=TOP_SKILLS)
+        .select_related("skill__category")
+        .order_by("user_id", "position")
+    )
+    top_skills = defaultdict(list)
+    for user_skill in first:
+        top_skills[user_skill.user_id].append(skill_summary(user_skill.skill))
+
+    User.objects.bulk_update(
+        [User(pk=user_id, skills_count=counts.get(user_id, 0), top_skills=top_skills[user_id])
+         for user_id in user_ids],
+        ["skills_count", "top_skills"],
+    )
+
+
+def refresh_skill_holders(user_skills):
+    """Refresh every user holding one of ``user_skills``, a chunk at a time"""
+    user_ids = user_skills.values_list("user_id", flat=True).distinct().order_by("user_id")
+    chunk = []
+    for user_id in user_ids.iterator(chunk_size=REBUILD_CHUNK):
+        chunk.append(user_id)
+        if len(chunk) == REBUILD_CHUNK:
+            refresh_user_summaries(chunk)
+            chunk = []
+    refresh_user_summaries(chunk)
+
+
+def rebuild_user_summaries():
+    """Recompute the summary of every user; returns how many were updated"""
+    updated = 0
+    chunk = []
+    for user_id in User.objects.order_by("id").values_list("id", flat=True).iterator(chunk_size=REBUILD_CHUNK):
+        chunk.append(user_id)
+        if len(chunk) == REBUILD_CHUNK:
+            refresh_user_summaries(chunk)
+            updated += len(chunk)
+            chunk = []
+    refresh_user_summaries(chunk)
+    return updated + len(chunk)
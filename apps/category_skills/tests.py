@@ -1,3 +1,1209 @@
-from django.test import TestCase
+import pickle
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.db.models import Count, Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from apps.accounts.models import User
+from apps.notifications.models import Notification
+from .models import (
+    SkillsCategory, Skills, UserSkills, Request, Session, TeacherRating, TeacherSkillRating, SkillRecommendation,
+    TeacherSkillScore, StaleTeacherScore, TeachableSkill,
+)
+from . import profiles, sampling, transitions
+from .ranking import rank_stale_teachers, rebuild_teacher_scores, top_teachers
+from .recommendations import rebuild_recommendations
+from .expiry import expire_requests
+from .facets import facet_signature, skill_facets
+from .search import ranked_skill_ids, rebuild_search_index, search_skills, search_instructors
+from .serializers import InstructorSerializer
+from .views import request_stats, session_stats
 
-# Create your tests here.
+
+def make_category(name="Technology"):
+    return SkillsCategory.objects.create(name=name, description=f"{name} related courses")
+
+
+def make_user(username, **fields):
+    """A valid User named after ``username``; ``fields`` override the defaults"""
+    return User.objects.create(**{
+        "username": username, "first_name": "Demo", "last_name": username.title(),
+        "gender": "M", "personal_email": f"{username}@example.com", "year": "1",
+        **fields,
+    })
+
+
+class SkillSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tech = make_category()
+        cls.design = make_category("Design")
+        cls.python = Skills.objects.create(name="Python", category=cls.tech, description="Scripting for everyone")
+        cls.django = Skills.objects.create(name="Django", category=cls.tech, description="Web apps written in Python")
+        cls.figma = Skills.objects.create(name="Figma", category=cls.design, description="Interface mockups")
+
+    def test_name_match_ranks_above_description_match(self):
+        self.assertEqual(ranked_skill_ids("python"), [self.python.id, self.django.id])
+
+    def test_matches_word_prefixes_and_category(self):
+        self.assertEqual(ranked_skill_ids("pyth"), [self.python.id, self.django.id])
+        self.assertEqual(ranked_skill_ids("design"), [self.figma.id])
+        self.assertEqual(ranked_skill_ids("web python"), [self.django.id])
+        self.assertEqual(ranked_skill_ids("  "), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.figma.description = "Prototyping in the browser"
+        self.figma.save()
+        self.assertEqual(ranked_skill_ids("prototyping"), [self.figma.id])
+        self.assertEqual(ranked_skill_ids("mockups"), [])
+
+        self.tech.name = "Programming"
+        self.tech.save()
+        self.assertEqual(set(ranked_skill_ids("programming")), {self.python.id, self.django.id})
+
+        self.django.delete()
+        self.assertEqual(ranked_skill_ids("python"), [self.python.id])
+
+    def test_search_skills_keeps_queryset_filters(self):
+        results = search_skills(Skills.objects.filter(category=self.tech), "python")
+        self.assertEqual(list(results), [self.python, self.django])
+        self.assertFalse(search_skills(Skills.objects.filter(category=self.design), "python").exists())
+
+    def test_course_view_ranks_search_results(self):
+        teacher = make_user("teacher")
+        for skill in [self.python, self.django, self.figma]:
+            UserSkills.objects.create(user=teacher, skill=skill)
+
+        response = self.client.get(reverse("category_skills:courses"), {"q": "python"})
+
+        self.assertEqual(list(response.context["page_obj"]), [self.python, self.django])
+
+    def test_counts_and_pages_cover_every_match(self):
+        teacher = make_user("teacher")
+        # bulk_create sends no signals, so index the new rows by hand
+        skills = Skills.objects.bulk_create([
+            Skills(name=f"Python {i}", category=self.design if i % 3 else self.tech, description="Description")
+            for i in range(600)
+        ])
+        rebuild_search_index()
+        UserSkills.objects.bulk_create([UserSkills(user=teacher, skill=skill) for skill in [self.python, *skills]])
+
+        response = self.client.get(reverse("category_skills:courses"), {"q": "python", "page": 151})
+        facets = response.context["facets"]
+        page_obj = response.context["page_obj"]
+
+        self.assertEqual(page_obj.paginator.count, 601)
+        self.assertEqual(facets["all_categories"], 601)
+        self.assertEqual(facets["categories"], {self.tech.id: 201, self.design.id: 400})
+        # Django has no teacher; the last page ends the ranked list of the rest
+        taught = [skill_id for skill_id in ranked_skill_ids("python") if skill_id != self.django.id]
+        self.assertEqual(len(taught), 601)
+        self.assertEqual([skill.id for skill in page_obj], taught[600:])
+
+
+class TeachableIndexTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tech = make_category()
+        cls.design = make_category("Design")
+        cls.skills = [
+            Skills.objects.create(name=f"Skill {i}", category=cls.tech if i < 3 else cls.design, description="Description")
+            for i in range(5)
+        ]
+        cls.users = [make_user(f"user{i}") for i in range(3)]
+        # skill i is taught by users[:i % 3 + 1]
+        for i, skill in enumerate(cls.skills):
+            for user in cls.users[:i % 3 + 1]:
+                UserSkills.objects.create(user=user, skill=skill)
+
+    def assertIndexConsistent(self):
+        rows = list(TeachableSkill.objects.order_by("seq").values_list("seq", "skill_id", "teacher_count"))
+        # Dense 1..N positions, one row per taught skill with its teacher count
+        self.assertEqual([seq for seq, _, _ in rows], list(range(1, len(rows) + 1)))
+        teachers = UserSkills.objects.values("skill_id").annotate(teachers=Count("id"))
+        self.assertEqual(
+            {skill_id: count for _, skill_id, count in rows},
+            {row["skill_id"]: row["teachers"] for row in teachers},
+        )
+
+    def test_add_teacher_counts_and_appends(self):
+        self.assertIndexConsistent()
+        self.assertEqual(TeachableSkill.objects.get(skill=self.skills[2]).teacher_count, 3)
+
+        skill = Skills.objects.create(name="Figma", category=self.design, description="Description")
+        UserSkills.objects.create(user=self.users[0], skill=skill)
+        self.assertEqual(TeachableSkill.objects.get(skill=skill).seq, 6)
+        self.assertIndexConsistent()
+
+    def test_add_teacher_gives_up_loudly(self):
+        skill = Skills.objects.create(name="Figma", category=self.design, description="Description")
+        with mock.patch.object(TeachableSkill.objects, "create", side_effect=IntegrityError) as create:
+            with self.assertRaises(IntegrityError):
+                sampling.add_teacher(skill.id)
+        self.assertEqual(create.call_count, sampling.ADD_TEACHER_ATTEMPTS)
+
+    def test_remove_teacher_fills_the_gap(self):
+        UserSkills.objects.filter(user=self.users[1], skill=self.skills[2]).delete()
+        self.assertEqual(TeachableSkill.objects.get(skill=self.skills[2]).teacher_count, 2)
+
+        # skills[0] has a single teacher; its seq is taken over by the last row
+        seq = TeachableSkill.objects.get(skill=self.skills[0]).seq
+        last = TeachableSkill.objects.order_by("-seq").first()
+        UserSkills.objects.filter(skill=self.skills[0]).delete()
+        self.assertFalse(TeachableSkill.objects.filter(skill=self.skills[0]).exists())
+        self.assertEqual(TeachableSkill.objects.get(pk=last.pk).seq, seq)
+        self.assertIndexConsistent()
+
+    def test_fill_gap_ignores_taken_slots(self):
+        before = list(TeachableSkill.objects.values_list("skill_id", "seq"))
+        sampling.fill_gap(1)
+        sampling.fill_gap(99)
+        self.assertEqual(list(TeachableSkill.objects.values_list("skill_id", "seq")), before)
+
+    def test_dense_across_cascades(self):
+        self.skills[1].delete()
+        self.assertIndexConsistent()
+
+        self.design.delete()
+        self.assertIndexConsistent()
+
+        self.users[0].delete()
+        self.assertIndexConsistent()
+        self.assertEqual(list(TeachableSkill.objects.values_list("skill_id", flat=True)), [self.skills[2].id])
+
+    def test_rebuild_repairs_bulk_inserts(self):
+        UserSkills.objects.bulk_create([UserSkills(user=self.users[2], skill=skill) for skill in self.skills[:2]])
+
+        self.assertEqual(sampling.rebuild_teachable_index(), 5)
+        self.assertIndexConsistent()
+
+        UserSkills.objects.filter(skill=self.skills[3]).delete()
+        self.assertIndexConsistent()
+
+
+class RandomInstructorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        skill = Skills.objects.create(name="Python", category=make_category(), description="Description")
+        cls.users = [make_user(f"user{i}") for i in range(6)]
+        # The last user teaches nothing
+        for user in cls.users[:5]:
+            UserSkills.objects.create(user=user, skill=skill)
+        cls.skill = skill
+
+    def setUp(self):
+        cache.clear()
+
+    def test_only_instructors_without_the_excluded_user(self):
+        self.assertEqual(list(sampling.instructor_ids()), [user.id for user in self.users[:5]])
+        for _ in range(10):
+            chosen = sampling.random_instructors(4, exclude_user_id=self.users[0].id)
+            self.assertEqual(len(chosen), 4)
+            self.assertNotIn(self.users[0], chosen)
+        self.assertEqual(set(sampling.random_instructors(10, exclude_user_id=self.users[0].id)), set(self.users[1:5]))
+
+    def test_id_array_reloaded_after_invalidation(self):
+        sampling.instructor_ids()
+        # Kept in the process while the shared version stands
+        with self.assertNumQueries(0):
+            sampling.instructor_ids()
+
+        # UserSkills writes bump the version through the signals
+        UserSkills.objects.create(user=self.users[5], skill=self.skill)
+        with self.assertNumQueries(1):
+            self.assertIn(self.users[5].id, sampling.instructor_ids())
+
+        sampling.invalidate_instructor_ids()
+        with self.assertNumQueries(1):
+            sampling.instructor_ids()
+
+    def test_skips_ids_of_deleted_users(self):
+        sampling.instructor_ids()
+        version = cache.get(sampling.INSTRUCTOR_IDS_VERSION_KEY)
+        deleted_id = self.users[1].id
+        User.objects.filter(id=deleted_id).delete()
+        # A process that has not seen the new version yet still holds the old id
+        cache.set(sampling.INSTRUCTOR_IDS_VERSION_KEY, version)
+        self.assertIn(deleted_id, sampling.instructor_ids())
+
+        chosen = sampling.random_instructors(10)
+        self.assertEqual({user.id for user in chosen}, {user.id for user in self.users[:5]} - {deleted_id})
+
+
+class InstructorViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = make_category()
+        cls.skills = [
+            Skills.objects.create(name=f"Skill {i}", category=category, description="Description")
+            for i in range(5)
+        ]
+        cls.users = [make_user(f"user{i}") for i in range(10)]
+        # users 0..7 teach i % 5 + 1 skills, the last two teach nothing
+        for i, user in enumerate(cls.users[:8]):
+            for skill in cls.skills[:i % 5 + 1]:
+                UserSkills.objects.create(user=user, skill=skill)
+
+    def test_pages_instructors_newest_first_with_counts(self):
+        response = self.client.get(reverse("category_skills:instructors"))
+
+        page_obj = response.context["page_obj"]
+        self.assertEqual(page_obj.paginator.count, 8)
+        instructors = list(page_obj)
+        self.assertEqual(instructors, self.users[7:1:-1])
+        for instructor in instructors:
+            expected = self.users.index(instructor) % 5 + 1
+            self.assertEqual(instructor.skills_count, expected)
+            self.assertEqual([skill["name"] for skill in instructor.top_skills],
+                             [skill.name for skill in self.skills[:min(expected, 3)]])
+
+    def test_queries_do_not_grow_with_instructors(self):
+        self.client.get(reverse("category_skills:instructors"))
+        # count + one page of users, skills come from the card summary
+        with self.assertNumQueries(2):
+            self.client.get(reverse("category_skills:instructors"))
+
+        for user in self.users[8:]:
+            for skill in self.skills:
+                UserSkills.objects.create(user=user, skill=skill)
+        with self.assertNumQueries(2):
+            self.client.get(reverse("category_skills:instructors"), {"page": 2})
+
+
+class InstructorSummaryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = make_category()
+        cls.skills = [
+            Skills.objects.create(name=f"Skill {i}", category=cls.category, description="Description", level="B")
+            for i in range(5)
+        ]
+        cls.user = make_user("teacher")
+
+    def summary(self):
+        self.user.refresh_from_db()
+        return self.user.skills_count, [skill["name"] for skill in self.user.top_skills]
+
+    def test_follows_user_skills(self):
+        for skill in self.skills:
+            UserSkills.objects.create(user=self.user, skill=skill)
+        self.assertEqual(self.summary(), (5, ["Skill 0", "Skill 1", "Skill 2"]))
+        self.assertEqual(self.user.top_skills[0], {
+            "id": self.skills[0].id, "name": "Skill 0", "level": "B",
+            "level_display": "Beginner", "category": "Technology",
+        })
+
+        UserSkills.objects.get(user=self.user, skill=self.skills[1]).delete()
+        self.assertEqual(self.summary(), (4, ["Skill 0", "Skill 2", "Skill 3"]))
+
+    def test_follows_skill_and_category_renames(self):
+        UserSkills.objects.create(user=self.user, skill=self.skills[0])
+
+        self.skills[0].name = "Python"
+        self.skills[0].save()
+        self.category.name = "Programming"
+        self.category.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.top_skills[0]["name"], "Python")
+        self.assertEqual(self.user.top_skills[0]["category"], "Programming")
+
+    def test_rebuild_repairs_bulk_inserts(self):
+        UserSkills.objects.bulk_create([UserSkills(user=self.user, skill=skill) for skill in self.skills[:2]])
+        self.assertEqual(self.summary(), (0, []))
+
+        call_command("rebuild_instructor_summaries", stdout=StringIO())
+        self.assertEqual(self.summary(), (2, ["Skill 0", "Skill 1"]))
+
+
+class CourseFacetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tech = make_category()
+        cls.design = make_category("Design")
+        skills = [
+            Skills.objects.create(name="Python", category=cls.tech, description="Scripting", level="B"),
+            Skills.objects.create(name="Django", category=cls.tech, description="Python web apps", level="I"),
+            Skills.objects.create(name="Rust", category=cls.tech, description="Systems", level="A"),
+            Skills.objects.create(name="Figma", category=cls.design, description="Mockups", level="B"),
+        ]
+        Skills.objects.create(name="Untaught", category=cls.design, description="Nobody", level="B")
+        cls.teacher = make_user("teacher")
+        for skill in skills:
+            UserSkills.objects.create(user=cls.teacher, skill=skill)
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, **params):
+        return self.client.get(reverse("category_skills:courses"), {"ajax": "1", **params}).json()["facets"]
+
+    def test_counts_per_category_and_level(self):
+        facets = self.get()
+        self.assertEqual(facets["categories"], {str(self.tech.id): 3, str(self.design.id): 1})
+        self.assertEqual(facets["levels"], {"B": 2, "I": 1, "A": 1})
+        self.assertEqual(facets["all_categories"], 4)
+
+    def test_each_facet_ignores_its_own_filter(self):
+        facets = self.get(**{"categories[]": [self.design.id], "levels[]": ["B"]})
+        # Categories are counted at level B, levels inside Design
+        self.assertEqual(facets["categories"], {str(self.tech.id): 1, str(self.design.id): 1})
+        self.assertEqual(facets["levels"], {"B": 1})
+
+    def test_counts_follow_search(self):
+        facets = self.get(q="python")
+        self.assertEqual(facets["categories"], {str(self.tech.id): 2})
+        self.assertEqual(facets["levels"], {"B": 1, "I": 1})
+
+    def test_one_cached_query_per_search_state(self):
+        skills = Skills.objects.all()
+        with self.assertNumQueries(1):
+            skill_facets(skills, facet_signature())
+        with self.assertNumQueries(0):
+            skill_facets(skills, facet_signature(), category_ids=[self.tech.id], levels=["B"])
+
+        # Teaching a new skill invalidates the cached grid
+        UserSkills.objects.create(user=self.teacher, skill=Skills.objects.get(name="Untaught"))
+        with self.assertNumQueries(1):
+            skill_facets(skills, facet_signature())
+
+    def test_full_page_shows_counts(self):
+        response = self.client.get(reverse("category_skills:courses"))
+        self.assertIn((self.tech, 3), response.context["categories"])
+        self.assertContains(response, 'data-level-count="B">2</span>', html=False)
+
+
+class InstructorSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = make_category()
+        cls.python = Skills.objects.create(name="Python", category=category, description="Scripting")
+        cls.figma = Skills.objects.create(name="Figma", category=category, description="Mockups")
+
+        cls.ada = make_user("ada", first_name="Ada", last_name="Teacher", bio="I love python scripting")
+        cls.guido = make_user("guido", first_name="Python", last_name="Teacher")
+        cls.grace = make_user("grace", first_name="Grace", last_name="Teacher")
+        UserSkills.objects.create(user=cls.ada, skill=cls.figma)
+        UserSkills.objects.create(user=cls.guido, skill=cls.figma)
+        UserSkills.objects.create(user=cls.grace, skill=cls.python)
+
+    def search(self, q):
+        return list(search_instructors(User.objects.all(), q))
+
+    def test_ranks_name_over_skills_over_bio(self):
+        self.assertEqual(self.search("python"), [self.guido, self.grace, self.ada])
+        self.assertEqual(self.search("grace pyth"), [self.grace])
+        self.assertEqual(self.search("nobody"), [])
+
+    def test_index_follows_profile_and_skill_changes(self):
+        self.ada.bio = "Rust only"
+        self.ada.save()
+        self.assertEqual(self.search("python"), [self.guido, self.grace])
+
+        UserSkills.objects.filter(user=self.grace).delete()
+        UserSkills.objects.create(user=self.ada, skill=self.python)
+        self.assertEqual(self.search("python"), [self.guido, self.ada])
+
+        self.figma.name = "Sketching"
+        self.figma.save()
+        self.assertEqual(set(self.search("sketch")), {self.ada, self.guido})
+
+        self.guido.delete()
+        self.assertEqual(self.search("python"), [self.ada])
+
+    def test_instructor_view_uses_index(self):
+        response = self.client.get(reverse("category_skills:instructors"), {"q": "python", "ajax": "1"})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(reverse("category_skills:instructors"), {"q": "python"})
+        self.assertEqual(list(response.context["page_obj"]), [self.guido, self.grace, self.ada])
+
+
+class RatingStatsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = make_category()
+        cls.python = Skills.objects.create(name="Python", category=category, description="Scripting")
+        cls.figma = Skills.objects.create(name="Figma", category=category, description="Mockups")
+
+        cls.teacher = make_user("teacher")
+        cls.learners = [make_user(f"learner{i}") for i in range(3)]
+        UserSkills.objects.create(user=cls.teacher, skill=cls.python)
+        UserSkills.objects.create(user=cls.teacher, skill=cls.figma)
+
+    def session(self, learner, skill, status="C"):
+        request = Request.objects.create(
+            requester=learner, receiver=self.teacher, skill=skill, description="Please teach me", status="A",
+        )
+        return Session.objects.create(
+            request=request, teacher=self.teacher, learner=learner, skill=skill,
+            title="Intro", scheduled_date=timezone.now(), status=status,
+        )
+
+    def rate(self, session, user, rating):
+        client_session = self.client.session
+        client_session["user_id"] = user.id
+        client_session.save()
+        return self.client.post(
+            reverse("category_skills:leave_feedback", args=[session.id]),
+            {"rating": rating, "feedback": "Thanks"}, HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        )
+
+    def stats(self, skill=None):
+        if skill:
+            row = TeacherSkillRating.objects.get(teacher=self.teacher, skill=skill)
+        else:
+            row = TeacherRating.objects.get(teacher=self.teacher)
+        return row.count, row.total, [count for _, count, _ in row.histogram]
+
+    def test_learner_ratings_update_stats(self):
+        first = self.session(self.learners[0], self.python)
+        response = self.rate(first, self.learners[0], 4)
+        self.assertTrue(response.json()["success"])
+        self.rate(self.session(self.learners[1], self.python), self.learners[1], 5)
+        self.rate(self.session(self.learners[2], self.figma), self.learners[2], 1)
+
+        self.assertEqual(self.stats(), (3, 10, [1, 1, 0, 0, 1]))
+        self.assertEqual(self.stats(self.python), (2, 9, [1, 1, 0, 0, 0]))
+        self.assertEqual(TeacherRating.objects.get(teacher=self.teacher).mean, 3.3)
+
+        # Changing a rating moves it to its new bucket
+        self.rate(first, self.learners[0], 2)
+        self.assertEqual(self.stats(self.python), (2, 7, [1, 0, 0, 1, 0]))
+
+        # Deleting a rated session takes its rating out
+        first.refresh_from_db()
+        first.delete()
+        self.assertEqual(self.stats(self.python), (1, 5, [1, 0, 0, 0, 0]))
+        self.assertEqual(self.stats(), (2, 6, [1, 0, 0, 0, 1]))
+
+    def test_rejects_invalid_feedback(self):
+        session = self.session(self.learners[0], self.python)
+        self.assertEqual(self.rate(session, self.learners[0], 6).status_code, 400)
+        self.assertEqual(self.rate(session, self.learners[1], 4).status_code, 403)
+        scheduled = self.session(self.learners[1], self.figma, status="S")
+        self.assertEqual(self.rate(scheduled, self.learners[1], 4).status_code, 400)
+
+        # The teacher rates the learner, which is not the teacher's rating
+        self.assertEqual(self.rate(session, self.teacher, 5).status_code, 200)
+        session.refresh_from_db()
+        self.assertEqual(session.teacher_rating, 5)
+        self.assertFalse(TeacherRating.objects.exists())
+
+    def test_rebuild_matches_incremental_stats(self):
+        for learner, rating in zip(self.learners, [3, 4, 4]):
+            self.rate(self.session(learner, self.python), learner, rating)
+        expected = self.stats(), self.stats(self.python)
+
+        call_command("rebuild_rating_stats", stdout=StringIO())
+        self.assertEqual((self.stats(), self.stats(self.python)), expected)
+
+    def test_pages_and_api_read_stats(self):
+        self.rate(self.session(self.learners[0], self.python), self.learners[0], 4)
+        self.client.session.flush()
+
+        response = self.client.get(reverse("category_skills:instructor_profile", args=[self.teacher.id]))
+        self.assertEqual(response.context["rating"].mean, 4.0)
+        self.assertEqual(len(response.context["reviews"]), 1)
+
+        response = self.client.get(reverse("category_skills:course_details", args=[self.python.id]))
+        self.assertEqual(response.context["skill_rating"].count, 1)
+
+        teacher = User.objects.select_related("rating_stats").get(pk=self.teacher.pk)
+        with self.assertNumQueries(0):
+            data = InstructorSerializer(teacher).data
+        self.assertEqual(data["rating"], {"count": 1, "mean": 4.0, "histogram": {"5": 0, "4": 1, "3": 0, "2": 0, "1": 0}})
+
+        unrated = User.objects.select_related("rating_stats").get(pk=self.learners[0].pk)
+        self.assertIsNone(InstructorSerializer(unrated).data["rating"])
+
+
+class InstructorProfileTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = make_category()
+        cls.skills = [
+            Skills.objects.create(name=f"Skill {i}", category=category, description="Description")
+            for i in range(6)
+        ]
+        cls.teacher = make_user("teacher")
+        cls.learner = make_user("learner")
+        for skill in cls.skills[:5]:
+            UserSkills.objects.create(user=cls.teacher, skill=skill)
+
+    def setUp(self):
+        cache.clear()
+
+    def add_sessions(self, count):
+        for skill in self.skills[:count]:
+            request = Request.objects.create(
+                requester=self.learner, receiver=self.teacher, skill=skill, description="Please teach me", status="A",
+            )
+            Session.objects.create(
+                request=request, teacher=self.teacher, learner=self.learner, skill=skill,
+                title="Intro", scheduled_date=timezone.now(), status="C",
+            )
+
+    def get(self, **params):
+        return self.client.get(reverse("category_skills:instructor_profile", args=[self.teacher.id]), params)
+
+    def test_fixed_queries_then_served_from_cache(self):
+        self.add_sessions(2)
+        # user, skills, session count, session page, reviews
+        with self.assertNumQueries(5):
+            response = self.get()
+        self.assertEqual(response.context["skills_count"], 5)
+        self.assertEqual(len(response.context["sessions_page"]), 2)
+
+        with self.assertNumQueries(0):
+            self.get(page=2)
+
+        # Same cost however long the history is
+        Request.objects.all().delete()
+        self.add_sessions(6)
+        cache.clear()
+        with self.assertNumQueries(5):
+            response = self.get(sessions_page=2)
+        self.assertEqual(response.context["sessions_page"].number, 2)
+        self.assertEqual(len(response.context["sessions_page"]), 1)
+
+    def test_snapshot_follows_changes(self):
+        self.get()
+
+        UserSkills.objects.create(user=self.teacher, skill=self.skills[5])
+        self.assertEqual(self.get().context["skills_count"], 6)
+
+        self.add_sessions(1)
+        self.assertEqual(self.get().context["sessions_page"].paginator.count, 1)
+
+        self.teacher.bio = "Now with a biography"
+        self.teacher.save()
+        self.assertContains(self.get(), "Now with a biography")
+
+    def test_snapshot_leaves_private_columns_out(self):
+        self.add_sessions(1)
+        Session.objects.update(learner_rating=5, learner_feedback="Great")
+        User.objects.update(current_password="pbkdf2_sha256$secret-hash", previous_password="pbkdf2_sha256$old-hash")
+
+        profile = profiles.instructor_profile(self.teacher.id)
+        snapshot = pickle.dumps(profile)
+        self.assertNotIn(b"secret-hash", snapshot)
+        self.assertNotIn(b"old-hash", snapshot)
+        for user in [profile["instructor"], profile["reviews"][0].learner, profile["sessions_page"][0].learner]:
+            self.assertIn("current_password", user.get_deferred_fields())
+
+        # The templates read nothing that was left out, so a warm page runs no queries
+        self.get()
+        with self.assertNumQueries(0):
+            self.assertContains(self.get(), "Great")
+
+    def test_learner_changes_reach_the_teacher_profile(self):
+        self.add_sessions(1)
+        Session.objects.update(learner_rating=4, learner_feedback="Clear explanations")
+        self.assertContains(self.get(), "Learner")
+
+        self.learner.last_name = "Renamed"
+        self.learner.save()
+        self.assertContains(self.get(), "Renamed")
+
+    def test_ajax_pages_each_tab(self):
+        self.add_sessions(6)
+        ajax = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+        url = reverse("category_skills:instructor_profile", args=[self.teacher.id])
+
+        html = self.client.get(url, {"section": "experience", "sessions_page": 2}, **ajax).json()["html"]
+        self.assertEqual(html.count("experience-card"), 1)
+
+        html = self.client.get(url, {"section": "courses", "page": 2}, **ajax).json()["html"]
+        self.assertEqual(html.count('class="course-item"'), 1)
+
+    def test_unknown_instructor_is_404(self):
+        response = self.client.get(reverse("category_skills:instructor_profile", args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+
+class SkillRecommendationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = make_category()
+        cls.python, cls.django, cls.sql, cls.figma = [
+            Skills.objects.create(name=name, category=category, description="Description")
+            for name in ["Python", "Django", "SQL", "Figma"]
+        ]
+        cls.users = [make_user(f"user{i}") for i in range(5)]
+        # Python goes with Django more often than with SQL, Figma with neither
+        for user in cls.users[:3]:
+            UserSkills.objects.create(user=user, skill=cls.python)
+            UserSkills.objects.create(user=user, skill=cls.django)
+        UserSkills.objects.create(user=cls.users[2], skill=cls.sql)
+        UserSkills.objects.create(user=cls.users[3], skill=cls.python)
+        UserSkills.objects.create(user=cls.users[4], skill=cls.figma)
+
+    def recommended(self, user):
+        return list(SkillRecommendation.objects.filter(user=user).values_list("skill__name", flat=True))
+
+    def dashboard(self, user, login=True):
+        if login:
+            session = self.client.session
+            session["user_id"] = user.id
+            session.save()
+        return self.client.get(reverse("accounts:dashboard"))
+
+    def test_similar_skills_ranked_first(self):
+        sizes = rebuild_recommendations()
+        self.assertEqual(sizes["users"], 5)
+        self.assertEqual(self.recommended(self.users[3]), ["Django", "SQL"])
+        # Skills a user already has are never suggested
+        self.assertEqual(self.recommended(self.users[0]), ["SQL"])
+        self.assertEqual(self.recommended(self.users[4]), [])
+
+    def test_sessions_count_as_history(self):
+        request = Request.objects.create(
+            requester=self.users[3], receiver=self.users[2], skill=self.sql, description="Please teach me", status="A",
+        )
+        Session.objects.create(
+            request=request, teacher=self.users[2], learner=self.users[3], skill=self.sql,
+            title="Intro", scheduled_date=timezone.now(), status="C",
+        )
+        rebuild_recommendations()
+        # Learning SQL ties user3 to SQL's neighbours, and SQL is no longer suggested
+        self.assertEqual(self.recommended(self.users[3]), ["Django"])
+
+    def test_command_replaces_previous_rows(self):
+        out = StringIO()
+        call_command("recommend_skills", "--top", "1", stdout=out)
+        self.assertIn("Stored", out.getvalue())
+        call_command("recommend_skills", "--top", "1", stdout=out)
+        self.assertEqual(self.recommended(self.users[3]), ["Django"])
+        self.assertEqual(SkillRecommendation.objects.filter(user=self.users[3]).count(), 1)
+
+    def test_dashboard_shows_stored_recommendations(self):
+        rebuild_recommendations()
+        response = self.dashboard(self.users[3])
+        self.assertEqual([skill.name for skill in response.context["recommended_skills"]], ["Django", "SQL"])
+        # Teaching Python is not learning it
+        self.assertEqual(response.context["enrolled_skills_count"], 0)
+
+        # Added since the last run: hidden without waiting for the next one
+        UserSkills.objects.create(user=self.users[3], skill=self.django)
+        response = self.dashboard(self.users[3])
+        self.assertEqual([skill.name for skill in response.context["recommended_skills"]], ["SQL"])
+
+    def test_dashboard_counts_skills_being_learned(self):
+        for skill, status in [(self.sql, "S"), (self.sql, "C"), (self.django, "C"), (self.figma, "CA")]:
+            request, _ = Request.objects.get_or_create(
+                requester=self.users[3], receiver=self.users[2], skill=skill,
+                defaults={"description": "Please teach me", "status": "A"},
+            )
+            Session.objects.create(
+                request=request, teacher=self.users[2], learner=self.users[3], skill=skill,
+                title="Intro", scheduled_date=timezone.now(), status=status,
+            )
+        response = self.dashboard(self.users[3])
+        # SQL twice and the cancelled Figma session left out
+        self.assertEqual(response.context["enrolled_skills_count"], 2)
+        self.assertEqual(response.context["completed_courses_count"], 2)
+
+    def test_dashboard_falls_back_to_popular_skills(self):
+        response = self.dashboard(self.users[4])
+        self.assertEqual(
+            [skill.name for skill in response.context["recommended_skills"]], ["Python", "Django", "SQL"],
+        )
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_dashboard_query_count(self):
+        rebuild_recommendations()
+        for i in range(5):
+            make_category(f"Category {i}")
+        # More skills than top_skills keeps, and nothing stored for them
+        heavy = make_user("heavy")
+        for skill in [self.python, self.django, self.sql, self.figma]:
+            UserSkills.objects.create(user=heavy, skill=skill)
+
+        # Session, user, recommendations, completed count, and the user again for the context processor
+        self.dashboard(self.users[3])
+        with self.assertNumQueries(5):
+            response = self.dashboard(self.users[3], login=False)
+        self.assertEqual([skill.name for skill in response.context["recommended_skills"]], ["Django", "SQL"])
+        # Plus the user's skill ids and the popular skills
+        self.dashboard(heavy)
+        with self.assertNumQueries(7):
+            response = self.dashboard(heavy, login=False)
+        self.assertEqual(response.context["recommended_skills"], [])
+
+        # Cold catalog cache adds the categories and skills; still within the accounts:dashboard budget
+        cache.clear()
+        self.assertEqual(self.dashboard(heavy).status_code, 200)
+
+
+class TeacherRankingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = make_category()
+        cls.skill = Skills.objects.create(name="Python", category=category, description="Scripting")
+        cls.other = Skills.objects.create(name="Django", category=category, description="Web")
+
+        cls.quick, cls.busy, cls.picky = make_user("quick"), make_user("busy"), make_user("picky")
+        cls.learners = [make_user(f"learner{i}") for i in range(4)]
+        for teacher in [cls.quick, cls.busy, cls.picky]:
+            UserSkills.objects.create(user=teacher, skill=cls.skill)
+
+    def setUp(self):
+        # The prior rating is cached between rebuilds
+        cache.clear()
+
+    def request(self, learner, teacher, status="P", answered_after=None, skill=None):
+        request = Request.objects.create(
+            requester=learner, receiver=teacher, skill=skill or self.skill, description="Please teach me", status=status,
+        )
+        if answered_after is not None:
+            request.responded_at = request.created_at + answered_after
+            request.save()
+        return request
+
+    def ranked(self):
+        return [row.teacher.username for row in top_teachers(self.skill.id)]
+
+    def test_ranked_by_acceptance_speed_and_load(self):
+        for learner in self.learners[:2]:
+            self.request(learner, self.quick, "A", timedelta(minutes=30))
+            self.request(learner, self.picky, "R", timedelta(days=3))
+        for learner in self.learners:
+            self.request(learner, self.busy)
+
+        self.assertEqual(rebuild_teacher_scores(), 3)
+        self.assertEqual(self.ranked(), ["quick", "busy", "picky"])
+
+        quick = TeacherSkillScore.objects.get(teacher=self.quick, skill=self.skill)
+        self.assertEqual(quick.acceptance_rate, 1.0)
+        self.assertEqual(quick.median_response, timedelta(minutes=30))
+        self.assertEqual(quick.response_display, "30 minutes")
+        self.assertEqual(TeacherSkillScore.objects.get(teacher=self.busy).pending_count, 4)
+
+    def test_ratings_lift_a_teacher(self):
+        request = self.request(self.learners[0], self.picky, "A", timedelta(hours=1))
+        session = Session.objects.create(
+            request=request, teacher=self.picky, learner=self.learners[0], skill=self.skill,
+            title="Intro", scheduled_date=timezone.now(), status="C",
+        )
+        client_session = self.client.session
+        client_session["user_id"] = self.learners[0].id
+        client_session.save()
+        self.client.post(
+            reverse("category_skills:leave_feedback", args=[session.id]),
+            {"rating": 5, "feedback": "Great"}, HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        )
+        self.assertTrue(StaleTeacherScore.objects.filter(teacher_id=self.picky.id).exists())
+        rank_stale_teachers()
+        self.assertEqual(self.ranked()[0], "picky")
+        self.assertEqual(TeacherSkillScore.objects.get(teacher=self.picky).rating, 5.0)
+
+    def test_signals_only_mark_teachers_stale(self):
+        rebuild_teacher_scores()
+        self.assertFalse(StaleTeacherScore.objects.exists())
+        UserSkills.objects.create(user=self.quick, skill=self.other)
+        self.assertFalse(TeacherSkillScore.objects.filter(teacher=self.quick, skill=self.other).exists())
+        self.assertEqual(rank_stale_teachers(), 1)
+        self.assertTrue(TeacherSkillScore.objects.filter(teacher=self.quick, skill=self.other).exists())
+        self.assertFalse(StaleTeacherScore.objects.exists())
+
+        before = TeacherSkillScore.objects.get(teacher=self.quick, skill=self.skill).score
+        # The insert and one upsert of the stale mark, no scoring
+        with self.assertNumQueries(2):
+            self.request(self.learners[0], self.quick)
+        self.assertEqual(TeacherSkillScore.objects.get(teacher=self.quick, skill=self.skill).score, before)
+        call_command("rank_teachers", "--stale", stdout=StringIO())
+        after = TeacherSkillScore.objects.get(teacher=self.quick, skill=self.skill)
+        self.assertEqual(after.pending_count, 1)
+        self.assertLess(after.score, before)
+
+        UserSkills.objects.filter(user=self.quick, skill=self.other).delete()
+        self.assertFalse(TeacherSkillScore.objects.filter(teacher=self.quick, skill=self.other).exists())
+
+    def test_prior_rating_cached_between_rebuilds(self):
+        rebuild_teacher_scores()
+        with CaptureQueriesContext(connection) as queries:
+            rank_stale_teachers()
+            UserSkills.objects.create(user=self.quick, skill=self.other)
+            rank_stale_teachers()
+        self.assertFalse([query for query in queries if "teacher_ratings" in query["sql"]])
+
+    def test_unranked_skill_still_lists_teachers(self):
+        TeacherSkillScore.objects.all().delete()
+        self.assertEqual(sorted(self.ranked()), ["busy", "picky", "quick"])
+
+    def test_course_page_lists_ranked_teachers(self):
+        call_command("rank_teachers", stdout=StringIO())
+        self.request(self.learners[0], self.busy)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("category_skills:course_details", args=[self.skill.id]))
+        self.assertEqual(len(response.context["teachers"]), 3)
+        self.assertEqual(response.context["teacher"], response.context["teachers"][0].teacher)
+        self.assertContains(response, "Choose a Teacher")
+
+
+class RequestManagementTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = make_category()
+        skills = [
+            Skills.objects.create(name=f"Skill {i}", category=category, description="Description")
+            for i in range(6)
+        ]
+        cls.user, cls.other = [make_user(username) for username in ["user", "other"]]
+        for skill, status in zip(skills, ["P", "P", "A", "R", "C", "A"]):
+            Request.objects.create(
+                requester=cls.user, receiver=cls.other, skill=skill, description="Please teach me", status=status,
+            )
+        for skill, status in zip(skills[:3], ["P", "A", "A"]):
+            Request.objects.create(
+                requester=cls.other, receiver=cls.user, skill=skill, description="Please teach me", status=status,
+            )
+
+    def setUp(self):
+        session = self.client.session
+        session["user_id"] = self.user.id
+        session.save()
+
+    def test_stats_from_one_query(self):
+        with self.assertNumQueries(1):
+            stats = request_stats(self.user.id)
+        self.assertEqual(stats, {
+            "total_sent": 6, "total_received": 3,
+            "pending_sent": 2, "pending_received": 1,
+            "accepted_sent": 2, "accepted_received": 2,
+        })
+
+    def test_ajax_page_skips_stats(self):
+        url = reverse("category_skills:requests")
+        # session, user (view and context processor) and the page of the one section, nothing counted
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {"section": "sent"}, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        self.assertIn(f"sent_page={response.context['sent_page_obj'].next_cursor}", response.json()["html"])
+
+        response = self.client.get(url, {"section": "other"}, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        self.assertEqual(response.json(), {"html": ""})
+
+    def test_keyset_pages_walk_the_list(self):
+        url = reverse("category_skills:requests")
+        expected = list(
+            Request.objects.filter(requester=self.user).order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+        first = self.client.get(url, {"section": "sent"}, HTTP_X_REQUESTED_WITH="XMLHttpRequest").context["sent_page_obj"]
+        second = self.client.get(
+            url, {"section": "sent", "sent_page": first.next_cursor}, HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        ).context["sent_page_obj"]
+        self.assertEqual([r.id for r in first] + [r.id for r in second], expected)
+        self.assertFalse(second.has_next())
+
+        back = self.client.get(
+            url, {"section": "sent", "sent_page": second.previous_cursor}, HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        ).context["sent_page_obj"]
+        self.assertEqual([r.id for r in back], [r.id for r in first])
+
+        # A tampered cursor shows the first page, like a bad page number did
+        response = self.client.get(url, {"sent_page": "nonsense"})
+        self.assertEqual([r.id for r in response.context["sent_page_obj"]], [r.id for r in first])
+
+    def test_full_page_shows_stats(self):
+        response = self.client.get(reverse("category_skills:requests"))
+        self.assertEqual(response.context["stats"]["total_sent"], 6)
+        self.assertContains(response, "Sent Requests (6)")
+        self.assertContains(response, "1 pending")
+
+
+class SessionManagementTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = make_category()
+        skills = [
+            Skills.objects.create(name=f"Skill {i}", category=category, description="Description")
+            for i in range(6)
+        ]
+        cls.user, cls.other = [make_user(username) for username in ["user", "other"]]
+        UserSkills.objects.create(user=cls.user, skill=skills[0])
+        cls.user.refresh_from_db()
+        for teacher, learner, statuses in [(cls.user, cls.other, ["S", "S", "C", "A", "CA", "C"]),
+                                           (cls.other, cls.user, ["S", "C", "C"])]:
+            for skill, status in zip(skills, statuses):
+                request = Request.objects.create(
+                    requester=learner, receiver=teacher, skill=skill, description="Please teach me", status="A",
+                )
+                Session.objects.create(
+                    request=request, teacher=teacher, learner=learner, skill=skill, title="Session",
+                    scheduled_date=timezone.now() + timedelta(days=1), status=status,
+                )
+
+    def setUp(self):
+        session = self.client.session
+        session["user_id"] = self.user.id
+        session.save()
+
+    def test_stats_from_one_query(self):
+        with self.assertNumQueries(1):
+            stats = session_stats(self.user.id)
+        self.assertEqual(stats, {
+            "total_teaching": 6, "total_learning": 3,
+            "scheduled_teaching": 2, "scheduled_learning": 1,
+            "completed_teaching": 2, "completed_learning": 2,
+        })
+
+    def test_ajax_page_renders_one_section(self):
+        url = reverse("category_skills:sessions")
+        # session, user (view and context processor) and the page of the one section, nothing counted
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {"section": "teaching"}, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        page = response.context["teaching_page_obj"]
+        self.assertEqual(len(page), 4)
+        self.assertIn(f"teaching_page={page.next_cursor}", response.json()["html"])
+
+        response = self.client.get(
+            url, {"section": "teaching", "teaching_page": page.next_cursor}, HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        )
+        self.assertEqual(len(response.context["teaching_page_obj"]), 2)
+        self.assertFalse(response.context["teaching_page_obj"].has_next())
+
+    def test_learners_without_skills_see_no_teaching(self):
+        session = self.client.session
+        session["user_id"] = self.other.id
+        session.save()
+
+        response = self.client.get(reverse("category_skills:sessions"))
+
+        self.assertEqual(len(response.context["teaching_page_obj"]), 0)
+        self.assertEqual(response.context["stats"]["total_teaching"], 0)
+        self.assertEqual(response.context["stats"]["total_learning"], 6)
+        self.assertContains(response, "Learning Sessions (6)")
+
+
+class TransitionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = make_category()
+        cls.skill = Skills.objects.create(name="Python", category=category, description="Scripting")
+        cls.learner, cls.teacher = [make_user(username) for username in ["learner", "teacher"]]
+        UserSkills.objects.create(user=cls.teacher, skill=cls.skill)
+
+    def setUp(self):
+        self.skill_request = Request.objects.create(
+            requester=self.learner, receiver=self.teacher, skill=self.skill, description="Please teach me",
+        )
+
+    def post(self, user, name, *args, **data):
+        session = self.client.session
+        session["user_id"] = user.id
+        session.save()
+        return self.client.post(reverse(f"category_skills:{name}", args=args), data).json()
+
+    def test_guarded_update_wins_once(self):
+        accepted = transitions.apply(Request, "accept", self.skill_request.id, Q(receiver=self.teacher))
+        self.assertEqual(accepted.status, "A")
+        self.assertIsNotNone(accepted.responded_at)
+        self.assertEqual(accepted.responded_at, Request.objects.get(pk=accepted.pk).responded_at)
+
+        # Already accepted: neither a second accept nor a reject goes through
+        self.assertIsNone(transitions.apply(Request, "accept", self.skill_request.id, Q(receiver=self.teacher)))
+        self.assertIsNone(transitions.apply(Request, "reject", self.skill_request.id, Q(receiver=self.teacher)))
+        self.assertEqual(Request.objects.get(pk=self.skill_request.pk).status, "A")
+
+    def test_only_allowed_users_move_rows(self):
+        self.assertIsNone(transitions.apply(Request, "accept", self.skill_request.id, Q(receiver=self.learner)))
+        response = self.post(self.learner, "accept_request", self.skill_request.id)
+        self.assertEqual(response["message"], "Request not found or access denied.")
+
+        self.assertTrue(self.post(self.teacher, "accept_request", self.skill_request.id)["success"])
+        response = self.post(self.teacher, "accept_request", self.skill_request.id)
+        self.assertEqual(response["message"], "This request has already been processed.")
+
+    def test_post_save_receivers_still_run(self):
+        rebuild_teacher_scores()
+        self.assertEqual(TeacherSkillScore.objects.get(teacher=self.teacher).pending_count, 1)
+        self.post(self.teacher, "accept_request", self.skill_request.id)
+        self.assertTrue(StaleTeacherScore.objects.filter(teacher_id=self.teacher.id).exists())
+        rank_stale_teachers()
+        score = TeacherSkillScore.objects.get(teacher=self.teacher)
+        self.assertEqual((score.pending_count, score.acceptance_rate), (0, 1.0))
+
+    def test_session_lifecycle(self):
+        session = Session.objects.create(
+            request=self.skill_request, teacher=self.teacher, learner=self.learner, skill=self.skill,
+            title="Intro", scheduled_date=timezone.now(), status="S",
+        )
+        response = self.post(self.learner, "start_session", session.id)
+        self.assertIn("Only teachers", response["message"])
+        self.assertTrue(self.post(self.teacher, "start_session", session.id)["success"])
+        self.assertTrue(self.post(self.learner, "complete_session", session.id)["success"])
+
+        session.refresh_from_db()
+        self.assertEqual(session.status, "C")
+        self.assertIsNotNone(session.completed_at)
+        response = self.post(self.teacher, "cancel_session", session.id, reason="Clash")
+        self.assertEqual(response["message"], "Completed or cancelled sessions cannot be cancelled.")
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command("benchmark_transitions", "--threads", "1", "--rounds", "2", stdout=out)
+        self.assertIn("guarded update", out.getvalue())
+        self.assertIn("0/2 rounds accepted more than once", out.getvalue())
+
+
+class BulkRequestActionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = make_category()
+        cls.skill = Skills.objects.create(name="Python", category=category, description="Scripting")
+
+        cls.teacher, cls.stranger = make_user("teacher"), make_user("stranger")
+        cls.learners = [make_user(f"learner{i}") for i in range(4)]
+        UserSkills.objects.create(user=cls.teacher, skill=cls.skill)
+
+    def setUp(self):
+        self.requests = [
+            Request.objects.create(
+                requester=learner, receiver=self.teacher, skill=self.skill, description="Please teach me",
+                status="A" if i == 3 else "P",
+            )
+            for i, learner in enumerate(self.learners)
+        ]
+        self.foreign = Request.objects.create(
+            requester=self.learners[0], receiver=self.stranger, skill=self.skill, description="Please teach me",
+        )
+
+    def post(self, user, **data):
+        session = self.client.session
+        session["user_id"] = user.id
+        session.save()
+        return self.client.post(reverse("category_skills:bulk_request_action"), data).json()
+
+    def test_accept_many_in_one_update(self):
+        ids = [request.id for request in self.requests] + [self.foreign.id]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(self.teacher, action="accept", ids=ids)
+        statements = [query["sql"] for query in queries.captured_queries]
+        self.assertEqual(len([sql for sql in statements if sql.startswith('UPDATE "skill_requests"')]), 1)
+        self.assertEqual(len([sql for sql in statements if sql.startswith('INSERT INTO "notifications"')]), 1)
+
+        results = response["results"]
+        self.assertEqual(response["message"], "3 of 5 requests updated.")
+        for request in self.requests[:3]:
+            self.assertEqual(results[str(request.id)], {"success": True, "status": "A", "status_display": "Accepted"})
+        self.assertEqual(results[str(self.requests[3].id)]["message"], "This request has already been processed.")
+        self.assertEqual(results[str(self.foreign.id)]["message"], "Request not found or access denied.")
+
+        self.assertEqual(Request.objects.filter(receiver=self.teacher, status="A").count(), 4)
+        self.assertEqual(Request.objects.get(pk=self.foreign.pk).status, "P")
+        notifications = Notification.objects.filter(notification_type="request_accepted")
+        self.assertEqual(
+            sorted(notifications.values_list("recipient_id", flat=True)),
+            sorted(learner.id for learner in self.learners[:3]),
+        )
+        self.assertEqual(notifications[0].content_object.receiver_id, self.teacher.id)
+        # The transitioned signal marks the teacher for rescoring
+        self.assertTrue(StaleTeacherScore.objects.filter(teacher_id=self.teacher.id).exists())
+        rank_stale_teachers()
+        self.assertEqual(TeacherSkillScore.objects.get(teacher=self.teacher).pending_count, 0)
+
+    def test_reject_needs_reason(self):
+        ids = [self.requests[0].id, self.requests[1].id]
+        self.assertEqual(
+            self.post(self.teacher, action="reject", ids=ids)["message"], "Please provide a reason for this action.",
+        )
+        response = self.post(self.teacher, action="reject", ids=ids, reason="Fully booked")
+        self.assertEqual(response["results"][str(ids[0])]["status"], "R")
+        self.assertIsNotNone(Request.objects.get(pk=ids[0]).responded_at)
+
+    def test_requester_cancels(self):
+        ids = [self.requests[0].id, self.foreign.id]
+        response = self.post(self.teacher, action="cancel", ids=ids, reason="Busy")
+        self.assertFalse(response["results"][str(ids[0])]["success"])
+        response = self.post(self.learners[0], action="cancel", ids=ids, reason="Busy")
+        self.assertEqual(response["message"], "2 of 2 requests updated.")
+
+    def test_rejects_bad_input(self):
+        self.assertEqual(self.post(self.teacher, action="delete", ids=[1])["message"], "Unknown action.")
+        self.assertEqual(self.post(self.teacher, action="accept", ids=["x"])["message"], "Invalid request ids.")
+        self.assertFalse(self.post(self.teacher, action="accept")["success"])
+
+
+class ExpiryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = make_category()
+        cls.skills = [
+            Skills.objects.create(name=f"Skill {i}", category=category, description="Description")
+            for i in range(5)
+        ]
+        cls.learner, cls.teacher = [make_user(username) for username in ["learner", "teacher"]]
+
+    def request(self, skill, status="P", age=timedelta(0)):
+        request = Request.objects.create(
+            requester=self.learner, receiver=self.teacher, skill=skill, description="Please teach me", status=status,
+        )
+        Request.objects.filter(pk=request.pk).update(created_at=timezone.now() - age)
+        return request
+
+    def session(self, request, status, scheduled_in):
+        return Session.objects.create(
+            request=request, teacher=self.teacher, learner=self.learner, skill=request.skill,
+            title="Intro", scheduled_date=timezone.now() + scheduled_in, status=status,
+        )
+
+    def status(self, row):
+        return type(row).objects.get(pk=row.pk).status
+
+    def test_expires_stale_requests_in_chunks(self):
+        stale = [self.request(skill, age=timedelta(days=30)) for skill in self.skills[:3]]
+        fresh = self.request(self.skills[3], age=timedelta(days=1))
+        answered = self.request(self.skills[4], status="A", age=timedelta(days=30))
+
+        # One SELECT and one UPDATE per chunk of 2, then an empty SELECT
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(expire_requests(chunk_size=2), 3)
+        updates = [q["sql"] for q in queries.captured_queries if q["sql"].startswith('UPDATE "skill_requests"')]
+        self.assertEqual(len(updates), 2)
+
+        self.assertEqual([self.status(request) for request in stale], ["E", "E", "E"])
+        self.assertEqual((self.status(fresh), self.status(answered)), ("P", "A"))
+        notifications = Notification.objects.filter(notification_type="request_expired")
+        self.assertEqual(notifications.count(), 3)
+        self.assertEqual(set(notifications.values_list("recipient_id", flat=True)), {self.learner.id})
+
+    def test_expires_unstarted_sessions(self):
+        request = self.request(self.skills[0], status="A")
+        overdue = self.session(request, "S", -timedelta(days=2))
+        pending = self.session(request, "P", -timedelta(days=3))
+        upcoming = self.session(request, "S", timedelta(days=1))
+        recent = self.session(request, "S", -timedelta(hours=2))
+        done = self.session(request, "C", -timedelta(days=5))
+
+        out = StringIO()
+        call_command("expire_stale", stdout=out)
+        self.assertIn("Expired 0 requests and 2 sessions", out.getvalue())
+        self.assertEqual(
+            [self.status(session) for session in [overdue, pending, upcoming, recent, done]],
+            ["E", "E", "S", "S", "C"],
+        )
+        # Both sides of each expired session are told
+        self.assertEqual(Notification.objects.filter(notification_type="session_expired").count(), 4)
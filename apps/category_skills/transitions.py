@@ -0,0 +1,132 @@
+from django.db import connections, transaction
+from django.db.models.signals import post_save
+from django.dispatch import Signal
+from django.db.models.sql import UpdateQuery
+from django.utils import timezone
+from .models import Request, Session
+
+# Status changes of requests and sessions. Each one is a single guarded
+# UPDATE ... WHERE id = ? AND status IN (...) [AND the user may do it],
+# so two clicks racing each other cannot both win, and only the columns
+# that change are written. The new row comes back through RETURNING where
+# the database has it (PostgreSQL, SQLite 3.35+) and a primary key read
+# elsewhere. post_save is sent with update_fields like save() would;
+# apply_many() sends one ``transitioned`` signal for all its rows instead.
+
+# sender=model, name=transition name, rows=the updated rows
+transitioned = Signal()
+
+
+class Transition:
+
+    def __init__(self, sources, target, stamp=None):
+        self.sources = sources  # statuses the row may be in
+        self.target = target
+        self.stamp = stamp  # datetime field set to now, if any
+
+
+TRANSITIONS = {
+    Request: {
+        "accept": Transition(["P"], "A", stamp="responded_at"),
+        "reject": Transition(["P"], "R", stamp="responded_at"),
+        "cancel": Transition(["P"], "C"),
+        "expire": Transition(["P"], "E"),
+    },
+    Session: {
+        "start": Transition(["S"], "A"),
+        "complete": Transition(["S", "A"], "C", stamp="completed_at"),
+        "cancel": Transition(["P", "S", "A"], "CA"),
+        "expire": Transition(["P", "S"], "E"),
+    },
+}
+
+
+def can_return_updated_rows(connection):
+    if connection.vendor == "postgresql":
+        return True
+    # Same SQLite version as RETURNING on UPDATE; MySQL and MariaDB have none
+    return connection.vendor == "sqlite" and connection.features.can_return_rows_from_bulk_insert
+
+
+def _update_returning(queryset, values):
+    """Run ``queryset.update(**values)`` with RETURNING; the updated rows"""
+    model = queryset.model
+    connection = connections[queryset.db]
+    query = queryset.query.chain(UpdateQuery)
+    query.add_update_values(values)
+    compiler = query.get_compiler(queryset.db)
+    # Turns filters on joined tables into a pk IN (...) subquery, as update() does
+    compiler.pre_sql_setup()
+    sql, params = compiler.as_sql()
+    fields = model._meta.concrete_fields
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.execute(f"{sql} RETURNING {columns}", params)
+        rows = cursor.fetchall()
+    # Converters a SELECT would apply, e.g. SQLite returns datetimes as text
+    converters = []
+    for field in fields:
+        column = field.get_col(model._meta.db_table)
+        converters.append((column, connection.ops.get_db_converters(column) + column.get_db_converters(connection)))
+    instances = []
+    for row in rows:
+        values = []
+        for (column, column_converters), value in zip(converters, row):
+            for converter in column_converters:
+                value = converter(value, column, connection)
+            values.append(value)
+        instances.append(model.from_db(queryset.db, [field.attname for field in fields], values))
+    return instances
+
+
+def _update(queryset, values):
+    """Run ``queryset.update(**values)``; the rows it changed, as they are now"""
+    if can_return_updated_rows(connections[queryset.db]):
+        return _update_returning(queryset, values)
+    model = queryset.model
+    with transaction.atomic(using=queryset.db):
+        # Locked, so the rows read back are exactly the ones updated
+        pks = list(queryset.select_for_update().values_list("pk", flat=True))
+        model.objects.filter(pk__in=pks).update(**values)
+        return list(model.objects.filter(pk__in=pks))
+
+
+def _values(transition, changes):
+    now = timezone.now()
+    # update() skips auto_now
+    values = {"status": transition.target, "updated_at": now, **(changes or {})}
+    if transition.stamp:
+        values[transition.stamp] = now
+    return values
+
+
+def apply(model, name, pk, *filters, changes=None):
+    """Move row ``pk`` of ``model`` through transition ``name`` with one guarded UPDATE.
+
+    ``filters`` are Q objects restricting who may do it, e.g.
+    ``Q(receiver=user)``, and ``changes`` extra field values to write.
+    Returns the updated row, or None when no row matched: missing, not
+    allowed, or already moved on.
+    """
+    transition = TRANSITIONS[model][name]
+    values = _values(transition, changes)
+    queryset = model.objects.filter(*filters, pk=pk, status__in=transition.sources)
+    rows = _update(queryset, values)
+    if not rows:
+        return None
+    post_save.send(
+        sender=model, instance=rows[0], created=False,
+        update_fields=frozenset(values), raw=False, using=queryset.db,
+    )
+    return rows[0]
+
+
+def apply_many(model, name, pks, *filters, changes=None):
+    """apply() to every row of ``pks`` with a single UPDATE; returns the rows that moved"""
+    transition = TRANSITIONS[model][name]
+    values = _values(transition, changes)
+    queryset = model.objects.filter(*filters, pk__in=pks, status__in=transition.sources)
+    rows = _update(queryset, values)
+    if rows:
+        transitioned.send(sender=model, name=name, rows=rows)
+    return rows
@@ -16,6 +16,7 @@ urlpatterns = [
     path('send_request/', views.send_request, name="send_request"),
     path('requests/', views.request_management, name="requests"),
     path('accept_request/<int:request_id>/', views.accept_request, name="accept_request"),
+    path('requests/bulk/', views.bulk_request_action, name="bulk_request_action"),
     path('reject_request/<int:request_id>/', views.reject_request, name="reject_request"),
     path('cancel_request/<int:request_id>/', views.cancel_request, name="cancel_request"),
     path('delete_request/<int:request_id>/', views.delete_request, name="delete_request"),
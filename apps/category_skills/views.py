@@ -1,54 +1,74 @@
 from django.shortcuts import render, get_object_or_404 , redirect
-from .models import SkillsCategory, Skills, UserSkills, Request, Session
+from .models import SkillsCategory, Skills, UserSkills, Request, Session, RatingStats, TeacherSkillRating
 from apps.accounts.models import User
 from django.core.paginator import Paginator
 from django.http import JsonResponse
 from django.template.loader import render_to_string
 from apps.accounts.views import login_required_custom
-from django.utils import timezone
-from django.db.models import Q
-from apps.university.models import Department
+from django.db import transaction
+from django.db.models import Count, Q, Exists, OuterRef, Prefetch
+from apps.core import catalog
+from apps.core.pagination import KeysetPage, KeysetPaginator
+from .search import search_skills, search_instructors
+from .facets import facet_signature, skill_facets
+from . import profiles, ranking, ratings, transitions
+from apps.notifications.models import Notification
+
+FEEDBACK_GIVEN_BUTTON = (
+    '<button class="btn btn-outline-secondary btn-sm" disabled>'
+    '<i class="bi bi-check-lg"></i> Feedback Given</button>'
+)
 
 def CourseView(request):
-    categories = SkillsCategory.objects.all()
+    categories = catalog.skill_categories()
     user_id = request.session.get("user_id")
 
-    # Get all users who have added skills
-    users_with_skills = User.objects.filter(
-        user_skills__isnull=False
-    ).distinct().prefetch_related("user_skills__skill__category")
-
+    # Skills taught by at least one other user
+    teachers = UserSkills.objects.filter(skill=OuterRef("pk"))
     if user_id:
-        users_with_skills = users_with_skills.exclude(id=user_id)
-
-    # Collect skills from other users
-    skills_qs = Skills.objects.filter(
-        user_skills__user__in=users_with_skills
-    ).distinct()
+        teachers = teachers.exclude(user_id=user_id)
+    skills_qs = Skills.objects.filter(Exists(teachers))
 
-    # Search filter
+    # Search filter, ranked by relevance
     search_query = request.GET.get("q")
     if search_query:
-        skills_qs = skills_qs.filter(name__icontains=search_query)
+        skills_qs = search_skills(skills_qs, search_query)
 
-    # Category filter
+    # Sidebar filters, "all" means no filter
     category_ids = request.GET.getlist("categories[]")
-    if category_ids and "all" not in category_ids:
+    if "all" in category_ids:
+        category_ids = []
+    level_filters = request.GET.getlist("levels[]")
+    if "all" in level_filters:
+        level_filters = []
+
+    # Per category/level counts from one cached GROUP BY over the search results
+    facets = skill_facets(skills_qs, facet_signature(user_id, search_query), category_ids, level_filters)
+
+    # Category filter
+    if category_ids:
         skills_qs = skills_qs.filter(category_id__in=category_ids)
 
     # Level filter
-    level_filters = request.GET.getlist("levels[]")
-    if level_filters and "all" not in level_filters:
+    if level_filters:
         skills_qs = skills_qs.filter(level__in=level_filters)
 
-    # Pagination
-    paginator = Paginator(skills_qs, 4)
+    # Pagination; each card shows its category and first teacher, fetched
+    # for the whole page in one join and one windowed prefetch
+    first_teacher = Prefetch(
+        "user_skills",
+        queryset=UserSkills.objects.select_related("user").only("skill_id", "user__first_name", "user__last_name")
+        .order_by("pk")[:1],
+        to_attr="first_teacher",
+    )
+    paginator = Paginator(skills_qs.select_related("category").prefetch_related(first_teacher), 4)
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
     context = {
-        "categories": categories,
-        "level_choices": Skills.LEVEL_CHOICES,
+        "categories": [(category, facets["categories"].get(category.id, 0)) for category in categories],
+        "level_choices": [(value, label, facets["levels"].get(value, 0)) for value, label in Skills.LEVEL_CHOICES],
+        "facets": facets,
         "page_obj": page_obj,
         "page_param": "page",
         "section": "courses",
@@ -57,24 +77,36 @@ def CourseView(request):
     # Only return JSON when AJAX flag is set
     if request.GET.get("ajax") == "1":
         html = render_to_string("category_skills/courses_grid.html", context, request=request)
-        return JsonResponse({"html": html})
+        return JsonResponse({"html": html, "facets": facets})
 
     # Otherwise return full HTML page
     return render(request, "category_skills/courses.html", context)
     
 def CourseDetailView(request, skill_id):
-    skill = get_object_or_404(Skills, id=skill_id)
-    # Get the user who added this skill
-    user_skill = UserSkills.objects.filter(skill=skill).first()
+    skill = get_object_or_404(Skills.objects.select_related("category"), id=skill_id)
+    # Best teachers of this skill, straight off the precomputed ranking
+    teachers = ranking.top_teachers(skill.id)
+    ranked = teachers[0] if teachers else None
+    # The top teacher's ratings for this skill, one row from the stats store
+    skill_rating = None
+    if ranked:
+        skill_rating = TeacherSkillRating.objects.filter(teacher_id=ranked.teacher_id, skill=skill).first()
     return render(request, "category_skills/course-details.html", {
         "skill": skill,
-        "user_skill": user_skill
+        "teachers": teachers,
+        "ranked": ranked,
+        "teacher": ranked.teacher if ranked else None,
+        "skill_rating": skill_rating,
     })
 
 def InstructorView(request):
-    # --- Base queryset: only users with skills ---
-    users_with_skills = User.objects.filter(user_skills__isnull=False).distinct().prefetch_related(
-        'user_skills__skill__category', 'department'
+    # --- Base queryset: only users with skills, paged in SQL ---
+    # Cards render from the skills_count/top_skills summary and the rating stats, no skill joins
+    users_with_skills = (
+        User.objects.filter(skills_count__gt=0)
+        .select_related("department", "rating_stats")
+        # Newest first like Meta.ordering, but walks the primary key instead of sorting
+        .order_by("-id")
     )
 
     custom_user = request.session.get("user_id")
@@ -85,35 +117,19 @@ def InstructorView(request):
     # --- Search filter ---
     q = request.GET.get("q")
     if q:
-        users_with_skills = users_with_skills.filter(
-            Q(first_name__icontains=q) |
-            Q(last_name__icontains=q) |
-            Q(bio__icontains=q) |
-            Q(user_skills__skill__name__icontains=q)
-        ).distinct()
+        users_with_skills = search_instructors(users_with_skills, q)
 
     # --- Department filter ---
     categories = request.GET.getlist("categories[]")
     if categories and "all" not in categories:
-        users_with_skills = users_with_skills.filter(department__id__in=categories).distinct()
-
-    # --- Build instructor data ---
-    instructors_data = []
-    for user in users_with_skills:
-        user_skills = user.user_skills.all()
-        skills_list = [us.skill for us in user_skills]
-        instructors_data.append({
-            'user': user,
-            'skills': skills_list,
-            'skills_count': len(skills_list),
-        })
+        users_with_skills = users_with_skills.filter(department__id__in=categories)
 
     # --- Pagination ---
-    paginator = Paginator(instructors_data, 6)
+    paginator = Paginator(users_with_skills, 6)
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
-    departments = Department.objects.all()
+    departments = catalog.departments()
 
     # Return JSON only for ajax=1 requests
     if request.GET.get("ajax") == "1":
@@ -134,41 +150,38 @@ def InstructorView(request):
 
 
 def InstructorDetailView(request, user_id):
-    user = get_object_or_404(
-        User.objects.prefetch_related("user_skills__skill__category"),
-        id=user_id
-    )
-
-    # Instructor’s skills
-    skills_qs = Skills.objects.filter(user_skills__user=user).select_related("category").distinct()
-
-    # Pagination (6 per page)
-    paginator = Paginator(skills_qs, 4)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-
-    # Instructor’s sessions (for Experience tab)
-    sessions = Session.objects.filter(teacher=user).select_related("skill", "learner")
+    # Header, skills, session history and ratings from one cached snapshot
+    profile = profiles.instructor_profile(user_id, request.GET.get("sessions_page"))
+    page_obj = profiles.skills_page(profile, request.GET.get("page"))
 
-    # AJAX request → return only courses grid + pagination HTML
+    # AJAX request → return only the paged grid + pagination HTML
     if request.headers.get("x-requested-with") == "XMLHttpRequest":
-        html = render_to_string(
-            "category_skills/instructors_course_grid.html",
-            {
-                "page_obj": page_obj,
-                "section": "courses",
-                "page_param":"page"
-            },
-            request=request
-        )
+        if request.GET.get("section") == "experience":
+            html = render_to_string(
+                "category_skills/instructor_sessions_grid.html",
+                {"sessions_page": profile["sessions_page"]},
+                request=request
+            )
+        else:
+            html = render_to_string(
+                "category_skills/instructors_course_grid.html",
+                {
+                    "page_obj": page_obj,
+                    "section": "courses",
+                    "page_param":"page"
+                },
+                request=request
+            )
         return JsonResponse({"html": html})
     
     context = {
-        "instructor": user,
-        "skills": skills_qs,
+        "instructor": profile["instructor"],
+        "skills": profile["skills"],
         "page_obj": page_obj,      
-        "skills_count": skills_qs.count(),
-        "sessions": sessions,
+        "skills_count": len(profile["skills"]),
+        "sessions_page": profile["sessions_page"],
+        "reviews": profile["reviews"],
+        "rating": profile["rating"],
         "section": "courses",
         "page_param": "page",
     }
@@ -314,67 +327,64 @@ def send_request(request):
     return JsonResponse({'success': False, 'message': 'Invalid request method.'})
 
 
+REQUESTS_PER_PAGE = 4
+
+
+def request_stats(user_id):
+    """Sent and received request counts of a user, in one conditional aggregation"""
+    sent, received = Q(requester_id=user_id), Q(receiver_id=user_id)
+    return Request.objects.filter(sent | received).aggregate(
+        total_sent=Count('id', filter=sent),
+        total_received=Count('id', filter=received),
+        pending_sent=Count('id', filter=sent & Q(status='P')),
+        pending_received=Count('id', filter=received & Q(status='P')),
+        accepted_sent=Count('id', filter=sent & Q(status='A')),
+        accepted_received=Count('id', filter=received & Q(status='A')),
+    )
+
+
 @login_required_custom
 def request_management(request):
     """Request management page - view all requests"""
     user_id = request.session.get('user_id')
     user = get_object_or_404(User, id=user_id)
 
-    # Get sent requests
-    sent_requests = Request.objects.filter(requester=user).select_related(
-        'receiver', 'skill', 'skill__category'
-    ).order_by('-created_at')
-
-    # Get received requests
-    received_requests = Request.objects.filter(receiver=user).select_related(
-        'requester', 'skill', 'skill__category'
-    ).order_by('-created_at')
-
-    # Stats
-    total_sent = sent_requests.count()
-    total_received = received_requests.count()
-    pending_sent = sent_requests.filter(status='P').count()
-    pending_received = received_requests.filter(status='P').count()
-    accepted_sent = sent_requests.filter(status='A').count()
-    accepted_received = received_requests.filter(status='A').count()
-
-    # Sent Requests Pagination
-    sent_paginator = Paginator(sent_requests, 4)
-    sent_page_number = request.GET.get("sent_page")
-    sent_page_obj = sent_paginator.get_page(sent_page_number)
-
-    # Received Requests Pagination
-    received_paginator = Paginator(received_requests, 4)
-    received_page_number = request.GET.get("received_page")
-    received_page_obj = received_paginator.get_page(received_page_number)
-
-    context = {
-        'custom_user': user,
-        'sent_page_obj': sent_page_obj,
-        'received_page_obj': received_page_obj,
-        'stats': {
-            'total_sent': total_sent,
-            'total_received': total_received,
-            'pending_sent': pending_sent,
-            'pending_received': pending_received,
-            'accepted_sent': accepted_sent,
-            'accepted_received': accepted_received,
-        }
+    requests = {
+        'received': Request.objects.filter(receiver=user).select_related(
+            'requester__department', 'skill__category'
+        ),
+        'sent': Request.objects.filter(requester=user).select_related('receiver__department', 'skill__category'),
     }
 
+    def page(section):
+        # Keyset pages: no COUNT and no OFFSET, a deep page costs what the first one does
+        return KeysetPaginator(requests[section], REQUESTS_PER_PAGE).get_page(request.GET.get(f"{section}_page"))
+
+    # AJAX paging swaps one tab's grid, the stats in the headers stay as they are
     if request.headers.get("x-requested-with") == "XMLHttpRequest":
         section = request.GET.get("section")
-        if section == "received":
-            html = render_to_string("category_skills/received_requests_grid.html", context, request=request)
-        elif section == "sent":
-            html = render_to_string("category_skills/sent_requests_grid.html", context, request=request)
-        else:
-            html = ""  # fallback
+        if section not in requests:
+            return JsonResponse({"html": ""})
+        html = render_to_string(f"category_skills/{section}_requests_grid.html", {
+            'custom_user': user,
+            f'{section}_page_obj': page(section),
+        }, request=request)
         return JsonResponse({"html": html})
 
+    context = {
+        'custom_user': user,
+        'sent_page_obj': page('sent'),
+        'received_page_obj': page('received'),
+        'stats': request_stats(user.id),
+    }
     return render(request, 'category_skills/requests.html', context)
 
 
+def _transition_failed(queryset, not_found, wrong_status):
+    """Error response after a guarded transition matched no row, telling the two reasons apart"""
+    message = wrong_status if queryset.exists() else not_found
+    return JsonResponse({'success': False, 'message': message})
+
 
 @login_required_custom
 def accept_request(request, request_id):
@@ -384,15 +394,13 @@ def accept_request(request, request_id):
             user_id = request.session.get('user_id')
             user = get_object_or_404(User, id=user_id)
             
-            skill_request = get_object_or_404(Request, id=request_id, receiver=user)
-            
-            if skill_request.status != 'P':
-                return JsonResponse({'success': False, 'message': 'This request has already been processed.'})
-            
-            # Accept the request
-            skill_request.status = 'A'
-            skill_request.responded_at = timezone.now()
-            skill_request.save()
+            # Accept the request, if still pending
+            skill_request = transitions.apply(Request, 'accept', request_id, Q(receiver=user))
+            if skill_request is None:
+                return _transition_failed(
+                    Request.objects.filter(id=request_id, receiver=user),
+                    'Request not found or access denied.', 'This request has already been processed.',
+                )
             
             # Create notification for requester
             from apps.notifications.views import create_notification
@@ -424,20 +432,18 @@ def reject_request(request, request_id):
             user_id = request.session.get('user_id')
             user = get_object_or_404(User, id=user_id)
             
-            skill_request = get_object_or_404(Request, id=request_id, receiver=user)
-            
-            if skill_request.status != 'P':
-                return JsonResponse({'success': False, 'message': 'This request has already been processed.'})
-            
             # Get rejection reason
             reason = request.POST.get('reason', '').strip()
             if not reason:
                 return JsonResponse({'success': False, 'message': 'Please provide a reason for rejection.'})
             
-            # Reject the request
-            skill_request.status = 'R'
-            skill_request.responded_at = timezone.now()
-            skill_request.save()
+            # Reject the request, if still pending
+            skill_request = transitions.apply(Request, 'reject', request_id, Q(receiver=user))
+            if skill_request is None:
+                return _transition_failed(
+                    Request.objects.filter(id=request_id, receiver=user),
+                    'Request not found or access denied.', 'This request has already been processed.',
+                )
             
             # Create notification for requester
             from apps.notifications.views import create_notification
@@ -470,19 +476,18 @@ def cancel_request(request, request_id):
             user_id = request.session.get('user_id')
             user = get_object_or_404(User, id=user_id)
             
-            skill_request = get_object_or_404(Request, id=request_id, requester=user)
-            
-            if skill_request.status != 'P':
-                return JsonResponse({'success': False, 'message': 'Only pending requests can be cancelled.'})
-            
             # Get cancellation reason
             reason = request.POST.get('reason', '').strip()
             if not reason:
                 return JsonResponse({'success': False, 'message': 'Please provide a reason for cancellation.'})
             
-            # Cancel the request
-            skill_request.status = 'C'
-            skill_request.save()
+            # Cancel the request, if still pending
+            skill_request = transitions.apply(Request, 'cancel', request_id, Q(requester=user))
+            if skill_request is None:
+                return _transition_failed(
+                    Request.objects.filter(id=request_id, requester=user),
+                    'Request not found or access denied.', 'Only pending requests can be cancelled.',
+                )
             
             # Create notification for receiver
             from apps.notifications.views import create_notification
@@ -507,6 +512,86 @@ def cancel_request(request, request_id):
     return JsonResponse({'success': False, 'message': 'Invalid request method.'})
 
 
+# Bulk actions: who the user must be on the request, and the notification the other side gets
+BULK_REQUEST_ACTIONS = {
+    'accept': ('receiver', 'request_accepted', 'Request Accepted'),
+    'reject': ('receiver', 'request_rejected', 'Request Rejected'),
+    'cancel': ('requester', 'request_cancelled', 'Request Cancelled'),
+}
+MAX_BULK_REQUESTS = 100
+
+
+def _bulk_notification_message(action, user, skill_name, reason):
+    name = f"{user.first_name} {user.last_name}"
+    if action == 'accept':
+        return f'Your request to learn {skill_name} from {name} has been accepted!'
+    if action == 'reject':
+        return f'Your request to learn {skill_name} from {name} has been rejected. Reason: {reason}'
+    return f'{name} has cancelled their request to learn {skill_name}. Reason: {reason}'
+
+
+@login_required_custom
+def bulk_request_action(request):
+    """Accept, reject or cancel several requests at once, with the outcome of each id"""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request method.'})
+
+    user = get_object_or_404(User, id=request.session.get('user_id'))
+    action = request.POST.get('action')
+    if action not in BULK_REQUEST_ACTIONS:
+        return JsonResponse({'success': False, 'message': 'Unknown action.'})
+    try:
+        ids = sorted({int(value) for value in request.POST.getlist('ids')})
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'Invalid request ids.'})
+    if not ids or len(ids) > MAX_BULK_REQUESTS:
+        return JsonResponse({'success': False, 'message': f'Select between 1 and {MAX_BULK_REQUESTS} requests.'})
+    reason = request.POST.get('reason', '').strip()
+    if action != 'accept' and not reason:
+        return JsonResponse({'success': False, 'message': 'Please provide a reason for this action.'})
+
+    role, notification_type, title = BULK_REQUEST_ACTIONS[action]
+    mine = Q(**{role: user})
+    with transaction.atomic():
+        # One UPDATE for every id still pending
+        moved = transitions.apply_many(Request, action, ids, mine)
+        skill_names = dict(Skills.objects.filter(id__in={row.skill_id for row in moved}).values_list('id', 'name'))
+        Notification.objects.bulk_create([
+            Notification(
+                recipient_id=row.receiver_id if role == 'requester' else row.requester_id,
+                notification_type=notification_type,
+                title=title,
+                message=_bulk_notification_message(action, user, skill_names[row.skill_id], reason),
+                content_object=row,
+                data={'reason': reason} if reason else {},
+            )
+            for row in moved
+        ])
+
+    results = {
+        row.id: {'success': True, 'status': row.status, 'status_display': row.status_display}
+        for row in moved
+    }
+    # The others were not the user's, or no longer pending
+    left = [pk for pk in ids if pk not in results]
+    statuses = dict(Request.objects.filter(mine, id__in=left).values_list('id', 'status')) if left else {}
+    for pk in left:
+        if pk in statuses:
+            results[pk] = {
+                'success': False, 'status': statuses[pk],
+                'status_display': dict(Request.REQUEST_STATUS_CHOICES)[statuses[pk]],
+                'message': 'This request has already been processed.',
+            }
+        else:
+            results[pk] = {'success': False, 'message': 'Request not found or access denied.'}
+
+    return JsonResponse({
+        'success': True,
+        'message': f'{len(moved)} of {len(ids)} requests updated.',
+        'results': results,
+    })
+
+
 @login_required_custom
 def delete_request(request, request_id):
     """Delete a request (soft delete by changing status)"""
@@ -541,72 +626,63 @@ def delete_request(request, request_id):
 
 # ============= SESSION MANAGEMENT VIEWS =============
 
+SESSIONS_PER_PAGE = 4
+
+
+def session_stats(user_id):
+    """Teaching and learning session counts of a user, in one conditional aggregation"""
+    teaching, learning = Q(teacher_id=user_id), Q(learner_id=user_id)
+    return Session.objects.filter(teaching | learning).aggregate(
+        total_teaching=Count('id', filter=teaching),
+        total_learning=Count('id', filter=learning),
+        scheduled_teaching=Count('id', filter=teaching & Q(status='S')),
+        scheduled_learning=Count('id', filter=learning & Q(status='S')),
+        completed_teaching=Count('id', filter=teaching & Q(status='C')),
+        completed_learning=Count('id', filter=learning & Q(status='C')),
+    )
+
+
 @login_required_custom
 def session_management(request):
     """Session management page - view all sessions"""
     user_id = request.session.get('user_id')
     user = get_object_or_404(User, id=user_id)
-    
-    # Check if user has skills (can teach)
-    user_skills = UserSkills.objects.filter(user=user)
-    user_has_skills = user_skills.exists()
-    
-    # Get sessions where user is teacher (only if they have skills)
-    teaching_sessions = []
-    if user_has_skills:
-        teaching_sessions = Session.objects.filter(teacher=user).select_related(
-            'learner', 'skill', 'skill__category', 'request'
-        ).order_by('-created_at')
-    
-    # Get sessions where user is learner
-    learning_sessions = Session.objects.filter(learner=user).select_related(
-        'teacher', 'skill', 'skill__category', 'request'
-    ).order_by('-created_at')
-    
-    # Get statistics
-    total_teaching = len(teaching_sessions)
-    total_learning = learning_sessions.count()
-    scheduled_teaching = len([s for s in teaching_sessions if s.status == 'S'])
-    scheduled_learning = learning_sessions.filter(status='S').count()
-    completed_teaching = len([s for s in teaching_sessions if s.status == 'C'])
-    completed_learning = learning_sessions.filter(status='S').count()
-    
-    # Teaching Session Pagination
-    teaching_paginator = Paginator(teaching_sessions, 4)
-    teaching_page_number = request.GET.get("teaching_page")
-    teaching_page_obj = teaching_paginator.get_page(teaching_page_number)
 
-    # Learning Session Pagination
-    learning_paginator = Paginator(learning_sessions, 4)
-    learning_page_number = request.GET.get("learning_page")
-    learning_page_obj = learning_paginator.get_page(learning_page_number)
+    # Only users with skills teach, and see their teaching sessions
+    user_has_skills = user.skills_count > 0
 
-    context = {
-        'custom_user': user,
-        'user_skills': user_skills,
-        'user_has_skills': user_has_skills,
-        'teaching_page_obj': teaching_page_obj,
-        'learning_page_obj': learning_page_obj,
-        'stats': {
-            'total_teaching': total_teaching,
-            'total_learning': total_learning,
-            'scheduled_teaching': scheduled_teaching,
-            'scheduled_learning': scheduled_learning,
-            'completed_teaching': completed_teaching,
-            'completed_learning': completed_learning,
-        }
+    sessions = {
+        'teaching': Session.objects.filter(teacher=user).select_related('learner__department', 'skill__category'),
+        'learning': Session.objects.filter(learner=user).select_related('teacher__department', 'skill__category'),
     }
-    
+
+    def page(section):
+        if section == 'teaching' and not user_has_skills:
+            return KeysetPage([])
+        return KeysetPaginator(sessions[section], SESSIONS_PER_PAGE).get_page(request.GET.get(f"{section}_page"))
+
+    # AJAX paging swaps one tab's grid, the stats in the headers stay as they are
     if request.headers.get("x-requested-with") == "XMLHttpRequest":
         section = request.GET.get("section")
-        if section == "learning":
-            html = render_to_string("category_skills/learning_sessions_grid.html", context, request=request)
-        elif section == "teaching":
-            html = render_to_string("category_skills/teaching_sessions_grid.html", context, request=request)
-        else:
-            html = ""  # fallback
+        if section not in sessions:
+            return JsonResponse({"html": ""})
+        html = render_to_string(f"category_skills/{section}_sessions_grid.html", {
+            'custom_user': user,
+            f'{section}_page_obj': page(section),
+        }, request=request)
         return JsonResponse({"html": html})
 
+    stats = session_stats(user.id)
+    if not user_has_skills:
+        stats.update(total_teaching=0, scheduled_teaching=0, completed_teaching=0)
+
+    context = {
+        'custom_user': user,
+        'user_has_skills': user_has_skills,
+        'teaching_page_obj': page('teaching'),
+        'learning_page_obj': page('learning'),
+        'stats': stats,
+    }
     return render(request, 'category_skills/sessions.html', context)
 
 
@@ -697,21 +773,14 @@ def start_session(request, session_id):
             user_id = request.session.get('user_id')
             user = get_object_or_404(User, id=user_id)
             
-            # Get session where user is the teacher
-            session = Session.objects.filter(
-                teacher=user,
-                id=session_id
-            ).first()
-            
-            if not session:
-                return JsonResponse({'success': False, 'message': 'Session not found or access denied. Only teachers can start sessions.'})
-            
-            if session.status != 'S':
-                return JsonResponse({'success': False, 'message': 'Only scheduled sessions can be started.'})
-            
-            # Start the session
-            session.status = 'A'
-            session.save()
+            # Start the session, if scheduled and the user teaches it
+            session = transitions.apply(Session, 'start', session_id, Q(teacher=user))
+            if session is None:
+                return _transition_failed(
+                    Session.objects.filter(id=session_id, teacher=user),
+                    'Session not found or access denied. Only teachers can start sessions.',
+                    'Only scheduled sessions can be started.',
+                )
             
             # Create notification for learner
             from apps.notifications.views import create_notification
@@ -742,25 +811,17 @@ def complete_session(request, session_id):
             user_id = request.session.get('user_id')
             user = get_object_or_404(User, id=user_id)
             
-            # Get session where user is either teacher or learner
-            session = Session.objects.filter(
-                Q(teacher=user) | Q(learner=user),
-                id=session_id
-            ).first()
-            
-            if not session:
-                return JsonResponse({'success': False, 'message': 'Session not found or access denied.'})
-            
-            if session.status not in ['S', 'A']:
-                return JsonResponse({'success': False, 'message': 'Only scheduled or active sessions can be marked as completed.'})
-            
-            # Mark as completed
-            session.status = 'C'
-            session.completed_at = timezone.now()
-            session.save()
+            # Mark as completed, if scheduled or active and the user takes part
+            session = transitions.apply(Session, 'complete', session_id, Q(teacher=user) | Q(learner=user))
+            if session is None:
+                return _transition_failed(
+                    Session.objects.filter(Q(teacher=user) | Q(learner=user), id=session_id),
+                    'Session not found or access denied.',
+                    'Only scheduled or active sessions can be marked as completed.',
+                )
             
             # Create notification for the other participant
-            other_user = session.learner if user == session.teacher else session.teacher
+            other_user = session.learner if user.id == session.teacher_id else session.teacher
             from apps.notifications.views import create_notification
             create_notification(
                 recipient=other_user,
@@ -790,29 +851,22 @@ def cancel_session(request, session_id):
             user_id = request.session.get('user_id')
             user = get_object_or_404(User, id=user_id)
             
-            # Get session where user is either teacher or learner
-            session = Session.objects.filter(
-                Q(teacher=user) | Q(learner=user),
-                id=session_id
-            ).first()
-            
-            if not session:
-                return JsonResponse({'success': False, 'message': 'Session not found or access denied.'})
-            
-            if session.status == 'C':
-                return JsonResponse({'success': False, 'message': 'Completed sessions cannot be cancelled.'})
-            
             # Get cancellation reason
             reason = request.POST.get('reason', '').strip()
             if not reason:
                 return JsonResponse({'success': False, 'message': 'Please provide a reason for cancellation.'})
             
-            # Cancel the session
-            session.status = 'CA'
-            session.save()
+            # Cancel the session, unless already completed or cancelled
+            session = transitions.apply(Session, 'cancel', session_id, Q(teacher=user) | Q(learner=user))
+            if session is None:
+                return _transition_failed(
+                    Session.objects.filter(Q(teacher=user) | Q(learner=user), id=session_id),
+                    'Session not found or access denied.',
+                    'Completed or cancelled sessions cannot be cancelled.',
+                )
             
             # Create notification for the other participant
-            other_user = session.learner if user == session.teacher else session.teacher
+            other_user = session.learner if user.id == session.teacher_id else session.teacher
             from apps.notifications.views import create_notification
             create_notification(
                 recipient=other_user,
@@ -868,30 +922,45 @@ def delete_session(request, session_id):
 
 @login_required_custom
 def leave_feedback(request, session_id):
-    session = get_object_or_404(Session, id=session_id)
+    if request.method != "POST":
+        return JsonResponse({"error": "Invalid request"}, status=400)
 
-    if request.method == "POST":
-        rating = request.POST.get("rating")
-        feedback = request.POST.get("feedback", "")
+    try:
+        rating = int(request.POST.get("rating", ""))
+    except ValueError:
+        rating = None
+    if rating not in RatingStats.RATINGS:
+        return JsonResponse({"error": "Rating must be between 1 and 5."}, status=400)
+    feedback = request.POST.get("feedback", "")
+
+    user_id = request.session.get("user_id")
+    with transaction.atomic():
+        # Locked so the old rating taken out of the stats is the stored one
+        session = get_object_or_404(Session.objects.select_for_update(), id=session_id)
+        if session.status != "C":
+            return JsonResponse({"error": "Only completed sessions can be rated."}, status=400)
 
         # Teacher giving feedback
-        if session.teacher == request.user:
+        if session.teacher_id == user_id:
             session.teacher_rating = rating
             session.teacher_feedback = feedback
+            session.save(update_fields=["teacher_rating", "teacher_feedback", "updated_at"])
 
-        # Learner giving feedback
-        elif session.learner == request.user:
+        # Learner giving feedback, this is the teacher's rating
+        elif session.learner_id == user_id:
+            ratings.record_rating(session.teacher_id, session.skill_id, session.learner_rating, rating)
             session.learner_rating = rating
             session.learner_feedback = feedback
+            session.save(update_fields=["learner_rating", "learner_feedback", "updated_at"])
 
         else:
             return JsonResponse({"error": "Unauthorized"}, status=403)
 
-        session.save()
-
-        if request.headers.get("x-requested-with") == "XMLHttpRequest":
-            return JsonResponse({"success": True, "message": "Feedback submitted!"})
-
-        return redirect("category_skills:sessions")  # fallback
+    if request.headers.get("x-requested-with") == "XMLHttpRequest":
+        return JsonResponse({
+            "success": True,
+            "message": "Feedback submitted!",
+            "button_html": FEEDBACK_GIVEN_BUTTON,
+        })
 
-    return JsonResponse({"error": "Invalid request"}, status=400)
\ No newline at end of file
+    return redirect("category_skills:sessions")  # fallback
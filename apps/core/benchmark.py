@@ -0,0 +1,406 @@
+import logging
+import math
+import random
+import time
+import tracemalloc
+import warnings
+from array import array
+from contextlib import contextmanager
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.db.models import Count
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from apps.accounts.models import User
+from apps.blog.models import Blog
+from apps.category_skills.models import SkillsCategory, Skills, UserSkills, Request, Session
+from apps.category_skills.sampling import rebuild_teachable_index, invalidate_instructor_ids
+from apps.category_skills.search import rebuild_search_index, rebuild_instructor_index
+from apps.category_skills.summaries import rebuild_user_summaries
+from apps.category_skills.ratings import rebuild_rating_stats
+from apps.category_skills.recommendations import rebuild_recommendations
+from apps.category_skills.ranking import rebuild_teacher_scores
+from apps.notifications.models import Notification
+from apps.university.models import University
+from .bulk import BATCH_SIZE, bulk_insert
+from .cache import invalidate_tags
+from .catalog import CATALOG_MODELS, model_tag
+from .middleware import QueryBudgetWarning, QueryRecorder, load_budgets
+from .variants import invalidate_home_variants
+
+# Seeded rows are recognisable by this prefix, so a second run tops the
+# volumes up instead of starting over.
+PREFIX = "bench"
+
+DEFAULT_VOLUMES = {
+    "skills": 200,
+    "users": 1000,
+    "user_skills": 5000,
+    "requests": 3000,
+    "sessions": 1000,
+    "notifications": 10000,
+    "blogs": 200,
+}
+
+# Never driven: logout flushes the benchmark session
+SKIPPED_VIEWS = {"accounts:logout"}
+
+REQUEST_STATUSES = ["P"] * 4 + ["A"] * 3 + ["R", "C"]
+SESSION_STATUSES = ["S"] * 3 + ["C"] * 3 + ["A", "CA", "P"]
+NOTIFICATION_TYPES = [choice for choice, _ in Notification.NOTIFICATION_TYPES]
+
+
+def _ids(queryset):
+    return array("q", queryset.values_list("id", flat=True).iterator())
+
+
+def seed_catalog(count, batch_size=BATCH_SIZE):
+    existing = Skills.objects.filter(name__startswith=PREFIX).count()
+    if existing >= count:
+        return
+    categories = [
+        SkillsCategory(name=f"{PREFIX.title()} Category {i}", description="Benchmark category")
+        for i in range(1, 11)
+    ]
+    SkillsCategory.objects.bulk_create(categories, ignore_conflicts=True)
+    category_ids = list(
+        SkillsCategory.objects.filter(name__startswith=PREFIX.title()).values_list("id", flat=True)
+    )
+    levels = [choice for choice, _ in Skills.LEVEL_CHOICES]
+    bulk_insert(Skills, (
+        Skills(
+            name=f"{PREFIX} skill {i}",
+            category_id=category_ids[i % len(category_ids)],
+            description=f"Benchmark skill {i}",
+            level=random.choice(levels),
+        )
+        for i in range(existing, count)
+    ), batch_size)
+
+
+def seed_users(count, batch_size=BATCH_SIZE):
+    existing = User.objects.filter(username__startswith=PREFIX).count()
+    # One hash for everyone, hashing per user would dominate the run
+    password = make_password(PREFIX)
+    university_ids = list(University.objects.values_list("id", flat=True)) or [None]
+    genders = [choice for choice, _ in User.GENDER_CHOICES]
+    years = [choice for choice, _ in User.YEAR_CHOICES]
+    bulk_insert(User, (
+        User(
+            username=f"{PREFIX}{i}",
+            first_name="Bench",
+            last_name=f"User{i}",
+            gender=random.choice(genders),
+            personal_email=f"{PREFIX}{i}@example.com",
+            university_name_id=random.choice(university_ids),
+            year=random.choice(years),
+            current_password=password,
+        )
+        for i in range(existing, count)
+    ), batch_size)
+
+
+def seed_user_skills(count, user_ids, skill_ids, batch_size=BATCH_SIZE):
+    missing = count - UserSkills.objects.count()
+    if missing <= 0 or not user_ids or not skill_ids:
+        return
+    per_user = min(len(skill_ids), math.ceil(missing / len(user_ids)))
+
+    def rows():
+        made = 0
+        for user_id in random.sample(list(user_ids), len(user_ids)):
+            for skill_id in random.sample(skill_ids, per_user):
+                yield UserSkills(user_id=user_id, skill_id=skill_id)
+                made += 1
+                if made == missing:
+                    return
+
+    bulk_insert(UserSkills, rows(), batch_size)
+
+
+def seed_requests(count, user_ids, batch_size=BATCH_SIZE):
+    missing = count - Request.objects.count()
+    if missing <= 0 or len(user_ids) < 2:
+        return
+    # Requests go to users who actually teach the skill
+    teachers, taught = array("q"), array("q")
+    for user_id, skill_id in UserSkills.objects.values_list("user_id", "skill_id").iterator():
+        teachers.append(user_id)
+        taught.append(skill_id)
+    if not teachers:
+        return
+
+    def rows():
+        for _ in range(missing):
+            pick = random.randrange(len(teachers))
+            requester_id = random.choice(user_ids)
+            if requester_id == teachers[pick]:
+                continue
+            yield Request(
+                requester_id=requester_id,
+                receiver_id=teachers[pick],
+                skill_id=taught[pick],
+                status=random.choice(REQUEST_STATUSES),
+                description="Benchmark request",
+            )
+
+    bulk_insert(Request, rows(), batch_size)
+
+
+def seed_sessions(count, batch_size=BATCH_SIZE):
+    missing = count - Session.objects.count()
+    if missing <= 0:
+        return
+    now = timezone.now()
+    accepted = (
+        Request.objects.filter(status="A", sessions__isnull=True)
+        .values_list("id", "receiver_id", "requester_id", "skill_id")[:missing]
+    )
+
+    def rows():
+        for request_id, teacher_id, learner_id, skill_id in accepted.iterator():
+            status = random.choice(SESSION_STATUSES)
+            completed = status == "C"
+            yield Session(
+                request_id=request_id,
+                teacher_id=teacher_id,
+                learner_id=learner_id,
+                skill_id=skill_id,
+                title="Benchmark session",
+                scheduled_date=now + timedelta(days=random.randint(-60, 60)),
+                status=status,
+                completed_at=now if completed else None,
+                learner_rating=random.randint(1, 5) if completed else None,
+                teacher_rating=random.randint(1, 5) if completed else None,
+            )
+
+    bulk_insert(Session, rows(), batch_size)
+
+
+def seed_notifications(count, user_ids, batch_size=BATCH_SIZE):
+    missing = count - Notification.objects.count()
+    if missing <= 0 or not user_ids:
+        return
+    bulk_insert(Notification, (
+        Notification(
+            recipient_id=random.choice(user_ids),
+            notification_type=random.choice(NOTIFICATION_TYPES),
+            title="Benchmark notification",
+            message="Benchmark notification",
+            is_read=random.random() < 0.7,
+        )
+        for _ in range(missing)
+    ), batch_size)
+
+
+def seed_blogs(count, user_ids, batch_size=BATCH_SIZE):
+    missing = count - Blog.objects.count()
+    if missing <= 0 or not user_ids:
+        return
+    category_ids = list(SkillsCategory.objects.values_list("id", flat=True))
+    bulk_insert(Blog, (
+        Blog(
+            author_id=random.choice(user_ids),
+            title=f"Benchmark blog {i}",
+            category_id=random.choice(category_ids),
+            intro="<p>Benchmark blog</p>",
+        )
+        for i in range(missing)
+    ), batch_size)
+
+
+def rebuild_derived():
+    """Refresh everything the model signals keep in sync; bulk_create sends none"""
+    rebuild_teachable_index()
+    rebuild_search_index()
+    rebuild_instructor_index()
+    rebuild_user_summaries()
+    rebuild_rating_stats()
+    rebuild_recommendations()
+    rebuild_teacher_scores()
+    invalidate_instructor_ids()
+    invalidate_home_variants()
+    invalidate_tags(*(model_tag(model) for model in [*CATALOG_MODELS, UserSkills]))
+
+
+class SeedRefused(Exception):
+    pass
+
+
+def seed(volumes, batch_size=BATCH_SIZE, log=print, force=False):
+    """Top every table up to the row counts in ``volumes``.
+
+    Seeded rows land in the default database next to real ones, so this
+    refuses to run with DEBUG off unless ``force`` is given.
+    """
+    if not settings.DEBUG and not force:
+        raise SeedRefused(
+            f"Refusing to seed benchmark rows into {connection.settings_dict['NAME']} with DEBUG off"
+        )
+    started = time.perf_counter()
+    seed_catalog(volumes["skills"], batch_size)
+    seed_users(volumes["users"], batch_size)
+    log(f"users and skills seeded ({time.perf_counter() - started:.1f}s)")
+
+    user_ids = _ids(User.objects.all())
+    skill_ids = list(_ids(Skills.objects.all()))
+    seed_user_skills(volumes["user_skills"], user_ids, skill_ids, batch_size)
+    log(f"user skills seeded ({time.perf_counter() - started:.1f}s)")
+    seed_requests(volumes["requests"], user_ids, batch_size)
+    seed_sessions(volumes["sessions"], batch_size)
+    log(f"requests and sessions seeded ({time.perf_counter() - started:.1f}s)")
+    seed_notifications(volumes["notifications"], user_ids, batch_size)
+    seed_blogs(volumes["blogs"], user_ids, batch_size)
+    log(f"notifications and blogs seeded ({time.perf_counter() - started:.1f}s)")
+
+    rebuild_derived()
+
+
+def table_sizes():
+    models = [User, Skills, UserSkills, Request, Session, Notification, Blog]
+    return {model._meta.db_table: model.objects.count() for model in models}
+
+
+def iter_routes(patterns=None, namespace=None, prefix=""):
+    """Yield (view_name, route, converter names) for every named URL pattern"""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace == "admin":
+                continue
+            nested = pattern.namespace or namespace
+            yield from iter_routes(pattern.url_patterns, nested, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            view_name = f"{namespace}:{pattern.name}" if namespace else pattern.name
+            yield view_name, prefix + str(pattern.pattern), list(pattern.pattern.converters)
+
+
+def benchmark_user():
+    """The user with the most received requests: the heaviest dashboards"""
+    busiest = (
+        Request.objects.values("receiver_id")
+        .annotate(received=Count("id"))
+        .order_by("-received")
+        .values_list("receiver_id", flat=True)
+        .first()
+    )
+    if busiest is not None:
+        return User.objects.get(pk=busiest)
+    return User.objects.first()
+
+
+def login(client, user):
+    """Log the test ``client`` in as ``user``, as the login view does"""
+    session = client.session
+    session["user_id"] = user.id
+    session.save()
+
+
+def sample_kwargs(user):
+    """Real ids for the URL parameters, owned by ``user`` where it matters"""
+    user_id = user.pk if user else None
+    instructor = (
+        UserSkills.objects.exclude(user_id=user_id)
+        .values_list("user_id", flat=True).first()
+    )
+    popular_skill = (
+        UserSkills.objects.values("skill_id").annotate(teachers=Count("id"))
+        .order_by("-teachers").values_list("skill_id", flat=True).first()
+    )
+    return {
+        "skill_id": popular_skill or Skills.objects.values_list("id", flat=True).first(),
+        "user_id": instructor,
+        "request_id": Request.objects.filter(receiver_id=user_id).values_list("id", flat=True).first(),
+        "session_id": Session.objects.filter(teacher_id=user_id).values_list("id", flat=True).first(),
+        "notification_id": Notification.objects.filter(recipient_id=user_id).values_list("id", flat=True).first(),
+        "university_id": University.objects.values_list("id", flat=True).first(),
+        "pk": (
+            Blog.objects.filter(author_id=user_id).values_list("id", flat=True).first()
+            or Blog.objects.values_list("id", flat=True).first()
+        ),
+    }
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of an unsorted list"""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def measure(client, url, repeat=20, warmup=1):
+    """Latency percentiles, queries and peak traced memory of GET ``url``"""
+    for _ in range(warmup):
+        client.get(url)
+
+    timings = []
+    recorder = None
+    for _ in range(repeat):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    # Separate pass: tracing allocations slows the request down too much to time it
+    tracemalloc.start()
+    client.get(url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "url": url,
+        "status": response.status_code,
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "p99_ms": round(percentile(timings, 99), 2),
+        "queries": recorder.count,
+        "sql_ms": round(recorder.total_time * 1000, 2),
+        "duplicate_queries": sum(times - 1 for _, times in recorder.duplicates()),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def iter_urls(kwargs, only=None):
+    """Yield (view_name, route, url) for every route to drive, url None when a sample id is missing"""
+    for view_name, route, params in iter_routes():
+        if view_name in SKIPPED_VIEWS or (only and view_name not in only):
+            continue
+        if any(kwargs.get(param) is None for param in params):
+            yield view_name, route, None
+            continue
+        yield view_name, route, reverse(view_name, kwargs={param: kwargs[param] for param in params})
+
+
+@contextmanager
+def quiet_requests():
+    """Keep 4xx responses and budget overruns off the console while driving URLs"""
+    request_logger = logging.getLogger("django.request")
+    level = request_logger.level
+    request_logger.setLevel(logging.ERROR)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", QueryBudgetWarning)
+            yield
+    finally:
+        request_logger.setLevel(level)
+
+
+def run(client, kwargs, repeat=20, warmup=1, only=None, log=print):
+    """Measure every named route; routes missing a sample id are reported as skipped"""
+    budgets = load_budgets(getattr(settings, "QUERY_BUDGETS_FILE", None))
+    results = {}
+    # 4xx responses and budget overruns end up in the report, not on the console
+    with quiet_requests():
+        for view_name, route, url in iter_urls(kwargs, only):
+            if url is None:
+                results[view_name] = {"route": route, "skipped": "no sample id"}
+                continue
+            result = results[view_name] = measure(client, url, repeat, warmup)
+            result["query_budget"] = budgets.get(view_name)
+            log(f"{view_name}: {result['status']} p50 {result['p50_ms']}ms p99 {result['p99_ms']}ms, "
+                f"{result['queries']} queries")
+    return results
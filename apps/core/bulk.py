@@ -0,0 +1,21 @@
+from django.db import transaction
+
+BATCH_SIZE = 5000
+
+
+def batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_insert(model, rows, batch_size=BATCH_SIZE):
+    """Insert ``rows`` (any iterable) one transaction per batch, skipping duplicates"""
+    for batch in batches(rows, batch_size):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=batch_size, ignore_conflicts=True)
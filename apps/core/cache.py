@@ -0,0 +1,131 @@
+import time
+from django.core.cache import cache
+
+DEFAULT_TTL = 300
+
+# Hit/miss counters live in the cache itself, so every worker process
+# adds to the same totals. Times are kept in whole microseconds for incr.
+STATS_COUNTERS = ("hits", "misses", "lookup_us", "compute_us")
+STATS_NAMESPACES_KEY = "cache_stats:namespaces"
+
+
+def _version_key(name):
+    return f"cache_version:{name}"
+
+
+def _new_version():
+    # Millisecond clock so a version key lost to eviction never reuses an old number
+    return int(time.time() * 1000)
+
+
+def _versions(names):
+    keys = {name: _version_key(name) for name in names}
+    found = cache.get_many(list(keys.values()))
+    versions = {}
+    for name, key in keys.items():
+        if key not in found:
+            cache.add(key, _new_version(), None)
+            found[key] = cache.get(key)
+        versions[name] = found[key]
+    return versions
+
+
+def _bump(name):
+    key = _version_key(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def _stats_key(namespace, counter):
+    return f"cache_stats:{namespace}:{counter}"
+
+
+def _incr(key, delta):
+    """Add ``delta`` to a counter; True when the counter had to be created"""
+    try:
+        cache.incr(key, delta)
+        return False
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key, delta)
+        return True
+
+
+def _register(namespace):
+    # Only when a counter was (re)created, so a namespace list lost to a
+    # concurrent write or to eviction is repaired by its next new counter
+    namespaces = cache.get(STATS_NAMESPACES_KEY, [])
+    if namespace not in namespaces:
+        cache.set(STATS_NAMESPACES_KEY, sorted({*namespaces, namespace}), None)
+
+
+def _record(namespace, hit, lookup_time, compute_time=0.0):
+    created = _incr(_stats_key(namespace, "hits" if hit else "misses"), 1)
+    created |= _incr(_stats_key(namespace, "lookup_us"), int(lookup_time * 1_000_000))
+    if not hit:
+        created |= _incr(_stats_key(namespace, "compute_us"), int(compute_time * 1_000_000))
+    if created:
+        _register(namespace)
+
+
+def get_or_set(namespace, key, compute, ttl=DEFAULT_TTL, tags=()):
+    """Return the cached value of ``key``, calling ``compute()`` on a miss.
+
+    Keys live under a versioned ``namespace`` and remember the versions of
+    their ``tags``. Bumping either (invalidate_namespace / invalidate_tags)
+    turns every matching entry into a miss without scanning the cache.
+    """
+    started = time.perf_counter()
+    versions = _versions([namespace, *(f"tag:{tag}" for tag in tags)])
+    cache_key = f"{namespace}:{versions.pop(namespace)}:{key}"
+    entry = cache.get(cache_key)
+    lookup_time = time.perf_counter() - started
+
+    if entry is not None and entry["tags"] == versions:
+        _record(namespace, True, lookup_time)
+        return entry["value"]
+
+    started = time.perf_counter()
+    value = compute()
+    cache.set(cache_key, {"value": value, "tags": versions}, ttl)
+    _record(namespace, False, lookup_time, time.perf_counter() - started)
+    return value
+
+
+def invalidate_namespace(namespace):
+    _bump(namespace)
+
+
+def invalidate_tags(*tags):
+    for tag in tags:
+        _bump(f"tag:{tag}")
+
+
+def stats():
+    """Hit/miss counters and average latencies per namespace, across all processes sharing the cache"""
+    namespaces = cache.get(STATS_NAMESPACES_KEY, [])
+    keys = {_stats_key(namespace, counter) for namespace in namespaces for counter in STATS_COUNTERS}
+    found = cache.get_many(list(keys))
+
+    report = {}
+    for namespace in namespaces:
+        counters = {counter: found.get(_stats_key(namespace, counter), 0) for counter in STATS_COUNTERS}
+        calls = counters["hits"] + counters["misses"]
+        report[namespace] = {
+            "hits": counters["hits"],
+            "misses": counters["misses"],
+            "hit_ratio": round(counters["hits"] / calls, 4) if calls else None,
+            "avg_lookup_ms": round(counters["lookup_us"] / 1000 / calls, 3) if calls else None,
+            "avg_compute_ms": round(counters["compute_us"] / 1000 / counters["misses"], 3) if counters["misses"] else None,
+        }
+    return report
+
+
+def reset_stats():
+    namespaces = cache.get(STATS_NAMESPACES_KEY, [])
+    cache.delete_many([
+        STATS_NAMESPACES_KEY,
+        *(_stats_key(namespace, counter) for namespace in namespaces for counter in STATS_COUNTERS),
+    ])
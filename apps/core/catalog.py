@@ -0,0 +1,58 @@
+from apps.category_skills.models import SkillsCategory, Skills
+from apps.university.models import University, Department, Branch, Level
+from .cache import get_or_set
+
+# Reference data that changes rarely but is listed on almost every page.
+# Each list is tagged with its model label, and the signals in
+# apps.core.signals bump that tag whenever a row is saved or deleted.
+CATALOG_TTL = 60 * 60
+CATALOG_MODELS = [SkillsCategory, Skills, University, Department, Branch, Level]
+
+
+def model_tag(model):
+    return model._meta.label_lower
+
+
+def _cached_list(key, queryset, *models):
+    return get_or_set(
+        "catalog", key, lambda: list(queryset), ttl=CATALOG_TTL,
+        tags=[model_tag(model) for model in models],
+    )
+
+
+def skill_categories():
+    return _cached_list("skill_categories", SkillsCategory.objects.all(), SkillsCategory)
+
+
+def skills():
+    return _cached_list("skills", Skills.objects.select_related("category"), Skills, SkillsCategory)
+
+
+def universities():
+    return _cached_list("universities", University.objects.all(), University)
+
+
+def departments():
+    return _cached_list("departments", Department.objects.all(), Department)
+
+
+def branches():
+    return _cached_list("branches", Branch.objects.all(), Branch)
+
+
+def levels():
+    return _cached_list("levels", Level.objects.all(), Level)
+
+
+def registration_choices():
+    """id/name pairs for the register form dropdowns"""
+    return get_or_set(
+        "catalog", "registration_choices",
+        lambda: {
+            "universities": list(University.objects.values("id", "name")),
+            "departments": list(Department.objects.values("id", "name")),
+            "branches": list(Branch.objects.values("id", "name")),
+        },
+        ttl=CATALOG_TTL,
+        tags=[model_tag(University), model_tag(Department), model_tag(Branch)],
+    )
@@ -0,0 +1,289 @@
+import json
+import re
+import time
+from statistics import median
+from django.apps import apps
+from django.db import NotSupportedError, connection, migrations, models, transaction
+from django.db.migrations.autodetector import MigrationAutodetector
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+from .benchmark import iter_urls, quiet_requests
+from .middleware import fingerprint
+
+# The index_advisor command drives every URL like the benchmark does,
+# keeps each distinct SELECT and EXPLAINs it. Full table scans and sorts
+# through a temporary b-tree (filesorts) on tables big enough to matter
+# get a composite index proposed: equality columns first, then the ORDER
+# BY, then one range column. Proposals are timed by creating them in a
+# transaction that is rolled back, and can be written out as migrations.
+
+# Smaller tables are cheaper to scan than to index
+MIN_ROWS = 1000
+
+# FROM "table" / JOIN "table" U0
+TABLE_REF = re.compile(r'(?:FROM|JOIN)\s+"(\w+)"(?:\s+(?:AS\s+)?([A-Z]\d+)\b)?')
+COLUMN_REF = re.compile(r'(?:"\w+"|\b[A-Z]\d+)\."\w+"')
+# EXPLAIN QUERY PLAN lines; "SCAN t USING [COVERING] INDEX i" walks an index and is left alone
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?$")
+SQLITE_SORT = re.compile(r"^USE TEMP B-TREE FOR (?:(?:LAST|RIGHT PART OF) )?ORDER BY")
+
+
+class QueryCapture:
+    """execute_wrapper keeping one example of every distinct SELECT and the views that ran it"""
+
+    def __init__(self):
+        self.view_name = None
+        self.queries = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith("SELECT"):
+            query = self.queries.setdefault(fingerprint(sql), {"sql": sql, "params": params, "views": []})
+            if self.view_name not in query["views"]:
+                query["views"].append(self.view_name)
+        return execute(sql, params, many, context)
+
+
+def capture(client, kwargs, only=None):
+    """The SELECTs run by GET of every route, as dicts of sql, params and views"""
+    recorder = QueryCapture()
+    with quiet_requests(), connection.execute_wrapper(recorder):
+        for view_name, route, url in iter_urls(kwargs, only):
+            if url is None:
+                continue
+            recorder.view_name = view_name
+            client.get(url)
+    return list(recorder.queries.values())
+
+
+def _postgres_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _postgres_nodes(child)
+
+
+def explain(sql, params):
+    """(plan lines, problems) of a query; problems are ("scan", table or alias) and ("sort", None)"""
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            lines = [row[-1] for row in cursor.fetchall()]
+            problems = []
+            for line in lines:
+                scan = SQLITE_SCAN.match(line)
+                if scan:
+                    problems.append(("scan", scan.group(2) or scan.group(1)))
+                elif SQLITE_SORT.match(line):
+                    problems.append(("sort", None))
+            return lines, problems
+        if connection.vendor == "postgresql":
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            lines, problems = [], []
+            for node in _postgres_nodes(plan[0]["Plan"]):
+                relation = node.get("Relation Name")
+                lines.append(f"{node['Node Type']} on {relation}" if relation else node["Node Type"])
+                if node["Node Type"] == "Seq Scan":
+                    problems.append(("scan", node.get("Alias") or relation))
+                elif node["Node Type"] in ("Sort", "Incremental Sort"):
+                    problems.append(("sort", None))
+            return lines, problems
+    raise NotSupportedError(f"index_advisor cannot read {connection.vendor} query plans")
+
+
+def table_refs(sql):
+    """table -> the names it goes by in ``sql``, quoted table name and aliases"""
+    refs = {}
+    for table, alias in TABLE_REF.findall(sql):
+        refs.setdefault(table, {f'"{table}"'})
+        if alias:
+            refs[table].add(alias)
+    return refs
+
+
+def _order_clause(sql):
+    return sql.rsplit("ORDER BY", 1)[1] if "ORDER BY" in sql else ""
+
+
+def _unique(items):
+    return list(dict.fromkeys(items))
+
+
+def filter_columns(sql, refs):
+    """(equality, range, order by) columns of one table in ``sql``; order by is (column, descending)"""
+    ref = "|".join(re.escape(name) for name in sorted(refs))
+    column = rf'(?:{ref})\."(\w+)"'
+    # Compared with parameters; column = column is a join, looked up from the other side
+    equal = _unique(re.findall(r"(?<!NOT \()" + column + r"\s*(?:=\s*%s|IN\s*\((?:%s|SELECT)|IS NULL)", sql))
+    ranged = _unique(re.findall(column + r"\s*(?:<=|>=|<|>|BETWEEN)\s*%s", sql))
+    clause = _order_clause(sql)
+    order = [(name, direction == "DESC") for name, direction in re.findall(column + r"(?:\s+(ASC|DESC))?", clause)]
+    if len(order) != len(COLUMN_REF.findall(clause)):
+        # Sorted by other tables' columns too: no index of this one serves the sort
+        order = []
+    return equal, ranged, order
+
+
+def index_fields(model, equal, ranged, order):
+    """Field names of the index serving these filters, or None when there is nothing to index"""
+    fields = {field.column: field.name for field in model._meta.concrete_fields}
+    if model._meta.pk.column in equal:
+        return None  # a primary key lookup reads a single row already
+    names = [fields[column] for column in equal if column in fields]
+    for column, descending in order:
+        if column in fields and fields[column] not in names:
+            names.append(f"-{fields[column]}" if descending else fields[column])
+    if not order:
+        names += [fields[column] for column in ranged if column in fields and fields[column] not in names][:1]
+    return names or None
+
+
+def _indexed(constraints, columns):
+    return any(
+        constraint["columns"] and constraint["columns"][:len(columns)] == columns
+        for constraint in constraints.values()
+        if constraint.get("index") or constraint.get("unique") or constraint.get("primary_key")
+    )
+
+
+class Proposal:
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.index = models.Index(fields=fields)
+        self.index.set_name_with_model(model)
+        self.findings = []
+
+    def definition(self):
+        return f"models.Index(fields={self.index.fields!r}, name={self.index.name!r})"
+
+
+class Advisor:
+    """Finds the scans and filesorts of captured queries and the indexes that remove them"""
+
+    def __init__(self, min_rows=MIN_ROWS):
+        self.min_rows = min_rows
+        self.models = {model._meta.db_table: model for model in apps.get_models()}
+        self._sizes = {}
+        self._constraints = {}
+
+    def size(self, table):
+        if table not in self._sizes:
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+                self._sizes[table] = cursor.fetchone()[0]
+        return self._sizes[table]
+
+    def constraints(self, table):
+        if table not in self._constraints:
+            with connection.cursor() as cursor:
+                self._constraints[table] = connection.introspection.get_constraints(cursor, table)
+        return self._constraints[table]
+
+    def _problem_tables(self, sql, problems):
+        """Tables a plan scans or sorts, the sorted one being the one whose columns are in ORDER BY"""
+        refs = table_refs(sql)
+        by_name = {name.strip('"').lower(): table for table, names in refs.items() for name in names}
+        tables = []
+        for kind, name in problems:
+            if kind == "scan":
+                table = by_name.get(name.lower())
+                if table:
+                    tables.append(table)
+            else:
+                clause = _order_clause(sql)
+                tables += [table for table, names in refs.items() if any(f"{name}." in clause for name in names)]
+        return refs, _unique(tables)
+
+    def propose(self, query):
+        """Store the plan and problems of ``query``; the (model, fields) indexes that would help"""
+        lines, problems = explain(query["sql"], query["params"])
+        query["plan"], query["problems"] = lines, problems
+        refs, tables = self._problem_tables(query["sql"], problems)
+        wanted = []
+        for table in tables:
+            model = self.models.get(table)
+            if model is None or self.size(table) < self.min_rows:
+                continue
+            fields = index_fields(model, *filter_columns(query["sql"], refs[table]))
+            if not fields:
+                continue
+            columns = [model._meta.get_field(name.lstrip("-")).column for name in fields]
+            if not _indexed(self.constraints(table), columns):
+                wanted.append((model, fields))
+        return wanted
+
+    def advise(self, queries):
+        """Proposals for the captured queries, each with the findings it should speed up"""
+        proposals = {}
+        for query in queries:
+            for model, fields in self.propose(query):
+                key = (model, tuple(fields))
+                if key not in proposals:
+                    proposals[key] = Proposal(model, fields)
+                proposals[key].findings.append(query)
+        # An index that is the prefix of another proposed on the same table is redundant
+        kept = []
+        for (model, fields), proposal in proposals.items():
+            longer = [
+                other for (other_model, other_fields), other in proposals.items()
+                if other_model is model and len(other_fields) > len(fields)
+                and [name.lstrip("-") for name in other_fields[:len(fields)]] == [name.lstrip("-") for name in fields]
+            ]
+            if longer:
+                longer[0].findings += [query for query in proposal.findings if query not in longer[0].findings]
+            else:
+                kept.append(proposal)
+        return kept
+
+
+def time_query(sql, params, repeat=20):
+    """Median milliseconds to run a query and fetch its rows"""
+    timings = []
+    with connection.cursor() as cursor:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+    return round(median(timings), 3)
+
+
+def trial(proposals, repeat=20):
+    """Time every finding before and after creating the proposed indexes, then drop them again"""
+    findings = list({id(query): query for proposal in proposals for query in proposal.findings}.values())
+    for query in findings:
+        query["before_ms"] = time_query(query["sql"], query["params"], repeat)
+    with transaction.atomic():
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for proposal in proposals:
+                cursor.execute(str(proposal.index.create_sql(proposal.model, editor)))
+        for query in findings:
+            query["plan_after"], _ = explain(query["sql"], query["params"])
+            query["after_ms"] = time_query(query["sql"], query["params"], repeat)
+        # Only the migrations add them for real
+        transaction.set_rollback(True)
+    return findings
+
+
+def write_migrations(proposals, name="advised_indexes"):
+    """{path: source} of one migration per app adding its proposed indexes"""
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    by_app = {}
+    for proposal in proposals:
+        by_app.setdefault(proposal.model._meta.app_label, []).append(proposal)
+    sources = {}
+    for app_label, app_proposals in by_app.items():
+        leaves = loader.graph.leaf_nodes(app_label)
+        number = max((MigrationAutodetector.parse_number(leaf) or 0 for _, leaf in leaves), default=0) + 1
+        migration = migrations.Migration(f"{number:04d}_{name}", app_label)
+        migration.dependencies = leaves
+        migration.operations = [
+            migrations.AddIndex(model_name=proposal.model._meta.model_name, index=proposal.index)
+            for proposal in app_proposals
+        ]
+        writer = MigrationWriter(migration)
+        sources[writer.path] = writer.as_string()
+    return sources
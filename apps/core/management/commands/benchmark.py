@@ -0,0 +1,78 @@
+import json
+import subprocess
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from apps.core import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Seed production sized data and benchmark every URL (latency, queries, memory)'
+
+    def add_arguments(self, parser):
+        for table, count in benchmark.DEFAULT_VOLUMES.items():
+            parser.add_argument(
+                f"--{table.replace('_', '-')}", type=int, default=count, dest=table,
+                help=f"Rows to have in the {table} table (default {count})",
+            )
+        parser.add_argument('--batch-size', type=int, default=benchmark.BATCH_SIZE)
+        parser.add_argument(
+            '--force', action='store_true', help='Seed even with DEBUG off, e.g. on a scratch copy of production',
+        )
+        parser.add_argument('--no-seed', action='store_true', help='Benchmark the data already in the database')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed requests per URL')
+        parser.add_argument('--warmup', type=int, default=1, help='Untimed requests per URL')
+        parser.add_argument('--anonymous', action='store_true', help='Do not log in before driving the URLs')
+        parser.add_argument('--view', action='append', dest='views', help='Only benchmark this view name (repeatable)')
+        parser.add_argument('--output', default='benchmark.json')
+
+    def handle(self, *args, **options):
+        if not options['no_seed']:
+            volumes = {table: options[table] for table in benchmark.DEFAULT_VOLUMES}
+            self.stdout.write(f"Seeding {volumes}...")
+            try:
+                benchmark.seed(volumes, options['batch_size'], log=self.stdout.write, force=options['force'])
+            except benchmark.SeedRefused as e:
+                raise CommandError(f"{e}; pass --force or --no-seed")
+
+        user = benchmark.benchmark_user()
+        client = Client()
+        if user and not options['anonymous']:
+            benchmark.login(client, user)
+
+        # Lets the test client through ALLOWED_HOSTS
+        setup_test_environment()
+        try:
+            results = benchmark.run(
+                client, benchmark.sample_kwargs(user),
+                repeat=options['repeat'], warmup=options['warmup'],
+                only=options['views'], log=self.stdout.write,
+            )
+        finally:
+            teardown_test_environment()
+
+        report = {
+            "commit": self.git_commit(),
+            "generated_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "debug": settings.DEBUG,
+            "logged_in": bool(user and not options['anonymous']),
+            "repeat": options['repeat'],
+            "tables": benchmark.table_sizes(),
+            "views": results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(f"Benchmark written to {options['output']}"))
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
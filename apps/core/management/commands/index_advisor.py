@@ -0,0 +1,92 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from apps.core import benchmark, index_advisor
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the queries of every URL and propose composite indexes for scans and filesorts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true', help='Seed even with DEBUG off, e.g. on a scratch copy of production',
+        )
+        parser.add_argument('--no-seed', action='store_true', help='Use the data already in the database')
+        parser.add_argument('--view', action='append', dest='views', help='Only drive this view name (repeatable)')
+        parser.add_argument(
+            '--min-rows', type=int, default=index_advisor.MIN_ROWS,
+            help=f'Ignore tables with fewer rows (default {index_advisor.MIN_ROWS})',
+        )
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query, before and after')
+        parser.add_argument('--write', action='store_true', help='Write the proposed indexes as migrations')
+        parser.add_argument('--output', default='benchmark-indexes.json')
+
+    def handle(self, *args, **options):
+        if not options['no_seed']:
+            self.stdout.write(f"Seeding {benchmark.DEFAULT_VOLUMES}...")
+            try:
+                benchmark.seed(benchmark.DEFAULT_VOLUMES, log=self.stdout.write, force=options['force'])
+            except benchmark.SeedRefused as e:
+                raise CommandError(f"{e}; pass --force or --no-seed")
+
+        user = benchmark.benchmark_user()
+        client = Client()
+        if user:
+            benchmark.login(client, user)
+
+        # Lets the test client through ALLOWED_HOSTS
+        setup_test_environment()
+        try:
+            queries = index_advisor.capture(client, benchmark.sample_kwargs(user), only=options['views'])
+        finally:
+            teardown_test_environment()
+
+        advisor = index_advisor.Advisor(min_rows=options['min_rows'])
+        proposals = advisor.advise(queries)
+        flagged = [query for query in queries if query["problems"]]
+        index_advisor.trial(proposals, repeat=options['repeat'])
+        self.stdout.write(
+            f"{len(queries)} distinct queries, {len(flagged)} scan or sort, {len(proposals)} indexes proposed"
+        )
+
+        for proposal in proposals:
+            self.stdout.write(f"\n{proposal.model._meta.label}: {proposal.definition()}")
+            for query in proposal.findings:
+                self.stdout.write(
+                    f"  {query['before_ms']}ms -> {query['after_ms']}ms  {', '.join(query['views'])}"
+                )
+                self.stdout.write(f"    before: {' | '.join(query['plan'])}")
+                self.stdout.write(f"    after:  {' | '.join(query['plan_after'])}")
+
+        if options['write'] and proposals:
+            for path, source in index_advisor.write_migrations(proposals).items():
+                with open(path, 'w') as f:
+                    f.write(source)
+                self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
+            self.stdout.write("Add the same indexes to the models' Meta.indexes so makemigrations stays clean.")
+
+        report = {
+            "generated_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "queries": len(queries),
+            "flagged": [
+                {"views": query["views"], "sql": query["sql"], "plan": query["plan"]} for query in flagged
+            ],
+            "indexes": [
+                {
+                    "model": proposal.model._meta.label,
+                    "index": proposal.definition(),
+                    "queries": [
+                        {key: query[key] for key in ("views", "sql", "plan", "plan_after", "before_ms", "after_ms")}
+                        for query in proposal.findings
+                    ],
+                }
+                for proposal in proposals
+            ],
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import logging
+import re
+import time
+import warnings
+from collections import Counter
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger("apps.core.queries")
+
+# Collapse "IN (%s, %s, ...)" so batches of different sizes share a fingerprint
+IN_LIST = re.compile(r"IN \((?:%s,\s*)*%s\)")
+WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryBudgetWarning(UserWarning):
+    pass
+
+
+def fingerprint(sql):
+    return IN_LIST.sub("IN (...)", WHITESPACE.sub(" ", sql)).strip()
+
+
+class QueryRecorder:
+    """execute_wrapper that counts and times every query of a request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.total_time += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self):
+        """Fingerprints run more than once, most repeated first"""
+        return [(sql, times) for sql, times in self.fingerprints.most_common() if times > 1]
+
+
+def load_budgets(path):
+    if not path:
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+class QueryBudgetMiddleware:
+    """Record query count, SQL time and duplicate queries for every request.
+
+    With DEBUG on the numbers are sent back as X-Query-* response headers,
+    otherwise they are written as one JSON log line per request. Views named
+    in the QUERY_BUDGETS_FILE that run more queries than allowed raise
+    QueryBudgetExceeded when QUERY_BUDGET_STRICT is set (tests) and emit a
+    QueryBudgetWarning otherwise.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.budgets = load_budgets(getattr(settings, "QUERY_BUDGETS_FILE", None))
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else None
+        budget = self.budgets.get(view_name)
+        duplicates = recorder.duplicates()
+
+        if settings.DEBUG:
+            response["X-Query-Count"] = str(recorder.count)
+            response["X-Query-Time-Ms"] = f"{recorder.total_time * 1000:.2f}"
+            response["X-Query-Duplicates"] = ", ".join(
+                f"{hashlib.md5(sql.encode()).hexdigest()[:8]}x{times}" for sql, times in duplicates[:5]
+            )
+            if budget is not None:
+                response["X-Query-Budget"] = str(budget)
+        else:
+            logger.info(json.dumps({
+                "view": view_name,
+                "path": request.path,
+                "status": response.status_code,
+                "queries": recorder.count,
+                "sql_ms": round(recorder.total_time * 1000, 2),
+                "budget": budget,
+                "duplicates": [{"sql": sql[:200], "times": times} for sql, times in duplicates[:5]],
+            }))
+
+        if budget is not None and recorder.count > budget:
+            message = f"{view_name} ran {recorder.count} queries (budget {budget})"
+            if duplicates:
+                sql, times = duplicates[0]
+                message += f"; most repeated ({times}x): {sql[:200]}"
+            if getattr(settings, "QUERY_BUDGET_STRICT", False):
+                raise QueryBudgetExceeded(message)
+            warnings.warn(message, QueryBudgetWarning)
+
+        return response
@@ -0,0 +1,109 @@
+import base64
+import binascii
+import json
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(instance, reverse=False):
+    """Opaque cursor pointing just past ``instance`` in (created_at, id) order"""
+    payload = json.dumps([instance.created_at.isoformat(), instance.pk, int(reverse)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk, reverse = json.loads(base64.urlsafe_b64decode(padded))
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError(cursor)
+        return created_at, int(pk), bool(reverse)
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise InvalidCursor(cursor) from e
+
+
+class KeysetPage:
+    """One page of a keyset paginated list, newest first"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def keyset_page(queryset, cursor, page_size):
+    """Return the page of ``queryset`` after ``cursor``, keyed on (created_at, id).
+
+    Rows are compared with the cursor's key instead of skipped with OFFSET
+    and nothing is counted, so a deep page costs the same as the first one.
+    """
+    reverse = False
+    if cursor:
+        created_at, pk, reverse = decode_cursor(cursor)
+        # The plain created_at bound lets the index seek to the cursor; the OR
+        # alone is only checked row by row, from the newest row on
+        if reverse:
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk), created_at__gte=created_at,
+            ).order_by("created_at", "pk")
+        else:
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk), created_at__lte=created_at,
+            ).order_by("-created_at", "-pk")
+    else:
+        queryset = queryset.order_by("-created_at", "-pk")
+
+    # One extra row tells whether there is another page in this direction
+    items = list(queryset[:page_size + 1])
+    has_more = len(items) > page_size
+    items = items[:page_size]
+
+    if reverse:
+        items.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, bool(cursor)
+
+    if not items:
+        return KeysetPage(items)
+    return KeysetPage(
+        items,
+        next_cursor=encode_cursor(items[-1]) if has_next else None,
+        previous_cursor=encode_cursor(items[0], reverse=True) if has_previous else None,
+    )
+
+
+class KeysetPaginator:
+    """keyset_page() behind the Paginator interface the dashboards use.
+
+    get_page() takes the cursor from the query string. A missing or
+    tampered cursor gives the first page, as Paginator.get_page() does
+    for page numbers it cannot read.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def get_page(self, cursor):
+        try:
+            return keyset_page(self.queryset, cursor, self.per_page)
+        except InvalidCursor:
+            return keyset_page(self.queryset, None, self.per_page)
@@ -0,0 +1,72 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.accounts.models import User
+from apps.category_skills.models import Skills, UserSkills
+from apps.university.models import University
+from .variants import invalidate_home_variants
+from .catalog import CATALOG_MODELS, model_tag
+from .cache import invalidate_tags
+from . import typeahead
+
+
+# Rebuild the home page variants in the background and drop the cached
+# facet counts once user_skills change
+@receiver(post_save, sender=UserSkills)
+def user_skill_saved(sender, instance, created, **kwargs):
+    if created:
+        invalidate_home_variants()
+        invalidate_tags(model_tag(UserSkills))
+
+
+@receiver(post_delete, sender=UserSkills)
+def user_skill_deleted(sender, instance, **kwargs):
+    invalidate_home_variants()
+    invalidate_tags(model_tag(UserSkills))
+
+
+# Drop cached catalog lists whenever one of their rows changes
+def catalog_changed(sender, **kwargs):
+    invalidate_tags(model_tag(sender))
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(catalog_changed, sender=model, dispatch_uid=f"catalog_saved_{model_tag(model)}")
+    post_delete.connect(catalog_changed, sender=model, dispatch_uid=f"catalog_deleted_{model_tag(model)}")
+
+
+# Keep the typeahead indexes of this process current, others reload
+@receiver(post_save, sender=Skills)
+def typeahead_skill_saved(sender, instance, **kwargs):
+    typeahead.skills_index.put(instance.pk, instance.name)
+
+
+@receiver(post_delete, sender=Skills)
+def typeahead_skill_deleted(sender, instance, **kwargs):
+    typeahead.skills_index.discard(instance.pk)
+
+
+@receiver(post_save, sender=University)
+def typeahead_university_saved(sender, instance, **kwargs):
+    typeahead.universities_index.put(instance.pk, instance.name)
+
+
+@receiver(post_delete, sender=University)
+def typeahead_university_deleted(sender, instance, **kwargs):
+    typeahead.universities_index.discard(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def typeahead_user_saved(sender, instance, **kwargs):
+    # Only teachers are indexed, the UserSkills signals handle the first and last skill
+    if instance.skills_count:
+        typeahead.instructors_index.put(instance.pk, typeahead.instructor_label(instance.first_name, instance.last_name))
+
+
+@receiver(post_delete, sender=User)
+def typeahead_user_deleted(sender, instance, **kwargs):
+    typeahead.instructors_index.discard(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=UserSkills)
+def typeahead_user_skill_changed(sender, instance, **kwargs):
+    typeahead.refresh_instructor(instance.user_id)
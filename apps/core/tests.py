@@ -1,3 +1,395 @@
-from django.test import TestCase
+from io import StringIO
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from apps.accounts.models import User
+from apps.category_skills.models import SkillsCategory, Skills, UserSkills, Request, Session
+from apps.blog.models import Blog, BlogImages
+from apps.notifications.models import Notification
+from apps.university.models import Country, State, City, Department, Branch, Level, University, UniversityImages
+from . import benchmark, cache as cached, index_advisor, typeahead
+from .variants import VariantPool
+from .middleware import QueryBudgetMiddleware, QueryBudgetExceeded, load_budgets
 
-# Create your tests here.
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = SkillsCategory.objects.create(name="Technology", description="Technology related courses")
+        skills = [
+            Skills.objects.create(name=f"Skill {i}", category=category, description=f"Skill {i} description")
+            for i in range(8)
+        ]
+        cls.users = [
+            User.objects.create(
+                username=f"user{i}", first_name="Demo", last_name=f"User{i}",
+                gender="M", personal_email=f"user{i}@example.com", year="1",
+            )
+            for i in range(6)
+        ]
+        for i, user in enumerate(cls.users):
+            for skill in skills[i:i + 3]:
+                UserSkills.objects.create(user=user, skill=skill)
+        # Enough rows to fill a couple of pages in the dashboards
+        for i, other in enumerate(cls.users[1:]):
+            Request.objects.create(requester=cls.users[0], receiver=other, skill=skills[i], description="Please teach me")
+            accepted = Request.objects.create(
+                requester=other, receiver=cls.users[0], skill=skills[i], description="Please teach me", status="A"
+            )
+            Session.objects.create(
+                request=accepted, teacher=cls.users[0], learner=other, skill=skills[i],
+                title="Intro", scheduled_date=timezone.now(), status="S",
+            )
+            Notification.objects.create(
+                recipient=cls.users[0], notification_type="request_sent", title="Request", message="New request",
+            )
+        for user in cls.users[:3]:
+            blog = Blog.objects.create(author=user, title=f"Blog by {user.username}", category=category)
+            for thumbnail in [True, False]:
+                BlogImages.objects.create(blog=blog, image="blogs_images/test.jpg", thumbnail=thumbnail)
+
+        # A university with everything its detail page shows
+        state = State.objects.create(name="State", country=Country.objects.create(name="Country"))
+        university = University.objects.create(
+            name="University", image="universities_icon/test.jpg", description="Description", established_year=2000,
+            country=state.country, state=state, city=City.objects.create(name="City", state=state),
+        )
+        for i in range(5):
+            department = Department.objects.create(name=f"Department {i}")
+            Branch.objects.bulk_create([Branch(name=f"Branch {j}", department=department) for j in range(3)])
+            university.departments.add(department)
+            university.levels.add(Level.objects.create(name=f"Level {i}"))
+            UniversityImages.objects.create(university=university, image="universities_images/test.jpg")
+        User.objects.filter(pk__in=[user.pk for user in cls.users]).update(university_name=university)
+
+    def setUp(self):
+        cache.clear()
+        session = self.client.session
+        session["user_id"] = self.users[0].id
+        session.save()
+
+    def test_pages_stay_within_budget(self):
+        budgets = load_budgets(settings.QUERY_BUDGETS_FILE)
+        urls = {
+            view_name: url
+            for view_name, route, url in benchmark.iter_urls(benchmark.sample_kwargs(self.users[0]), only=budgets)
+        }
+        # Every budgeted view is driven, with real ids for its URL parameters
+        self.assertEqual(set(urls), set(budgets))
+        self.assertNotIn(None, urls.values())
+
+        # Searches take other paths through the same views
+        variants = [(name, url) for name, url in urls.items()] + [
+            ("category_skills:courses", urls["category_skills:courses"] + "?q=skill"),
+            ("category_skills:instructors", urls["category_skills:instructors"] + "?q=demo"),
+        ]
+        for name, url in variants:
+            with self.subTest(view=name, url=url):
+                # Measured cold: caches such as the home page variant pools are filled on the way
+                cache.clear()
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_over_budget_raises(self):
+        middleware = QueryBudgetMiddleware(lambda request: self.client.get(reverse("category_skills:requests")))
+        middleware.budgets = {"category_skills:requests": 1}
+        request = self.client.get(reverse("category_skills:requests")).wsgi_request
+
+        with self.assertRaises(QueryBudgetExceeded):
+            middleware(request)
+
+
+class VariantPoolTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return self.builds
+
+    def test_cold_pool_builds_one_variant_inline(self):
+        pool = VariantPool("test", self.build, size=5)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(pool.get(), 1)
+        self.assertEqual(self.builds, 1)
+        # The rest is left to the refresh thread, started once the transaction commits
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(pool.get(), 1)
+
+        pool.regenerate()
+        self.assertEqual(self.builds, 6)
+        self.assertIn(pool.get(), range(2, 7))
+
+    def test_warm_pool_builds_nothing(self):
+        pool = VariantPool("test", self.build, size=3)
+        pool.regenerate()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            pool.get()
+        self.assertEqual(self.builds, 3)
+        self.assertEqual(callbacks, [])
+
+        # Invalidated: old variants are served while the thread rebuilds
+        pool.invalidate()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertIn(pool.get(), [1, 2, 3])
+        self.assertEqual(len(callbacks), 1)
+
+
+class CacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_get_or_set_computes_once(self):
+        self.assertEqual(cached.get_or_set("things", "a", self.compute), 1)
+        self.assertEqual(cached.get_or_set("things", "a", self.compute), 1)
+        self.assertEqual(cached.get_or_set("things", "b", self.compute), 2)
+        self.assertEqual(self.calls, 2)
+
+    def test_namespace_version_bump(self):
+        cached.get_or_set("things", "a", self.compute)
+        cached.get_or_set("others", "a", self.compute)
+
+        cached.invalidate_namespace("things")
+        self.assertEqual(cached.get_or_set("things", "a", self.compute), 3)
+        self.assertEqual(cached.get_or_set("others", "a", self.compute), 2)
+
+    def test_tag_invalidation(self):
+        cached.get_or_set("things", "a", self.compute, tags=["red"])
+        cached.get_or_set("things", "b", self.compute, tags=["red", "blue"])
+        cached.get_or_set("things", "c", self.compute, tags=["blue"])
+
+        cached.invalidate_tags("red")
+        self.assertEqual(cached.get_or_set("things", "a", self.compute, tags=["red"]), 4)
+        self.assertEqual(cached.get_or_set("things", "b", self.compute, tags=["red", "blue"]), 5)
+        self.assertEqual(cached.get_or_set("things", "c", self.compute, tags=["blue"]), 3)
+
+    def test_stats_kept_in_the_cache(self):
+        for key in ["a", "a", "a", "b"]:
+            cached.get_or_set("things", key, self.compute)
+
+        stats = cached.stats()["things"]
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_ratio"]), (2, 2, 0.5))
+        self.assertIsNotNone(stats["avg_compute_ms"])
+        # Shared by every process using the same backend
+        self.assertEqual(cache.get(cached._stats_key("things", "hits")), 2)
+
+        cached.reset_stats()
+        self.assertEqual(cached.stats(), {})
+        cached.get_or_set("things", "a", self.compute)
+        self.assertEqual(cached.stats()["things"]["hits"], 1)
+
+    def test_stats_survive_a_lost_namespace_list(self):
+        cached.get_or_set("things", "a", self.compute)
+        cache.clear()
+        cached.get_or_set("things", "a", self.compute)
+        self.assertEqual(cached.stats()["things"]["misses"], 1)
+
+
+class BenchmarkTests(TestCase):
+
+    def test_seed_tops_tables_up(self):
+        volumes = {"skills": 10, "users": 20, "user_skills": 40, "requests": 30,
+                   "sessions": 5, "notifications": 50, "blogs": 3}
+        benchmark.seed(volumes, batch_size=7, log=lambda message: None, force=True)
+        sizes = benchmark.table_sizes()
+
+        self.assertEqual(sizes["userprofile"], 20)
+        self.assertEqual(sizes["user_skills"], 40)
+        self.assertEqual(sizes["notifications"], 50)
+        # Duplicate and self requests are dropped, never over-filled
+        self.assertLessEqual(sizes["skill_requests"], 30)
+
+        # A second run only fills what the first one fell short of
+        benchmark.seed(volumes, batch_size=7, log=lambda message: None, force=True)
+        again = benchmark.table_sizes()
+        self.assertEqual(again["userprofile"], 20)
+        self.assertEqual(again["notifications"], 50)
+        self.assertLessEqual(again["skill_requests"], 30)
+
+    def test_seed_refuses_without_debug(self):
+        volumes = dict.fromkeys(benchmark.DEFAULT_VOLUMES, 1)
+        with self.assertRaises(benchmark.SeedRefused):
+            benchmark.seed(volumes, log=lambda message: None)
+        with self.assertRaisesMessage(CommandError, "--force"):
+            call_command("benchmark", "--users", "1", stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, "--force"):
+            call_command("index_advisor", stdout=StringIO())
+        self.assertFalse(User.objects.exists())
+
+        with override_settings(DEBUG=True):
+            benchmark.seed(volumes, log=lambda message: None)
+        self.assertEqual(benchmark.table_sizes()["userprofile"], 1)
+
+    def test_run_reports_every_route(self):
+        benchmark.seed({"skills": 5, "users": 5, "user_skills": 10, "requests": 10,
+                        "sessions": 2, "notifications": 5, "blogs": 1}, log=lambda message: None, force=True)
+        user = benchmark.benchmark_user()
+        session = self.client.session
+        session["user_id"] = user.id
+        session.save()
+
+        results = benchmark.run(self.client, benchmark.sample_kwargs(user), repeat=2, warmup=0,
+                                log=lambda message: None)
+
+        self.assertNotIn("accounts:logout", results)
+        self.assertEqual(results["core:home"]["status"], 200)
+        self.assertEqual(results["accounts:dashboard"]["status"], 200)
+        for key in ["p50_ms", "p95_ms", "p99_ms", "queries", "peak_memory_kb"]:
+            self.assertIn(key, results["category_skills:courses"])
+
+
+class IndexAdvisorTests(TestCase):
+
+    def query(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        return {"sql": sql, "params": params, "views": ["test"]}
+
+    def test_filter_columns_skip_joins_and_exclusions(self):
+        sql = (
+            'SELECT "skill_requests"."id" FROM "skill_requests" INNER JOIN "userprofile" T3 '
+            'ON ("skill_requests"."requester_id" = T3."id") WHERE ("skill_requests"."receiver_id" = %s '
+            'AND NOT ("skill_requests"."id" = %s) AND "skill_requests"."created_at" > %s) '
+            'ORDER BY "skill_requests"."created_at" DESC'
+        )
+        refs = index_advisor.table_refs(sql)
+        self.assertEqual(refs["userprofile"], {'"userprofile"', "T3"})
+
+        equal, ranged, order = index_advisor.filter_columns(sql, refs["skill_requests"])
+        self.assertEqual(equal, ["receiver_id"])
+        self.assertEqual(ranged, ["created_at"])
+        self.assertEqual(order, [("created_at", True)])
+        self.assertEqual(index_advisor.index_fields(Request, equal, ranged, order), ["receiver", "-created_at"])
+        # A primary key lookup needs no index
+        self.assertIsNone(index_advisor.index_fields(Request, ["id"], [], []))
+
+    def test_proposes_and_times_index_for_filesort(self):
+        benchmark.seed({"skills": 2, "users": 3, "user_skills": 2, "requests": 0,
+                        "sessions": 0, "notifications": 0, "blogs": 3}, log=lambda message: None, force=True)
+        author = Blog.objects.values_list("author_id", flat=True).first()
+        query = self.query(Blog.objects.filter(author_id=author).order_by("-created_at"))
+
+        proposals = index_advisor.Advisor(min_rows=0).advise([query])
+
+        self.assertEqual(len(proposals), 1)
+        self.assertEqual(proposals[0].model, Blog)
+        self.assertEqual(proposals[0].index.fields, ["author", "-created_at"])
+        self.assertTrue(any("TEMP B-TREE" in line for line in query["plan"]))
+
+        index_advisor.trial(proposals, repeat=1)
+        self.assertIn(proposals[0].index.name, " ".join(query["plan_after"]))
+        self.assertFalse(any("TEMP B-TREE" in line for line in query["plan_after"]))
+        self.assertIn("before_ms", query)
+        # Tried in a transaction that was rolled back
+        with connection.cursor() as cursor:
+            self.assertNotIn(proposals[0].index.name, connection.introspection.get_constraints(cursor, "blogs"))
+
+    def test_existing_and_small_table_indexes_not_proposed(self):
+        benchmark.seed({"skills": 2, "users": 3, "user_skills": 2, "requests": 0,
+                        "sessions": 0, "notifications": 5, "blogs": 3}, log=lambda message: None, force=True)
+        user = User.objects.first()
+        notifications = self.query(user.notifications.order_by("-created_at"))
+        blogs = self.query(Blog.objects.filter(author_id=user.id).order_by("-created_at"))
+
+        self.assertEqual(index_advisor.Advisor(min_rows=0).advise([notifications]), [])
+        self.assertEqual(index_advisor.Advisor().advise([blogs]), [])
+
+    def test_write_migrations_adds_indexes_after_leaf(self):
+        proposal = index_advisor.Proposal(Blog, ["author", "-created_at"])
+
+        sources = index_advisor.write_migrations([proposal])
+
+        [(path, source)] = sources.items()
+        self.assertRegex(path, r"blog/migrations/\d{4}_advised_indexes\.py$")
+        self.assertIn("migrations.AddIndex(", source)
+        self.assertIn("fields=['author', '-created_at']", source)
+        self.assertIn("('blog', '", source)
+
+    def test_capture_records_views(self):
+        benchmark.seed({"skills": 2, "users": 3, "user_skills": 2, "requests": 2,
+                        "sessions": 0, "notifications": 5, "blogs": 1}, log=lambda message: None, force=True)
+        user = benchmark.benchmark_user()
+        benchmark.login(self.client, user)
+
+        queries = index_advisor.capture(self.client, benchmark.sample_kwargs(user),
+                                        only=["notifications:get_notifications"])
+
+        self.assertTrue(any('FROM "notifications"' in query["sql"] for query in queries))
+        self.assertTrue(all(query["views"] == ["notifications:get_notifications"] for query in queries))
+
+
+class TypeaheadTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = SkillsCategory.objects.create(name="Technology", description="Technology related courses")
+        cls.python = Skills.objects.create(name="Python", category=category, description="Scripting")
+        cls.pygame = Skills.objects.create(name="Pygame", category=category, description="Games")
+        cls.web = Skills.objects.create(name="Web Python", category=category, description="Django")
+        cls.ada = User.objects.create(
+            username="ada", first_name="Ada", last_name="Lovelace",
+            gender="F", personal_email="ada@example.com", year="1",
+        )
+        UserSkills.objects.create(user=cls.ada, skill=cls.python)
+
+    def setUp(self):
+        cache.clear()
+        for index in typeahead.INDEXES.values():
+            index.reset()
+
+    def labels(self, kind, query, limit=typeahead.TYPEAHEAD_LIMIT):
+        return [item["label"] for item in typeahead.INDEXES[kind].search(query, limit)]
+
+    def test_matches_name_and_word_prefixes_in_order(self):
+        self.assertEqual(self.labels("skills", "py"), ["Pygame", "Python", "Web Python"])
+        self.assertEqual(self.labels("skills", "  PYTH "), ["Python", "Web Python"])
+        self.assertEqual(self.labels("skills", "web py"), ["Web Python"])
+        self.assertEqual(self.labels("skills", "py", limit=1), ["Pygame"])
+        self.assertEqual(self.labels("skills", ""), [])
+        self.assertEqual(self.labels("instructors", "love"), ["Ada Lovelace"])
+
+    def test_signals_patch_the_loaded_index_without_queries(self):
+        self.labels("skills", "py")
+        self.python.name = "Rust"
+        self.python.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.labels("skills", "py"), ["Pygame", "Web Python"])
+            self.assertEqual(self.labels("skills", "ru"), ["Rust"])
+
+        self.pygame.delete()
+        self.assertEqual(self.labels("skills", "py"), ["Web Python"])
+
+    def test_instructors_follow_their_skills(self):
+        grace = User.objects.create(
+            username="grace", first_name="Grace", last_name="Hopper",
+            gender="F", personal_email="grace@example.com", year="1",
+        )
+        self.assertEqual(self.labels("instructors", "gr"), [])
+
+        UserSkills.objects.create(user=grace, skill=self.pygame)
+        self.assertEqual(self.labels("instructors", "gr"), ["Grace Hopper"])
+
+        UserSkills.objects.filter(user=self.ada).delete()
+        self.assertEqual(self.labels("instructors", "ada"), [])
+
+    def test_other_processes_reload_on_version_change(self):
+        self.labels("skills", "py")
+        # Another process bumped the shared version after a bulk change
+        Skills.objects.filter(pk=self.pygame.pk).update(name="Go")
+        cache.delete(typeahead.skills_index.version_key)
+        typeahead.skills_index._checked_at = 0
+        self.assertEqual(self.labels("skills", "py"), ["Python", "Web Python"])
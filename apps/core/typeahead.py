@@ -0,0 +1,175 @@
+import bisect
+import threading
+import time
+import uuid
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+from django.urls import reverse
+from apps.accounts.models import User
+from apps.category_skills.models import Skills, UserSkills
+from apps.university.models import University
+
+# Autocomplete for the search boxes, served from sorted (key, id) lists
+# kept in each process and searched with bisect. The model signals in
+# apps.core.signals patch the local lists and bump a shared version key,
+# so other processes reload theirs on their next search.
+TYPEAHEAD_LIMIT = 8
+MAX_TYPEAHEAD_LIMIT = 20
+# Processes reload at least this often, which also picks up bulk inserts
+VERSION_TTL = 300
+# Seconds between checks of the shared version, keeps searches off the cache backend
+CHECK_INTERVAL = 1.0
+# Reversed once per index, reverse() per suggestion would cost more than the search
+URL_PLACEHOLDER = 987654321
+
+
+def normalize(text):
+    return " ".join((text or "").lower().split())
+
+
+def index_keys(label):
+    """Every word suffix of ``label``, so "ada king" is found by "ada k" and "kin" """
+    words = normalize(label).split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class PrefixIndex:
+
+    def __init__(self, name, load, url_name):
+        self.name = name
+        self.load = load  # () -> iterable of (id, label)
+        self.url_name = url_name
+        self.version_key = f"core:typeahead:{name}:version"
+        self._lock = threading.RLock()
+        self._keys = []
+        self._labels = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._url = None
+
+    def _shared_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            version = uuid.uuid4().hex
+            if not cache.add(self.version_key, version, VERSION_TTL):
+                version = cache.get(self.version_key, version)
+        return version
+
+    def _ensure_loaded(self):
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < CHECK_INTERVAL:
+            return
+        version = self._shared_version()
+        if version != self._version:
+            labels = dict(self.load())
+            keys = sorted((key, pk) for pk, label in labels.items() for key in index_keys(label))
+            with self._lock:
+                self._keys, self._labels, self._version = keys, labels, version
+        self._checked_at = now
+
+    def search(self, query, limit=TYPEAHEAD_LIMIT):
+        """Up to ``limit`` entries whose name, or a word of it, starts with ``query``"""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        self._ensure_loaded()
+        results = []
+        with self._lock:
+            seen = set()
+            i = bisect.bisect_left(self._keys, (prefix,))
+            while i < len(self._keys) and len(results) < limit:
+                key, pk = self._keys[i]
+                if not key.startswith(prefix):
+                    break
+                if pk not in seen:
+                    seen.add(pk)
+                    results.append((pk, self._labels[pk]))
+                i += 1
+        return [{"id": pk, "label": label, "url": self.url(pk)} for pk, label in results]
+
+    def url(self, pk):
+        if self._url is None:
+            self._url = reverse(self.url_name, args=[URL_PLACEHOLDER]).replace(str(URL_PLACEHOLDER), "{}")
+        return self._url.format(pk)
+
+    def _bump(self):
+        version = uuid.uuid4().hex
+        cache.set(self.version_key, version, VERSION_TTL)
+        return version
+
+    def _patch(self, change):
+        """Apply ``change`` here and make other processes reload; ``change`` returns False for no-ops"""
+        with self._lock:
+            if self._version is None or cache.get(self.version_key) != self._version:
+                # Not loaded or already stale here: everyone reloads on their next search
+                self._version = None
+                self._bump()
+            elif change():
+                self._version = self._bump()
+
+    def _remove_keys(self, pk):
+        label = self._labels.pop(pk, None)
+        if label is None:
+            return False
+        for key in index_keys(label):
+            i = bisect.bisect_left(self._keys, (key, pk))
+            if i < len(self._keys) and self._keys[i] == (key, pk):
+                del self._keys[i]
+        return True
+
+    def put(self, pk, label):
+        def change():
+            if self._labels.get(pk) == label:
+                return False
+            self._remove_keys(pk)
+            self._labels[pk] = label
+            for key in index_keys(label):
+                bisect.insort(self._keys, (key, pk))
+            return True
+        self._patch(change)
+
+    def discard(self, pk):
+        self._patch(lambda: self._remove_keys(pk))
+
+    def reset(self):
+        with self._lock:
+            self._keys, self._labels, self._version = [], {}, None
+
+
+def instructor_label(first_name, last_name):
+    return f"{first_name} {last_name}"
+
+
+def _load_instructors():
+    users = User.objects.filter(skills_count__gt=0).values_list("id", "first_name", "last_name")
+    return ((pk, instructor_label(first, last)) for pk, first, last in users.iterator(chunk_size=5000))
+
+
+skills_index = PrefixIndex(
+    "skills", lambda: Skills.objects.values_list("id", "name").iterator(), "category_skills:course_details",
+)
+instructors_index = PrefixIndex("instructors", _load_instructors, "category_skills:instructor_profile")
+universities_index = PrefixIndex(
+    "universities", lambda: University.objects.values_list("id", "name").iterator(), "university:university_detail",
+)
+
+INDEXES = {index.name: index for index in [skills_index, instructors_index, universities_index]}
+
+
+def refresh_instructor(user_id):
+    """Index ``user_id`` if they teach a skill, drop them otherwise"""
+    name = (
+        User.objects.filter(pk=user_id)
+        .filter(Exists(UserSkills.objects.filter(user_id=OuterRef("pk"))))
+        .values_list("first_name", "last_name")
+        .first()
+    )
+    if name:
+        instructors_index.put(user_id, instructor_label(*name))
+    else:
+        instructors_index.discard(user_id)
+
+
+def search(query, kinds=None, limit=TYPEAHEAD_LIMIT):
+    limit = max(1, min(limit, MAX_TYPEAHEAD_LIMIT))
+    return {kind: INDEXES[kind].search(query, limit) for kind in (kinds or INDEXES)}
@@ -9,6 +9,7 @@ urlpatterns = [
     path('contact/',views.ContactView,name="contact"),
     path('terms/',views.TermsView,name="terms"),
     path('privacy/',views.PrivacyView,name="privacy"),
-    path('enroll/',views.EnrollView,name="enroll")
+    path('enroll/',views.EnrollView,name="enroll"),
+    path('cache-stats/',views.CacheStatsView,name="cache_stats"),
 ]
 
@@ -0,0 +1,124 @@
+import random
+import threading
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.template.loader import render_to_string
+from apps.category_skills.sampling import random_teachable_skills, pair_random_teachers, random_instructors
+from apps.category_skills.serializers import SkillSerializer, InstructorSerializer
+
+VARIANT_POOL_SIZE = 10
+VARIANT_TTL = 300
+
+HOME_SKILLS = 6
+HOME_INSTRUCTORS = 8
+# Extra entries per variant so the logged-in user can be filtered out
+VARIANT_OVERSAMPLE = 3
+
+
+class VariantPool:
+    """A pool of pre-built random variants of one home page block.
+
+    Visitors get a random variant from the cache. When the pool is
+    invalidated or its TTL runs out the old variants keep being served
+    while a background thread builds a new pool. A cold pool gets one
+    variant built for the visitor who found it empty, the rest are left
+    to the background thread.
+    """
+
+    def __init__(self, name, build, size=VARIANT_POOL_SIZE, ttl=VARIANT_TTL):
+        self.name = name
+        self.build = build
+        self.size = size
+        self.ttl = ttl
+        self.pool_key = f"core:variants:{name}"
+        self.fresh_key = f"core:variants:{name}:fresh"
+        self.lock_key = f"core:variants:{name}:lock"
+
+    def get(self):
+        variants = cache.get(self.pool_key)
+        if variants is None:
+            # Nothing to serve yet: one variant for now, shared until the full pool is in
+            variants = [self.build()]
+            cache.add(self.pool_key, variants, None)
+            self.regenerate_in_background()
+        elif cache.get(self.fresh_key) is None:
+            self.regenerate_in_background()
+        return random.choice(variants)
+
+    def regenerate(self):
+        variants = [self.build() for _ in range(self.size)]
+        cache.set(self.pool_key, variants, None)
+        cache.set(self.fresh_key, True, self.ttl)
+        return variants
+
+    def regenerate_in_background(self):
+        # After commit, so the thread sees the rows that made the pool stale
+        transaction.on_commit(self._start_regeneration)
+
+    def _start_regeneration(self):
+        # Only one thread (in any process) rebuilds a pool at a time
+        if not cache.add(self.lock_key, True, self.ttl):
+            return
+
+        def run():
+            try:
+                self.regenerate()
+            finally:
+                cache.delete(self.lock_key)
+                connections.close_all()
+
+        threading.Thread(target=run, name=f"variants-{self.name}", daemon=True).start()
+
+    def invalidate(self):
+        cache.delete(self.fresh_key)
+
+
+# ============= HOME PAGE BLOCKS =============
+
+def build_skills_variant():
+    skills = random_teachable_skills(HOME_SKILLS + VARIANT_OVERSAMPLE)
+    skill_to_user = pair_random_teachers(skills)
+    variant = []
+    for skill in skills:
+        teacher = skill_to_user.get(skill.id)
+        variant.append({
+            "teacher_id": teacher.id if teacher else None,
+            "data": SkillSerializer(skill, context={"user": teacher}).data,
+        })
+    return variant
+
+
+def build_instructors_variant():
+    instructors = random_instructors(HOME_INSTRUCTORS + 1)
+    return [
+        {"user_id": instructor.id, "data": data}
+        for instructor, data in zip(instructors, InstructorSerializer(instructors, many=True).data)
+    ]
+
+
+def build_skills_html_variant():
+    return render_to_string("core/index.html", {"skills": random_teachable_skills(HOME_SKILLS)})
+
+
+skills_pool = VariantPool("skills", build_skills_variant)
+instructors_pool = VariantPool("instructors", build_instructors_variant)
+skills_html_pool = VariantPool("skills_html", build_skills_html_variant)
+
+POOLS = [skills_pool, instructors_pool, skills_html_pool]
+
+
+def home_skills(user_id=None):
+    """Serialized skills for the home page, never taught by ``user_id``"""
+    variant = skills_pool.get()
+    return [entry["data"] for entry in variant if entry["teacher_id"] != user_id][:HOME_SKILLS]
+
+
+def home_instructors(user_id=None):
+    """Serialized instructors for the home page, without ``user_id``"""
+    variant = instructors_pool.get()
+    return [entry["data"] for entry in variant if entry["user_id"] != user_id][:HOME_INSTRUCTORS]
+
+
+def invalidate_home_variants():
+    for pool in POOLS:
+        pool.invalidate()
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('request_sent', 'Request Sent'), ('request_accepted', 'Request Accepted'), ('request_rejected', 'Request Rejected'), ('request_cancelled', 'Request Cancelled'), ('request_expired', 'Request Expired'), ('session_created', 'Session Created'), ('session_started', 'Session Started'), ('session_completed', 'Session Completed'), ('session_cancelled', 'Session Cancelled'), ('session_expired', 'Session Expired'), ('skill_added', 'Skill Added'), ('skill_removed', 'Skill Removed')], max_length=20),
+        ),
+    ]
@@ -9,10 +9,12 @@ class Notification(models.Model):
         ('request_accepted', 'Request Accepted'),
         ('request_rejected', 'Request Rejected'),
         ('request_cancelled', 'Request Cancelled'),
+        ('request_expired', 'Request Expired'),
         ('session_created', 'Session Created'),
         ('session_started', 'Session Started'),
         ('session_completed', 'Session Completed'),
         ('session_cancelled', 'Session Cancelled'),
+        ('session_expired', 'Session Expired'),
         ('skill_added', 'Skill Added'),
         ('skill_removed', 'Skill Removed'),
     )
@@ -36,6 +38,12 @@ class Notification(models.Model):
         ordering = ['-created_at']
         db_table = 'notifications'
         verbose_name_plural = 'Notifications'
+        indexes = [
+            # A user's notifications, newest first, without a sort
+            models.Index(fields=['recipient', '-created_at'], name='notifications_recipient_idx'),
+            # Unread count and mark-all-as-read, which filter on is_read too
+            models.Index(fields=['recipient', 'is_read', '-created_at'], name='notifications_unread_idx'),
+        ]
     
     def __str__(self):
         return f"{self.notification_type} - {self.recipient.username}"
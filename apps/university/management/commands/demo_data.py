@@ -1,116 +1,161 @@
 import os
+import time
 from django.conf import settings
 from django.core.files import File
+from django.core.files.storage import default_storage
 from django.core.management.base import BaseCommand
-from apps.university.models import Country, State, City, University, UniversityImages, Department, Branch
+from apps.university.models import Country, State, City, University, Department, Branch
 from apps.category_skills.models import SkillsCategory, Skills
+from apps.category_skills.search import rebuild_search_index
+from apps.core.bulk import BATCH_SIZE, bulk_insert
+from apps.core.cache import invalidate_tags
+from apps.core.catalog import CATALOG_MODELS, model_tag
+
+UNIVERSITIES_PER_CITY = 10
+
+CATEGORY_DATA = {
+    "Technology": ["Python", "Java", "Fullstack", "Django", "React"],
+    "Design": ["Photoshop", "Figma", "Illustrator", "UI/UX", "Animation"],
+    "Business": ["Marketing", "Finance", "Management", "Sales", "Analytics"],
+}
+
+
+def image_files(folder, extensions):
+    return sorted(f for f in os.listdir(folder) if f.lower().endswith(extensions))
+
+
+def store_image(folder, filename, upload_to):
+    """Save a static image into media once and return its storage name"""
+    name = f"{upload_to}{filename}"
+    if not default_storage.exists(name):
+        with open(os.path.join(folder, filename), 'rb') as f:
+            name = default_storage.save(name, File(f, name=filename))
+    return name
+
 
 class Command(BaseCommand):
     help = 'Populate initial data for countries, states, cities, universities, departments, and branches'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument('--countries', type=int, default=10, help='Number of countries')
+        parser.add_argument('--states', type=int, default=10, help='States per country')
+        parser.add_argument('--cities', type=int, default=10, help='Cities per state')
+        parser.add_argument('--universities', type=int, default=100,
+                            help=f'Total universities, {UNIVERSITIES_PER_CITY} per city')
+        parser.add_argument('--departments', type=int, default=10, help='Number of departments')
+        parser.add_argument('--branches', type=int, default=10, help='Branches per department')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        started = time.perf_counter()
         self.stdout.write("Starting data population...")
 
         # ----- Countries -----
-        countries = []
-        for i in range(1, 11):
-            country, created = Country.objects.get_or_create(name=f"Country {i}")
-            countries.append(country)
+        countries = self.create_missing(
+            Country, [Country(name=f"Country {i}") for i in range(1, options['countries'] + 1)],
+            lambda obj: obj.name,
+        )
         self.stdout.write("Countries added.")
 
         # ----- States -----
-        states = []
-        for country in countries:
-            for i in range(1, 11):
-                state, created = State.objects.get_or_create(name=f"State {i} of {country.name}", country=country)
-                states.append(state)
+        states = self.create_missing(State, [
+            State(name=f"State {i} of {country.name}", country=country)
+            for country in countries
+            for i in range(1, options['states'] + 1)
+        ], lambda obj: (obj.name, obj.country_id))
         self.stdout.write("States added.")
 
         # ----- Cities -----
-        cities = []
-        for state in states:
-            for i in range(1, 11):
-                city, created = City.objects.get_or_create(name=f"City {i} of {state.name}", state=state)
-                cities.append(city)
+        cities = self.create_missing(City, [
+            City(name=f"City {i} of {state.name}", state=state)
+            for state in states
+            for i in range(1, options['cities'] + 1)
+        ], lambda obj: (obj.name, obj.state_id))
         self.stdout.write("Cities added.")
 
         # ----- Universities -----
+        # Every university points at one of a handful of stored files
         image_folder = os.path.join(settings.BASE_DIR, 'static', 'assets', 'img', 'education')
-        image_files = [f for f in os.listdir(image_folder) if f.lower().endswith(('.png','.jpg','.jpeg'))]
-
+        images = [
+            store_image(image_folder, filename, 'universities_icon/')
+            for filename in image_files(image_folder, ('.png', '.jpg', '.jpeg'))[:UNIVERSITIES_PER_CITY]
+        ]
+        states_by_id = {state.id: state for state in states}
         universities = []
-
-        for city in cities[:10]:
-            for i in range(1, 11):
-                image_path = os.path.join(image_folder, image_files[(i-1) % len(image_files)])
-                with open(image_path, 'rb') as f:
-                    django_file = File(f, name=image_files[(i-1) % len(image_files)])  # <- important
-                    university, created = University.objects.get_or_create(
-                        name=f"University {i} of {city.name}",
-                        defaults={
-                            'description': f"Description for University {i} in {city.name}",
-                            'established_year': 2000 + i,
-                            'country': city.state.country,
-                            'state': city.state,
-                            'city': city,
-                            'image': django_file
-                        }
-                    )
-                universities.append(university)
+        for n in range(options['universities']):
+            city = cities[n // UNIVERSITIES_PER_CITY % len(cities)]
+            i = n % UNIVERSITIES_PER_CITY + 1
+            state = states_by_id[city.state_id]
+            universities.append(University(
+                name=f"University {i} of {city.name}",
+                description=f"Description for University {i} in {city.name}",
+                established_year=2000 + i,
+                country_id=state.country_id,
+                state=state,
+                city=city,
+                image=images[(i - 1) % len(images)],
+            ))
+        self.create_missing(University, universities, lambda obj: obj.name)
+        self.stdout.write("Universities added.")
 
         # ----- Departments -----
-        departments = []
-        for i in range(1, 11):
-            dept, created = Department.objects.get_or_create(
-                name=f"Department {i}",
-                defaults={'description': f"Description for Department {i}"}
-            )
-            departments.append(dept)
+        departments = self.create_missing(Department, [
+            Department(name=f"Department {i}", description=f"Description for Department {i}")
+            for i in range(1, options['departments'] + 1)
+        ], lambda obj: obj.name)
         self.stdout.write("Departments added.")
 
         # ----- Branches -----
-        for dept in departments:
-            for i in range(1, 11):
-                Branch.objects.get_or_create(
-                    name=f"Branch {i} of {dept.name}",
-                    department=dept,
-                    defaults={'description': f"Description for Branch {i} of {dept.name}"}
-                )
+        self.create_missing(Branch, [
+            Branch(
+                name=f"Branch {i} of {dept.name}",
+                department=dept,
+                description=f"Description for Branch {i} of {dept.name}",
+            )
+            for dept in departments
+            for i in range(1, options['branches'] + 1)
+        ], lambda obj: (obj.name, obj.department_id))
         self.stdout.write("Branches added.")
 
         # ----- Categories -----
-        category_data = {
-            "Technology": ["Python", "Java", "Fullstack", "Django", "React"],
-            "Design": ["Photoshop", "Figma", "Illustrator", "UI/UX", "Animation"],
-            "Business": ["Marketing", "Finance", "Management", "Sales", "Analytics"],
-        }
-
         # static images for categories
         image_folder = os.path.join(settings.BASE_DIR, 'static', 'assets', 'img', 'person')
-        image_files = [f for f in os.listdir(image_folder) if f.lower().endswith(('.png','.jpg','.jpeg','webp'))]
-
-        categories = []
-        for idx, (cat_name, skills_list) in enumerate(category_data.items()):
-            image_path = os.path.join(image_folder, image_files[idx % len(image_files)])
-            with open(image_path, 'rb') as f:
-                django_file = File(f, name=image_files[idx % len(image_files)])
-                category, created = SkillsCategory.objects.get_or_create(
-                    name=cat_name,
-                    defaults={
-                        "description": f"{cat_name} related courses",
-                        "image": django_file
-                    }
-                )
-            categories.append(category)
-
-            # ----- Skills for this category -----
-            for skill_name in skills_list:
-                Skills.objects.get_or_create(
-                    name=skill_name,
-                    category=category,
-                    defaults={
-                        "description": f"{skill_name} skill in {cat_name}"
-                    }
-                )
-
-        self.stdout.write(self.style.SUCCESS("Data population completed successfully!"))
+        category_images = image_files(image_folder, ('.png', '.jpg', '.jpeg', 'webp'))
+        categories = self.create_missing(SkillsCategory, [
+            SkillsCategory(
+                name=cat_name,
+                description=f"{cat_name} related courses",
+                image=store_image(image_folder, category_images[idx % len(category_images)], 'category/'),
+            )
+            for idx, cat_name in enumerate(CATEGORY_DATA)
+        ], lambda obj: obj.name)
+
+        # ----- Skills for each category -----
+        categories_by_name = {category.name: category for category in categories}
+        self.create_missing(Skills, [
+            Skills(name=skill_name, category=categories_by_name[cat_name],
+                   description=f"{skill_name} skill in {cat_name}")
+            for cat_name, skills_list in CATEGORY_DATA.items()
+            for skill_name in skills_list
+        ], lambda obj: obj.name)
+
+        # bulk_create sends no post_save, so refresh the derived data by hand
+        rebuild_search_index()
+        invalidate_tags(*(model_tag(model) for model in CATALOG_MODELS))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Data population completed successfully in {time.perf_counter() - started:.1f}s!"
+        ))
+
+    def create_missing(self, model, objects, key):
+        """Bulk insert the objects whose ``key`` is not in the table yet.
+
+        Returns the saved rows for every requested key, so children can be
+        linked to parents that already existed before this run.
+        """
+        existing = {key(obj): obj for obj in model.objects.all().iterator()}
+        bulk_insert(model, (obj for obj in objects if key(obj) not in existing), self.batch_size)
+
+        wanted = {key(obj) for obj in objects}
+        return [obj for obj in model.objects.all().iterator() if key(obj) in wanted]
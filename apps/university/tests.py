@@ -1,3 +1,58 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from apps.category_skills.models import SkillsCategory, Skills
+from .models import Country, State, City, University, Department, Branch
 
-# Create your tests here.
+DEMO_MODELS = [Country, State, City, University, Department, Branch, SkillsCategory, Skills]
+
+
+class DemoDataTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def demo_data(self):
+        call_command(
+            "demo_data", countries=2, states=2, cities=2, universities=12,
+            departments=3, branches=2, batch_size=5, stdout=StringIO(),
+        )
+
+    def row_counts(self):
+        return {model.__name__: model.objects.count() for model in DEMO_MODELS}
+
+    def stored_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(folder, name), self.media_root)
+            for folder, _, names in os.walk(self.media_root)
+            for name in names
+        )
+
+    def test_second_run_adds_nothing(self):
+        self.demo_data()
+        counts = self.row_counts()
+        files = self.stored_files()
+
+        self.assertEqual(counts["Country"], 2)
+        self.assertEqual(counts["State"], 4)
+        self.assertEqual(counts["City"], 8)
+        self.assertEqual(counts["University"], 12)
+        self.assertEqual(counts["Branch"], 6)
+        self.assertEqual(counts["Skills"], 15)
+
+        self.demo_data()
+        self.assertEqual(self.row_counts(), counts)
+        # Images are copied once and shared by every row pointing at them
+        self.assertEqual(self.stored_files(), files)
+        self.assertEqual(
+            len(files),
+            University.objects.values("image").distinct().count()
+            + SkillsCategory.objects.values("image").distinct().count(),
+        )
@@ -1,9 +1,10 @@
 from django.shortcuts import render, get_object_or_404
 from django.template.loader import render_to_string
-from .models import University, Department, Level
+from .models import University
 from django.core.paginator import Paginator
 from django.http import JsonResponse
 from apps.accounts.models import User
+from apps.core import catalog
 
 def UniversityView(request):
     universities = University.objects.all()
@@ -22,8 +23,8 @@ def UniversityView(request):
     if levels and "all" not in levels:
         universities = universities.filter(levels__id__in=levels).distinct()
 
-    departments = Department.objects.all()
-    levels = Level.objects.all()
+    departments = catalog.departments()
+    levels = catalog.levels()
 
     paginator = Paginator(universities, 6)
     page_number = request.GET.get("page")
@@ -49,40 +50,28 @@ def UniversityView(request):
 
 
 def UniversityDetailView(request, university_id):
-    university = get_object_or_404(University, id=university_id)
+    university = get_object_or_404(University.objects.select_related("country", "state", "city"), id=university_id)
 
-    # Departments pagination
-    department_qs = university.departments.all()
+    # Departments pagination, with every branch of the page in one query
+    department_qs = university.departments.prefetch_related("branches")
     dept_page_number = request.GET.get("page")
     dept_paginator = Paginator(department_qs, 4)
     dept_page_obj = dept_paginator.get_page(dept_page_number)
 
-    # Instructors data
-    instructors_data = []
-    users_with_skills = User.objects.filter(
-        university_name=university
-    ).distinct().prefetch_related('user_skills__skill__category')
-
-    for user in users_with_skills:
-        user_skills = user.user_skills.all()
-        skills_list = [us.skill for us in user_skills]
-        instructors_data.append({
-            "user": user,
-            "skills": skills_list,
-            "skills_count": len(skills_list),
-        })
+    # Instructors, paged in SQL and rendered from their card summary
+    users = User.objects.filter(university_name=university).select_related("department", "rating_stats").order_by("-id")
 
     # Instructors pagination
     instr_page_number = request.GET.get("instr_page")
-    instr_paginator = Paginator(instructors_data, 6)  # 6 instructors per page
+    instr_paginator = Paginator(users, 6)  # 6 instructors per page
     instr_page_obj = instr_paginator.get_page(instr_page_number)
 
-    # Images
-    images = university.images.order_by("id")[:4]
-    hero_image = images[0] if images.count() > 0 else None
-    tab_side_image = images[1] if images.count() > 1 else None
-    below_tab_image = images[2] if images.count() > 2 else None
-    playground_image = images[3] if images.count() > 3 else None
+    # Images, fetched once
+    images = list(university.images.order_by("id")[:4])
+    hero_image = images[0] if len(images) > 0 else None
+    tab_side_image = images[1] if len(images) > 1 else None
+    below_tab_image = images[2] if len(images) > 2 else None
+    playground_image = images[3] if len(images) > 3 else None
 
     # Ajax partials
     if request.headers.get("x-requested-with") == "XMLHttpRequest":
@@ -101,8 +90,8 @@ def UniversityDetailView(request, university_id):
     # Full page render
     context = {
         "university": university,
-        "departments": university.departments.all(),
-        "levels": university.levels.all(),
+        "departments_count": dept_paginator.count,
+        "levels": list(university.levels.all()),
         "hero_image": hero_image,
         "tab_side_image": tab_side_image,
         "below_tab_image": below_tab_image,
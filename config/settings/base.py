@@ -51,6 +51,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'apps.core.middleware.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -125,6 +126,44 @@ MEDIA_ROOT = BASE_DIR / 'media'
 CKEDITOR_UPLOAD_PATH = "uploads/"
 
 
+# Query budgets
+# Max queries per URL name, checked by apps.core.middleware.QueryBudgetMiddleware.
+# Strict mode raises instead of warning (used by the test suite).
+
+QUERY_BUDGETS_FILE = BASE_DIR / "config" / "query_budgets.json"
+QUERY_BUDGET_STRICT = False
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# CACHE_BACKEND picks one of "locmem" (default), "file" or "redis"
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+
+CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "skill-swap",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_LOCATION", BASE_DIR / "cache"),
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("CACHE_LOCATION", "redis://127.0.0.1:6379/1"),
+    },
+}
+
+CACHES = {
+    "default": {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        "TIMEOUT": 300,
+        "KEY_PREFIX": "skillswap",
+    }
+}
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -38,6 +38,12 @@ LOGGING = {
             "class": "logging.FileHandler",
             "filename": BASE_DIR / "logs/errors.log",
         },
+        # One JSON line per request from QueryBudgetMiddleware
+        "queries": {
+            "level": "INFO",
+            "class": "logging.FileHandler",
+            "filename": BASE_DIR / "logs/queries.log",
+        },
     },
     "loggers": {
         "django": {
@@ -45,5 +51,10 @@ LOGGING = {
             "level": "ERROR",
             "propagate": True,
         },
+        "apps.core.queries": {
+            "handlers": ["queries"],
+            "level": "INFO",
+            "propagate": False,
+        },
     },
 }
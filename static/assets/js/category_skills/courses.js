@@ -97,6 +97,7 @@ function fetchCourses(url = "?page=1") {
     .then(response => response.json())
     .then(data => {
       document.getElementById("coursesWrapper").innerHTML = data.html;
+      updateFacetCounts(data.facets);
 
       // ✅ Clean URL (remove ajax=1 from history)
       params.delete("ajax");
@@ -107,6 +108,21 @@ function fetchCourses(url = "?page=1") {
     .catch(err => console.error("Error fetching courses:", err));
 }
 
+// Refresh the sidebar counts for the new search and filters
+function updateFacetCounts(facets) {
+  if (!facets) return;
+
+  document.querySelectorAll("[data-category-count]").forEach(span => {
+    let id = span.getAttribute("data-category-count");
+    span.textContent = id === "all" ? facets.all_categories : (facets.categories[id] || 0);
+  });
+
+  document.querySelectorAll("[data-level-count]").forEach(span => {
+    let level = span.getAttribute("data-level-count");
+    span.textContent = level === "all" ? facets.all_levels : (facets.levels[level] || 0);
+  });
+}
+
 // ✅ Restore filter state on page load
 (function restoreFiltersFromURL() {
   let params = new URLSearchParams(window.location.search);
@@ -1,21 +1,24 @@
 document.addEventListener("DOMContentLoaded", function () {
-  const coursesTab = document.querySelector("#courses");
+  // Courses and Experience tabs page independently
+  ["#courses", "#experience"].forEach(function (selector) {
+    const tab = document.querySelector(selector);
+    if (!tab) return;
 
-  // Delegate click on pagination links
-  coursesTab.addEventListener("click", function (e) {
-    if (e.target.closest(".pagination a")) {
-      e.preventDefault();
-      const url = e.target.closest("a").getAttribute("href");
+    // Delegate click on pagination links
+    tab.addEventListener("click", function (e) {
+      if (e.target.closest(".pagination a")) {
+        e.preventDefault();
+        const url = e.target.closest("a").getAttribute("href");
 
-      fetch(url, {
-        headers: { "x-requested-with": "XMLHttpRequest" }
-      })
-      .then(res => res.json())
-      .then(data => {
-        coursesTab.innerHTML = data.html; // replace grid + pagination
-        window.scrollTo({ top: coursesTab.offsetTop - 100, behavior: "smooth" });
-      });
-    }
+        fetch(url, {
+          headers: { "x-requested-with": "XMLHttpRequest" }
+        })
+        .then(res => res.json())
+        .then(data => {
+          tab.innerHTML = data.html; // replace grid + pagination
+          window.scrollTo({ top: tab.offsetTop - 100, behavior: "smooth" });
+        });
+      }
+    });
   });
 });
-
@@ -42,6 +42,12 @@ function submitRejection() {
     
     const requestId = formData.get('request_id');
     const actionType = formData.get('action_type');
+
+    if (actionType === 'bulk-reject') {
+        sendBulkAction('reject', formData.get('reason'));
+        bootstrap.Modal.getInstance(document.getElementById('rejectionModal')).hide();
+        return;
+    }
     
     let url, successMessage;
     if (actionType === 'reject') {
@@ -233,6 +239,92 @@ function makeRequest(method, url, data, successMessage) {
     });
 }
 
+// Bulk actions on the selected received requests
+const STATUS_STYLES = { P: 'warning', A: 'success', R: 'danger' };
+
+function selectedRequestIds() {
+    return Array.from(document.querySelectorAll('#received-container .bulk-select:checked')).map(box => box.value);
+}
+
+function updateBulkButtons() {
+    const none = selectedRequestIds().length === 0;
+    document.querySelectorAll('.bulk-actions button').forEach(button => { button.disabled = none; });
+}
+
+function bulkAcceptRequests() {
+    const ids = selectedRequestIds();
+    if (ids.length && confirm(`Accept ${ids.length} selected request(s)?`)) {
+        sendBulkAction('accept', '');
+    }
+}
+
+function bulkRejectRequests() {
+    if (!selectedRequestIds().length) return;
+    document.getElementById('rejectionForm').reset();
+    document.getElementById('rejectionType').value = 'bulk-reject';
+    document.getElementById('rejectionModalTitle').textContent = 'Reject Selected Requests';
+
+    const modal = new bootstrap.Modal(document.getElementById('rejectionModal'));
+    modal.show();
+}
+
+function sendBulkAction(action, reason) {
+    const formData = new FormData();
+    formData.append('action', action);
+    formData.append('reason', reason || '');
+    selectedRequestIds().forEach(id => formData.append('ids', id));
+
+    fetch('/courses/requests/bulk/', {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            alert(data.message);
+            return;
+        }
+        const failures = applyBulkResults(data.results);
+        alert(failures.length ? `${data.message}\n${failures.join('\n')}` : data.message);
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('An error occurred. Please try again.');
+    });
+}
+
+// Update each card in place from the per-id outcomes
+function applyBulkResults(results) {
+    const failures = [];
+    Object.entries(results).forEach(([id, result]) => {
+        const item = document.querySelector(`#received-container [data-request-id="${id}"]`);
+        if (!result.success) failures.push(`#${id}: ${result.message}`);
+        if (!item || !result.status) return;
+
+        const style = STATUS_STYLES[result.status] || 'secondary';
+        const card = item.querySelector('.card');
+        card.classList.remove('border-warning', 'border-success', 'border-danger', 'border-secondary');
+        card.classList.add(`border-${style}`);
+        const badge = item.querySelector('.request-status');
+        badge.className = `badge request-status bg-${style}`;
+        badge.textContent = result.status_display;
+        if (result.status !== 'P') {
+            item.querySelectorAll('.bulk-select, .pending-action').forEach(element => element.remove());
+        }
+    });
+    updateBulkButtons();
+    return failures;
+}
+
+document.addEventListener("change", function (e) {
+  if (e.target.classList.contains("bulk-select")) {
+    updateBulkButtons();
+  }
+});
+
 document.addEventListener("DOMContentLoaded", function () {
   function handlePagination(wrapperId, sectionName) {
     const wrapper = document.querySelector(wrapperId);
@@ -252,6 +344,7 @@ document.addEventListener("DOMContentLoaded", function () {
           .then(data => {
             console.log()
             wrapper.innerHTML = data.html; // replace only this section
+            updateBulkButtons(); // the selection went with the old page
             window.scrollTo({ top: wrapper.offsetTop - 100, behavior: "smooth" });
           });
       }
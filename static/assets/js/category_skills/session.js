@@ -116,7 +116,7 @@ document.addEventListener("DOMContentLoaded", function () {
             const formData = new FormData(feedbackForm);
             const sessionId = formData.get('session_id');
 
-            fetch(`/sessions/`, {
+            fetch(`/courses/sessions/${sessionId}/feedback/`, {
                 method: 'POST',
                 body: formData,
                 headers: {
@@ -52,6 +52,7 @@ document.addEventListener("DOMContentLoaded", function () {
                 <p class="teacher-name mt-3 p-2 bg-light rounded d-inline-block shadow-sm">
                   <i class="bi bi-person text-primary"></i>
                   <strong>Student:</strong> ${skill.student.first_name} ${skill.student.last_name}
+                  ${skill.student_rating ? `<i class="bi bi-star-fill text-warning ms-2"></i> ${skill.student_rating.mean}` : ""}
                 </p>` : ""}
                 <a href="/courses/course_details/${skill.id}/" class="btn-course">Course Details -> </a>
               </div>
@@ -105,14 +106,7 @@ function createInstructorCard(instructor) {
     // Rating stars
     const ratingDiv = document.createElement("div");
     ratingDiv.className = "rating-stars";
-    ratingDiv.innerHTML = `
-        <i class="bi bi-star-fill"></i>
-        <i class="bi bi-star-fill"></i>
-        <i class="bi bi-star-fill"></i>
-        <i class="bi bi-star-fill"></i>
-        <i class="bi bi-star-half"></i>
-        <span>4.8</span>
-    `;
+    ratingDiv.innerHTML = ratingStars(instructor.rating);
 
     // Skills count
     const courseDiv = document.createElement("div");
@@ -202,6 +196,20 @@ function truncateWords(text, num) {
     return words.slice(0, num).join(" ") + "...";
 }
 
+// Stars for a serialized rating ({count, mean, histogram}), "New" when unrated
+function ratingStars(rating) {
+    if (!rating || !rating.count) {
+        return `<i class="bi bi-star"></i> <span>New</span>`;
+    }
+    const halves = Math.round(rating.mean * 2);
+    let stars = "";
+    for (let star = 1; star <= 5; star++) {
+        const icon = 2 * star <= halves ? "bi-star-fill" : 2 * star - 1 === halves ? "bi-star-half" : "bi-star";
+        stars += `<i class="bi ${icon}"></i>`;
+    }
+    return `${stars} <span>${rating.mean}</span>`;
+}
+
 // Render instructors list from JSON API
 // Render instructors list from JSON API
 function renderInstructors(apiUrl, containerSelector) {
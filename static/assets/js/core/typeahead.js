@@ -0,0 +1,54 @@
+// Suggestions under search boxes marked data-typeahead="skills|instructors|universities"
+document.addEventListener("DOMContentLoaded", function () {
+  document.querySelectorAll("input[data-typeahead]").forEach(function (input) {
+    const kind = input.dataset.typeahead;
+    const menu = document.createElement("ul");
+    menu.className = "typeahead-menu";
+    menu.hidden = true;
+    input.setAttribute("autocomplete", "off");
+    input.parentNode.appendChild(menu);
+
+    let timer;
+    let latestQuery = "";
+
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      const query = input.value.trim();
+      latestQuery = query;
+      if (!query) {
+        menu.hidden = true;
+        return;
+      }
+
+      timer = setTimeout(function () {
+        fetch(`/api/typeahead/?kind=${kind}&q=${encodeURIComponent(query)}`)
+          .then(res => res.json())
+          .then(data => {
+            // A later keystroke already asked for something else
+            if (query !== latestQuery) return;
+
+            menu.innerHTML = "";
+            (data[kind] || []).forEach(item => {
+              const link = document.createElement("a");
+              link.href = item.url;
+              link.textContent = item.label;
+              const li = document.createElement("li");
+              li.appendChild(link);
+              menu.appendChild(li);
+            });
+            menu.hidden = menu.children.length === 0;
+          })
+          .catch(err => console.error("Typeahead error:", err));
+      }, 100);
+    });
+
+    input.addEventListener("keydown", function (e) {
+      if (e.key === "Escape") menu.hidden = true;
+    });
+
+    // Let a click on a suggestion land before hiding the menu
+    input.addEventListener("blur", function () {
+      setTimeout(() => { menu.hidden = true; }, 150);
+    });
+  });
+});